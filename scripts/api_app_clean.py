@@ -1,92 +1,247 @@
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, QueryParams
+from starlette.staticfiles import NotModifiedResponse
 from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import Optional
 from uuid import uuid4
-import re
+import base64
+import hmac
+import json
+import math
+import mimetypes
+import os
+import time
 
-from yt_transcript_tools.downloader import get_transcript_from_video_id
-from yt_transcript_tools.question_extractor import extract_questions as extract_questions_from_text
-from yt_transcript_tools.advanced_qa import extract_qa_advanced
-from yt_transcript_tools.perplexity import summarize_text as perplexity_summarize
+from yt_transcript_tools.artifacts import compact_interval
+from yt_transcript_tools.compression import DCZ_MAGIC, ZSTD_AVAILABLE, ZSTD_SUFFIX, content_size, file_dict_id, is_compressed, read_codec
+from yt_transcript_tools.deadline import get_stage_timings
+from yt_transcript_tools.export import get_exporter
+from yt_transcript_tools.extractors import iter_extraction_events
+from yt_transcript_tools.fetcher import fetch_transcript_lines
+from yt_transcript_tools.http_cache import (
+    COMPRESS_MIN_SIZE,
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    accepted_encodings,
+    artifact_version,
+    compress,
+    content_etag,
+    encoded_etag,
+    etag_matches,
+    file_etag,
+    negotiate_encoding,
+    stream_etag,
+)
+from yt_transcript_tools.jobqueue import get_job_queue
+from yt_transcript_tools.advanced_qa import QA_MODES, resolve_qa_mode
+from yt_transcript_tools.pipeline import ARTIFACTS, OUT_DIR, cached_extraction, run_job, start_nlp_pool, stop_nlp_pool
+from yt_transcript_tools.profiling import (
+    PROFILERS,
+    end_request_profile,
+    profile_dir,
+    profile_scope,
+    start_request_profile,
+    stop_tracemalloc,
+    tracemalloc_report,
+)
+from yt_transcript_tools.resilience import TranscriptUnavailable
+from yt_transcript_tools.results import dumps as dumps_json, parse_fields, shape_result
+from yt_transcript_tools.scheduler import QuotaExceeded, get_scheduler, shutdown_scheduler
+from yt_transcript_tools.video_ids import parse_video_id as extract_video_id
+from yt_transcript_tools.workers import PoolBusy
 
-app = FastAPI(title="YouTube Transcript Tools (clean)")
 
-OUT_DIR = Path("outputs")
-OUT_DIR.mkdir(exist_ok=True)
-app.mount("/outputs", StaticFiles(directory=str(OUT_DIR)), name="outputs")
+@asynccontextmanager
+async def _lifespan(app):
+    # started before the server spawns threads so workers fork cleanly
+    start_nlp_pool()
+    if ARTIFACTS.bounded:
+        ARTIFACTS.start_compactor(compact_interval())
+    try:
+        yield
+    finally:
+        shutdown_scheduler()
+        ARTIFACTS.stop_compactor()
+        ARTIFACTS.flush_hits()
+        stop_nlp_pool()
+        exporter = get_exporter()
+        if exporter is not None:
+            exporter.flush()
+
+
+app = FastAPI(title="YouTube Transcript Tools (clean)", lifespan=_lifespan)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with content-hash ETags and immutable caching of `?v=` URLs.
+
+    With a `store`, flat artifact names are served from their shard
+    directory and every hit is recorded for eviction.
+
+    zstd-compressed artifacts (``<name>.zst``) are served under their plain
+    name: as-is with ``Content-Encoding: zstd`` when the client accepts zstd
+    and the file was compressed without a dictionary, as ``dcz`` (RFC 9842)
+    when it was compressed with a dictionary the client already holds
+    (``Available-Dictionary``, fetched from ``/compression-dictionary``),
+    and otherwise decompressed on the fly.
+    """
+
+    def __init__(self, *args, store=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = store
+        self._etags = {}
+
+    def lookup_path(self, path):
+        if self.store is None:
+            return super().lookup_path(path)
+        found = self.store.locate(path)
+        if found is None:
+            return "", None
+        full_path, stat_result = super().lookup_path(found.relative_to(self.store.root).as_posix())
+        if stat_result is not None:
+            self.store.record_hit(path)
+        return full_path, stat_result
+
+    def _etag_for(self, full_path, stat_result) -> str:
+        key = (str(full_path), stat_result.st_mtime_ns, stat_result.st_size)
+        etag = self._etags.get(key)
+        if etag is None:
+            if len(self._etags) > 4096:
+                self._etags.clear()
+            # compressed files are tagged by their content, so `?v=` URLs match either way
+            etag = stream_etag(read_codec().iter_chunks(full_path)) if is_compressed(full_path) else file_etag(full_path)
+            etag = self._etags[key] = etag
+        return etag
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        etag = self._etag_for(full_path, stat_result)
+        if is_compressed(full_path):
+            response = self._compressed_response(full_path, stat_result, scope, status_code, etag)
+        else:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+            response.headers["etag"] = etag
+        version = QueryParams(scope.get("query_string", b"").decode("latin-1")).get("v")
+        # only a URL naming the current version may be cached forever
+        response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL if version == artifact_version(etag) else REVALIDATE_CACHE_CONTROL
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _compressed_response(self, full_path, stat_result, scope, status_code, etag):
+        request_headers = Headers(scope=scope)
+        codec = read_codec()
+        dict_id = file_dict_id(full_path)
+        accepted = accepted_encodings(request_headers.get("accept-encoding"))
+        media_type = mimetypes.guess_type(str(full_path)[: -len(ZSTD_SUFFIX)])[0] or "text/plain"
+        if media_type.startswith("text/"):
+            media_type += "; charset=utf-8"
+        headers = {"vary": "Accept-Encoding, Available-Dictionary"}
+        if dict_id:
+            headers["link"] = '</compression-dictionary>; rel="compression-dictionary"'
+        sha = codec.dictionary_sha256(dict_id) if dict_id else None
+        if not dict_id and "zstd" in accepted:
+            headers["etag"] = encoded_etag(etag, "zstd")
+            headers["content-encoding"] = "zstd"
+            return FileResponse(full_path, status_code=status_code, stat_result=stat_result, media_type=media_type, headers=headers)
+        if sha is not None and "dcz" in accepted and request_headers.get("available-dictionary") == _sf_binary(sha):
+            headers["etag"] = encoded_etag(etag, "dcz")
+            headers["content-encoding"] = "dcz"
+            headers["content-length"] = str(len(DCZ_MAGIC) + len(sha) + stat_result.st_size)
+            body = _prefixed(DCZ_MAGIC + sha, _iter_file(full_path))
+        else:
+            headers["etag"] = etag
+            size = content_size(full_path)
+            if size is not None:
+                headers["content-length"] = str(size)
+            body = codec.iter_chunks(full_path)
+        if scope["method"] == "HEAD":
+            return Response(b"", status_code=status_code, media_type=media_type, headers=headers)
+        return StreamingResponse(body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def _sf_binary(data: bytes) -> str:
+    """`data` as a structured-field byte sequence (``:base64:``)."""
+    return ":" + base64.b64encode(data).decode("ascii") + ":"
+
+
+def _iter_file(path, chunk_size: int = 1 << 16):
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            yield chunk
+
+
+def _prefixed(prefix: bytes, chunks):
+    yield prefix
+    yield from chunks
+
+
+# artifacts and recent results live in yt_transcript_tools.pipeline, shared with queued jobs
+app.mount("/outputs", CachedStaticFiles(directory=str(OUT_DIR), store=ARTIFACTS), name="outputs")
 
 JOBS = {}
 
+# HTTP status for each TranscriptUnavailable kind
+UNAVAILABLE_STATUS = {"disabled": 404, "not_found": 404, "rate_limited": 503, "circuit_open": 503, "error": 502}
 
-def extract_video_id(youtube_url: str) -> str:
-    if not youtube_url:
-        raise ValueError("youtube_url is empty")
-    if re.fullmatch(r"[0-9A-Za-z_-]{11}", youtube_url):
-        return youtube_url
-    m = re.search(r"(?:v=|/)([0-9A-Za-z_-]{11})", youtube_url)
-    if m:
-        return m.group(1)
-    raise ValueError("Invalid YouTube URL or video id")
+# /admin/* and X-Profile requests need this token (X-Admin-Token); unset disables them
+ADMIN_TOKEN_ENV = "YT_ADMIN_TOKEN"
 
 
-def _do_extraction(video_id: str, write_files: bool = True, use_perplexity: bool = False):
-    lines = get_transcript_from_video_id(video_id)
-    if not write_files:
-        joined = "\n".join(lines)
-        try:
-            questions = extract_questions_from_text(joined)
-        except Exception:
-            questions = []
-        try:
-            qa_pairs = extract_qa_advanced(lines, questions=questions)
-        except Exception:
-            qa_pairs = []
-        p = None
-        if use_perplexity:
-            try:
-                p = perplexity_summarize(joined)
-            except Exception:
-                p = None
-        return {"status":"ok","video_id":video_id,"transcript":lines,"questions":questions,"qa_pairs":qa_pairs,"perplexity_summary":p}
+def _admin_allowed(request: Request) -> bool:
+    token = os.environ.get(ADMIN_TOKEN_ENV)
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get("x-admin-token", ""), token)
 
-    out = OUT_DIR
-    transcript_path = out / f"{video_id}_transcript.txt"
-    transcript_path.write_text("\n".join(lines), encoding="utf-8")
 
-    qa_path = out / f"{video_id}_qa.txt"
-    try:
-        qa_pairs = extract_qa_advanced(lines)
-        with qa_path.open('w', encoding='utf-8') as fh:
-            for i, p in enumerate(qa_pairs, 1):
-                fh.write(f"Q{i}: {p.get('q','')}\nA{i}: {p.get('a','')}\n\n")
-        qa_count = len(qa_pairs)
-    except Exception:
-        qa_count = 0
-
-    questions_path = out / f"{video_id}_questions.txt"
+def _require_admin(request: Request) -> None:
+    if not _admin_allowed(request):
+        raise HTTPException(status_code=403, detail=f"admin access requires X-Admin-Token (set {ADMIN_TOKEN_ENV})")
+
+
+@app.middleware("http")
+async def _profile_requests(request: Request, call_next):
+    """Profile requests sent with ``X-Profile: sampling|cprofile`` (``1`` = sampling)."""
+    kind = request.headers.get("x-profile")
+    if not kind:
+        return await call_next(request)
+    if not _admin_allowed(request):
+        return JSONResponse({"detail": f"profiling requires X-Admin-Token (set {ADMIN_TOKEN_ENV})"}, status_code=403)
+    kind = "sampling" if kind in ("1", "true") else kind
+    if kind not in PROFILERS:
+        return JSONResponse({"detail": f"X-Profile must be one of {list(PROFILERS)}"}, status_code=400)
+    prof, token = start_request_profile(kind)
     try:
-        questions_count = 0
-        # fallback simple extractor
-        qlist = extract_questions_from_text("\n".join(lines))
-        questions_path.write_text("\n".join(qlist), encoding='utf-8')
-        questions_count = len(qlist)
-    except Exception:
-        questions_count = 0
-
-    summary_path = out / f"{video_id}_summary.txt"
-    summary_path.write_text(f"Video: {video_id}\nLines: {len(lines)}\nQA: {qa_count}\nQuestions: {questions_count}\n", encoding='utf-8')
-
-    per_path = None
-    if use_perplexity:
-        try:
-            per = perplexity_summarize("\n".join(lines))
-            per_path = out / f"{video_id}_perplexity_summary.txt"
-            per_path.write_text(per or "", encoding='utf-8')
-        except Exception:
-            per_path = None
+        response = await call_next(request)
+    finally:
+        end_request_profile(token)
+        prof.close()
+    path = prof.save(profile_dir(), f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid4().hex[:8]}")
+    response.headers["X-Profile-Id"] = path.name
+    return response
+
 
-    return {"status":"ok","video_id":video_id,"transcript_path":str(transcript_path),"qa_path":str(qa_path),"questions_path":str(questions_path),"summary_path":str(summary_path),"perplexity_path":str(per_path) if per_path else None}
+def _json_response(request: Request, payload, cache_control: str = REVALIDATE_CACHE_CONTROL) -> Response:
+    """JSON response with a content ETag, 304 revalidation and gzip/br compression."""
+    body = dumps_json(payload)
+    etag = content_etag(body)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding")) if len(body) >= COMPRESS_MIN_SIZE else None
+    headers = {"ETag": encoded_etag(etag, encoding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _unavailable_http_error(e: TranscriptUnavailable) -> HTTPException:
+    headers = {"Retry-After": str(max(1, int(e.retry_after)))} if e.retry_after else None
+    return HTTPException(status_code=UNAVAILABLE_STATUS.get(e.kind, 502), detail={"error": str(e), "kind": e.kind}, headers=headers)
 
 
 @app.get('/ui', response_class=HTMLResponse)
@@ -141,18 +296,18 @@ def ui():
                         if(j.status === 'done'){
                             const res = j.result || {};
                             const links = [];
-                            if(res.transcript_path) links.push('<a href="/outputs/'+res.transcript_path.split('/').pop()+'" target="_blank">Transcript</a>');
-                            if(res.qa_path) links.push('<a href="/outputs/'+res.qa_path.split('/').pop()+'" target="_blank">Q/A</a>');
-                            if(res.questions_path) links.push('<a href="/outputs/'+res.questions_path.split('/').pop()+'" target="_blank">Questions</a>');
-                            if(res.perplexity_path) links.push('<a href="/outputs/'+res.perplexity_path.split('/').pop()+'" target="_blank">Perplexity summary</a>');
-                            if(res.summary_path) links.push('<a href="/outputs/'+res.summary_path.split('/').pop()+'" target="_blank">Summary</a>');
+                            if(res.transcript_path) links.push('<a href="'+(res.transcript_url || '/outputs/'+res.transcript_path.split('/').pop())+'" target="_blank">Transcript</a>');
+                            if(res.qa_path) links.push('<a href="'+(res.qa_url || '/outputs/'+res.qa_path.split('/').pop())+'" target="_blank">Q/A</a>');
+                            if(res.questions_path) links.push('<a href="'+(res.questions_url || '/outputs/'+res.questions_path.split('/').pop())+'" target="_blank">Questions</a>');
+                            if(res.perplexity_path) links.push('<a href="'+(res.perplexity_url || '/outputs/'+res.perplexity_path.split('/').pop())+'" target="_blank">Perplexity summary</a>');
+                            if(res.summary_path) links.push('<a href="'+(res.summary_url || '/outputs/'+res.summary_path.split('/').pop())+'" target="_blank">Summary</a>');
                             result.innerHTML = '<div>'+links.join(' | ')+'</div><hr/>'; 
                             // show preview of summary or transcript if available
                             if(res.perplexity_path){
-                                const txt = await fetch('/outputs/'+res.perplexity_path.split('/').pop());
+                                const txt = await fetch(res.perplexity_url || '/outputs/'+res.perplexity_path.split('/').pop());
                                 if(txt.ok){ result.innerHTML += '<pre>'+ (await txt.text()).slice(0, 8000) +'</pre>' }
                             } else if(res.summary_path){
-                                const txt = await fetch('/outputs/'+res.summary_path.split('/').pop());
+                                const txt = await fetch(res.summary_url || '/outputs/'+res.summary_path.split('/').pop());
                                 if(txt.ok){ result.innerHTML += '<pre>'+ (await txt.text()).slice(0, 8000) +'</pre>' }
                             }
                             return;
@@ -189,46 +344,193 @@ def ui():
 
 
 @app.get('/extract/')
-def extract(youtube_url: str = Query(...), write_files: bool = Query(True), use_perplexity: bool = Query(False)):
+def extract(
+    request: Request,
+    youtube_url: str = Query(...),
+    write_files: bool = Query(True),
+    use_perplexity: bool = Query(False),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. questions,qa_pairs"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size for transcript and qa_pairs"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    qa_mode: Optional[str] = Query(None, description=f"QA answer ranking: one of {', '.join(QA_MODES)} (default YT_QA_MODE or auto)"),
+    budget_ms: Optional[int] = Query(None, ge=1, le=600000, description="Latency budget; expensive stages are downgraded or skipped to meet it and the result is marked partial"),
+    upgrade: bool = Query(False, description="With budget_ms: if the result is partial, queue the full extraction (job id in upgrade_job_id)"),
+):
     try:
         vid = extract_video_id(youtube_url)
+        qa_mode = resolve_qa_mode(qa_mode)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     try:
-        return _do_extraction(vid, write_files=write_files, use_perplexity=use_perplexity)
+        with profile_scope():
+            result = cached_extraction(vid, write_files=write_files, use_perplexity=use_perplexity, qa_mode=qa_mode, budget_ms=budget_ms)
+            if budget_ms is not None and "partial" not in result:
+                # served complete from the cache
+                result = {**result, "partial": False, "degraded": []}
+            try:
+                payload = shape_result(result, parse_fields(fields), limit=limit, cursor=cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if upgrade and result.get("partial"):
+                job = {"video_id": vid, "write_files": write_files, "use_perplexity": use_perplexity, "qa_mode": qa_mode}
+                try:
+                    payload["upgrade_job_id"] = _submit_job(job, request.headers.get("x-api-key"))
+                except QuotaExceeded as e:
+                    payload["upgrade_job_id"] = None
+                    payload["upgrade_retry_after"] = e.retry_after
+            return _json_response(request, payload)
+    except HTTPException:
+        raise
+    except TranscriptUnavailable as e:
+        raise _unavailable_http_error(e)
+    except PoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(max(1, int(e.retry_after)))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get('/extract/stream')
+def extract_stream(youtube_url: str = Query(...)):
+    """Stream question and Q/A events as NDJSON while the transcript is processed."""
+    try:
+        vid = extract_video_id(youtube_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def _events():
+        yield json.dumps({"type": "start", "video_id": vid}) + "\n"
+        counts = {"question": 0, "qa": 0}
+        try:
+            for ev in iter_extraction_events(fetch_transcript_lines(vid)):
+                counts[ev["type"]] += 1
+                yield json.dumps(ev) + "\n"
+        except TranscriptUnavailable as e:
+            yield json.dumps({"type": "error", "detail": str(e), "kind": e.kind, "retry_after": e.retry_after}) + "\n"
+            return
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+            return
+        yield json.dumps({"type": "end", "video_id": vid, "questions": counts["question"], "qa_pairs": counts["qa"]}) + "\n"
+
+    return StreamingResponse(_events(), media_type="application/x-ndjson")
+
+
 @app.post('/extract_async')
-def extract_async(youtube_url: str = Query(...), write_files: bool = Query(True), use_perplexity: bool = Query(False), background_tasks: BackgroundTasks = None):
+def extract_async(request: Request, youtube_url: str = Query(...), write_files: bool = Query(True), use_perplexity: bool = Query(False), qa_mode: Optional[str] = Query(None)):
     try:
         vid = extract_video_id(youtube_url)
+        qa_mode = resolve_qa_mode(qa_mode)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    payload = {"video_id": vid, "write_files": write_files, "use_perplexity": use_perplexity, "qa_mode": qa_mode}
+    try:
+        return {"job_id": _submit_job(payload, request.headers.get("x-api-key"))}
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
+
+
+def _submit_job(payload, api_key: Optional[str]) -> str:
+    """Queue an extraction job for the client `api_key`; returns its id.
+
+    Jobs run on the fair scheduler (see `yt_transcript_tools.scheduler`), or
+    in the shared job queue when configured; raises `QuotaExceeded` if the
+    client is over its quota.
+    """
+    scheduler = get_scheduler()
+    queue = get_job_queue()
+    if queue is not None:
+        # run by yt-transcript-worker processes (see yt_transcript_tools.queue_worker);
+        # only the rate quota applies
+        scheduler.admit(api_key)
+        return queue.enqueue("extract", payload)
     job_id = str(uuid4())
     JOBS[job_id] = {"status":"queued","result":None}
 
     def _run():
         JOBS[job_id]['status'] = 'running'
-        try:
-            res = _do_extraction(vid, write_files=write_files, use_perplexity=use_perplexity)
-            JOBS[job_id]['status'] = 'done'
-            JOBS[job_id]['result'] = res
-        except Exception as e:
-            JOBS[job_id]['status'] = 'error'
-            JOBS[job_id]['result'] = {'error': str(e)}
+        JOBS[job_id].update(run_job(payload))
 
-    if background_tasks is not None:
-        background_tasks.add_task(_run)
-    else:
-        _run()
-    return {"job_id": job_id}
+    try:
+        scheduler.submit(api_key, _run)
+    except QuotaExceeded:
+        del JOBS[job_id]
+        raise
+    return job_id
 
 
 @app.get('/status/{job_id}')
 def status(job_id: str):
-    j = JOBS.get(job_id)
+    queue = get_job_queue()
+    if queue is not None:
+        job = queue.get(job_id)
+        j = {"status": job["status"], "result": job["result"]} if job else None
+    else:
+        j = JOBS.get(job_id)
     if not j:
         raise HTTPException(status_code=404, detail='not found')
     return j
+
+
+@app.get('/admin/profiles/{name}')
+def admin_profile(name: str, request: Request):
+    """Download a stored request profile (``.collapsed`` or ``.prof``)."""
+    _require_admin(request)
+    path = profile_dir() / Path(name).name
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail='not found')
+    return FileResponse(path, media_type="text/plain" if path.suffix == ".collapsed" else "application/octet-stream")
+
+
+@app.get('/compression-dictionary')
+def compression_dictionary(request: Request):
+    """The zstd dictionary stored artifacts are compressed with, for ``dcz`` responses from ``/outputs``."""
+    data = read_codec().dictionary_bytes() if ZSTD_AVAILABLE else None
+    if data is None:
+        raise HTTPException(status_code=404, detail="no compression dictionary configured")
+    etag = content_etag(data)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=86400",
+        # RFC 9842: later /outputs requests advertise it in Available-Dictionary
+        "Use-As-Dictionary": 'match="/outputs/*"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(data, media_type="application/octet-stream", headers=headers)
+
+
+@app.get('/admin/artifacts')
+def admin_artifacts(request: Request, compact: bool = Query(False, description="Run a compaction pass (expire, then evict to quota) first")):
+    """Artifact store usage, quotas and retention settings."""
+    _require_admin(request)
+    result = {"compacted": ARTIFACTS.compact()} if compact else {}
+    return {**ARTIFACTS.stats(), **result}
+
+
+@app.get('/admin/scheduler')
+def admin_scheduler(request: Request):
+    """Per-client queue depth, running jobs, rejections and wait/run latency of async jobs."""
+    _require_admin(request)
+    return get_scheduler().stats()
+
+
+@app.get('/admin/stage_timings')
+def admin_stage_timings(request: Request):
+    """Per-stage cost estimates used to plan budgeted (``budget_ms``) extractions."""
+    _require_admin(request)
+    return get_stage_timings().snapshot()
+
+
+@app.get('/admin/tracemalloc')
+def admin_tracemalloc(
+    request: Request,
+    limit: int = Query(20, ge=1, le=1000),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    frames: int = Query(1, ge=1, le=64, description="Frames kept per allocation when tracing starts"),
+    stop: bool = Query(False, description="Stop tracing (and its overhead) instead of reporting"),
+):
+    """Top allocation sites since tracing started (the first call starts it)."""
+    _require_admin(request)
+    if stop:
+        return {"stopped": stop_tracemalloc()}
+    return tracemalloc_report(limit=limit, group_by=group_by, frames=frames)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Compression ratio and read throughput of stored transcripts: gzip vs zstd vs zstd + dictionary.
+
+Files are split into a training set (for the dictionary) and a held-out
+test set; every test file is compressed on its own, as the storage layer
+does. Read throughput is measured with `storage.iter_lines` (streaming
+decompression) against plain files, in MB/s of decompressed text.
+
+Example:
+    python scripts/bench_compression.py --dict-size 65536 --repeat 20
+"""
+import argparse
+import gzip
+import tempfile
+import time
+from pathlib import Path
+
+from yt_transcript_tools.compression import SAMPLE_BYTES, ZstdCodec, iter_samples, train_dictionary
+from yt_transcript_tools.storage import iter_lines, read_text, write_stored
+
+PATTERNS = ("*_transcript.txt", "*_qa.txt", "*_questions.txt")
+
+
+def _read_all(paths, repeat, codec=None):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in paths:
+            for _line in iter_lines(path, codec=codec):
+                pass
+    return time.perf_counter() - start
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark dictionary-trained zstd on stored transcripts")
+    p.add_argument("inputs", nargs="*", help="Files (default: outputs/ transcripts, QA and question files)")
+    p.add_argument("--test-every", type=int, default=4, help="Every Nth file is held out for testing")
+    p.add_argument("--dict-size", type=int, default=16384, help="Dictionary size in bytes")
+    p.add_argument("--level", type=int, default=3)
+    p.add_argument("--repeat", type=int, default=10, help="Read passes over the test set")
+    args = p.parse_args()
+
+    paths = [Path(x) for x in args.inputs] or sorted(x for pattern in PATTERNS for x in Path("outputs").glob(f"**/{pattern}"))
+    texts = [read_text(x).encode("utf-8") for x in paths]
+    test = texts[:: args.test_every]
+    train = [t for i, t in enumerate(texts) if i % args.test_every]
+    if not test or not train:
+        raise SystemExit("need at least two files to split into training and test sets")
+    dictionary = train_dictionary(list(iter_samples(train, SAMPLE_BYTES)), args.dict_size, level=args.level)
+    codecs = {"zstd": ZstdCodec(level=args.level), "zstd+dict": ZstdCodec([dictionary], level=args.level)}
+
+    raw = sum(len(t) for t in test)
+    gz = sum(len(gzip.compress(t, 6)) for t in test)
+    print(f"{len(train)} training / {len(test)} test files, {raw / 1024:.0f} KiB test text, dictionary {len(dictionary)} bytes")
+    print(f"{'method':>12}{'stored KiB':>12}{'ratio':>8}{'read MB/s':>12}")
+    print(f"{'gzip-6':>12}{gz / 1024:>12.1f}{raw / gz:>8.2f}{'-':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        stored = [write_stored(Path(tmp) / f"{i}.txt", data) for i, data in enumerate(test)]
+        seconds = _read_all(stored, args.repeat)
+        print(f"{'plain':>12}{raw / 1024:>12.1f}{1.0:>8.2f}{raw * args.repeat / seconds / 1e6:>12.1f}")
+        for name, codec in codecs.items():
+            stored = [write_stored(Path(tmp) / f"{name}-{i}.txt", data, codec) for i, data in enumerate(test)]
+            size = sum(x.stat().st_size for x in stored)
+            seconds = _read_all(stored, args.repeat, codec)
+            print(f"{name:>12}{size / 1024:>12.1f}{raw / size:>8.2f}{raw * args.repeat / seconds / 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Compare embedding backends on the sample transcripts in `outputs/`.
+
+Each backend runs in its own subprocess so peak RSS is measured in
+isolation. Reported per backend:
+
+- load time and encode latency (total and per sentence),
+- peak RSS of the process (MB),
+- accuracy against the default backend: mean cosine similarity between the
+  two backends' vectors for the same sentence, and the share of questions
+  for which `extract_qa_advanced` picks the same answer.
+
+Example:
+    python scripts/bench_embedding_backends.py --backends sentence-transformers torch-int8 onnx onnx-int8
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from yt_transcript_tools import advanced_qa
+from yt_transcript_tools.embeddings import DEFAULT_BACKEND, EMBEDDING_BACKENDS
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_worker(backend_name, paths, out_dir):
+    import numpy as np
+
+    t0 = time.perf_counter()
+    backend = advanced_qa.get_embedding_backend(backend_name)
+    backend.encode(["warm up"])
+    load_s = time.perf_counter() - t0
+
+    sentences, answers = [], {}
+    encode_s = 0.0
+    for p in paths:
+        lines = Path(p).read_text(encoding="utf-8").splitlines()
+        sents = advanced_qa._segment_sentences("\n".join(lines))
+        sentences.extend(sents)
+        t0 = time.perf_counter()
+        qa = advanced_qa.extract_qa_advanced(lines, backend=backend)
+        encode_s += time.perf_counter() - t0
+        answers[str(p)] = [r["a"] for r in qa]
+
+    vecs = np.asarray(backend.encode(sentences), dtype=np.float32)
+    np.save(Path(out_dir) / f"{backend_name}.npy", vecs)
+    return {
+        "backend": backend_name,
+        "load_s": load_s,
+        "extract_s": encode_s,
+        "sentences": len(sentences),
+        "ms_per_sentence": 1000 * encode_s / max(1, len(sentences)),
+        "peak_rss_mb": _peak_rss_mb(),
+        "answers": answers,
+    }
+
+
+def compare(baseline, other, out_dir):
+    import numpy as np
+
+    a = np.load(Path(out_dir) / f"{baseline['backend']}.npy")
+    b = np.load(Path(out_dir) / f"{other['backend']}.npy")
+    a /= np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b /= np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    same = total = 0
+    for path, ans in baseline["answers"].items():
+        for x, y in zip(ans, other["answers"].get(path, [])):
+            total += 1
+            same += x == y
+    return {
+        "mean_cosine_vs_default": float((a * b).sum(axis=1).mean()) if len(a) else None,
+        "answer_agreement": same / total if total else None,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark embedding backends (accuracy, latency, memory)")
+    p.add_argument("inputs", nargs="*", help="Transcript files (default: outputs/*_transcript.txt)")
+    p.add_argument("--backends", nargs="+", default=sorted(EMBEDDING_BACKENDS), choices=sorted(EMBEDDING_BACKENDS))
+    p.add_argument("--worker", help=argparse.SUPPRESS)
+    p.add_argument("--out-dir", help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    paths = [str(x) for x in (args.inputs or sorted(Path("outputs").glob("*_transcript.txt")))]
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, paths, args.out_dir)))
+        return
+
+    backends = [DEFAULT_BACKEND] + [b for b in args.backends if b != DEFAULT_BACKEND]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in backends:
+            proc = subprocess.run(
+                [sys.executable, __file__, *paths, "--worker", name, "--out-dir", tmp],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{name}: failed\n{proc.stderr.strip().splitlines()[-1] if proc.stderr else ''}", file=sys.stderr)
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        if not results or results[0]["backend"] != DEFAULT_BACKEND:
+            raise SystemExit(f"default backend {DEFAULT_BACKEND!r} is required as the accuracy baseline")
+        for r in results:
+            r.update(compare(results[0], r, tmp))
+
+    print(f"{'backend':<22}{'load s':>8}{'extract s':>11}{'ms/sent':>9}{'RSS MB':>9}{'cosine':>8}{'agree':>7}")
+    for r in results:
+        print(
+            f"{r['backend']:<22}{r['load_s']:>8.2f}{r['extract_s']:>11.2f}{r['ms_per_sentence']:>9.3f}"
+            f"{r['peak_rss_mb']:>9.0f}{r['mean_cosine_vs_default'] or 0.0:>8.4f}{r['answer_agreement'] or 0.0:>7.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Benchmark embedding throughput: per-call `encode` vs the shared batcher.
+
+Simulates a batch ingest by running one extraction-sized encode per sample
+transcript in `outputs/` from several threads at once, and reports
+sentences per second for both modes, using the configured embedding
+backend (`YT_EMBED_BACKEND`).
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from yt_transcript_tools import advanced_qa
+
+
+def load_workload(paths, repeat):
+    docs = []
+    for p in paths:
+        sents = advanced_qa._segment_sentences(Path(p).read_text(encoding="utf-8"))
+        if sents:
+            docs.append(sents)
+    return docs * repeat
+
+
+def run(docs, workers, encode):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(encode, docs))
+    return time.perf_counter() - start
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare per-call and batched embedding throughput")
+    p.add_argument("inputs", nargs="*", help="Transcript files (default: outputs/*_transcript.txt)")
+    p.add_argument("--workers", type=int, default=8, help="Concurrent extractions")
+    p.add_argument("--repeat", type=int, default=4, help="Times to repeat the sample set")
+    p.add_argument("--batch-size", type=int, default=64)
+    p.add_argument("--threads", type=int, default=None, help="torch intra-op threads for the batcher")
+    args = p.parse_args()
+
+    try:
+        model = advanced_qa.get_embedding_backend()
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+
+    paths = args.inputs or sorted(Path("outputs").glob("*_transcript.txt"))
+    docs = load_workload(paths, args.repeat)
+    total = sum(len(d) for d in docs)
+    model.encode(["warm up"])
+
+    per_call = run(docs, args.workers, model.encode)
+    batcher = advanced_qa.EmbeddingBatcher(model, batch_size=args.batch_size, num_threads=args.threads)
+    try:
+        batched = run(docs, args.workers, batcher.encode)
+    finally:
+        batcher.close()
+
+    print(f"{len(docs)} documents, {total} sentences, {args.workers} workers")
+    print(f"per-call: {per_call:.2f}s  {total / per_call:.0f} sentences/s")
+    print(f"batched:  {batched:.2f}s  {total / batched:.0f} sentences/s  ({batcher.batches_run} batches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Peak-memory benchmark for `extract_qa_advanced`: in-memory vs windowed.
+
+Builds synthetic long transcripts by concatenating a sample transcript
+`--scales` times, then runs each mode in a fresh subprocess and reports peak
+RSS. In windowed mode lines are streamed from the file, so peak memory
+should stay roughly flat as the transcript grows while the in-memory mode
+grows linearly.
+
+Example:
+    python scripts/bench_qa_memory.py outputs/2aldTxnbNt0_transcript.txt --scales 1 4 16 64
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from yt_transcript_tools.advanced_qa import extract_qa_advanced
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_worker(path, chunk_lines):
+    start = time.perf_counter()
+    with open(path, encoding="utf-8") as fh:
+        if chunk_lines:
+            results = extract_qa_advanced((ln.rstrip("\n") for ln in fh), chunk_lines=chunk_lines)
+        else:
+            results = extract_qa_advanced(fh.read().splitlines())
+    return {"seconds": time.perf_counter() - start, "qa_pairs": len(results), "peak_rss_mb": _peak_rss_mb()}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare peak RSS of in-memory and windowed advanced QA")
+    p.add_argument("input", nargs="?", default="outputs/2aldTxnbNt0_transcript.txt", help="Sample transcript")
+    p.add_argument("--scales", nargs="+", type=int, default=[1, 4, 16], help="Concatenation factors")
+    p.add_argument("--chunk-lines", type=int, default=2000)
+    p.add_argument("--worker", help=argparse.SUPPRESS)
+    p.add_argument("--worker-chunk", type=int, default=0, help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.worker_chunk)))
+        return
+
+    sample = Path(args.input).read_text(encoding="utf-8")
+    if not sample.endswith("\n"):
+        sample += "\n"
+    print(f"{'scale':>6}{'lines':>10}{'mode':>10}{'seconds':>10}{'peak MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            path = Path(tmp) / f"x{scale}.txt"
+            with path.open("w", encoding="utf-8") as fh:
+                for _ in range(scale):
+                    fh.write(sample)
+            n_lines = sample.count("\n") * scale
+            for mode, chunk in (("memory", 0), ("windowed", args.chunk_lines)):
+                proc = subprocess.run(
+                    [sys.executable, __file__, "--worker", str(path), "--worker-chunk", str(chunk)],
+                    capture_output=True, text=True, check=True,
+                )
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                print(f"{scale:>6}{n_lines:>10}{mode:>10}{r['seconds']:>10.2f}{r['peak_rss_mb']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
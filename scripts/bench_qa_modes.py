@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Compare QA answer ranking modes: heuristic, BM25 and embeddings.
+
+For every sample transcript in `outputs/` the questions are detected once,
+then `extract_qa_advanced` runs in each mode. Reported per mode:
+
+- latency: milliseconds per transcript end to end (segmentation included,
+  as in the API), then for the ranking step alone the milliseconds per
+  transcript spent building the BM25 index / encoding sentences and the
+  microseconds per question spent picking its answer;
+- quality: top-1 agreement with the reference mode's answers (default
+  ``embedding``, skipped when no embedding backend is installed), and
+  accuracy against ``--labels`` (JSON ``{"question": "answer sentence"}``)
+  when given.
+
+Example:
+    PYTHONPATH=. python scripts/bench_qa_modes.py --repeat 5
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from yt_transcript_tools import advanced_qa
+from yt_transcript_tools.bm25 import BM25Index
+from yt_transcript_tools.question_extractor import extract_questions
+
+MODES = ("heuristic", "bm25", "embedding")
+
+
+def load_samples(paths):
+    samples = []
+    for p in paths:
+        lines = Path(p).read_text(encoding="utf-8").splitlines()
+        questions = extract_questions("\n".join(lines))
+        if questions:
+            samples.append((lines, questions))
+    return samples
+
+
+def run_mode(samples, mode, repeat, backend):
+    answers = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        answers = [advanced_qa.extract_qa_advanced(lines, questions=qs, mode=mode, backend=backend) for lines, qs in samples]
+    seconds = (time.perf_counter() - start) / repeat
+    # ranking alone, given segmented sentences and located questions (shared
+    # by every mode): building the index (BM25) or encoding (embeddings),
+    # then picking each question's answer in its window
+    docs = []
+    for lines, qs in samples:
+        s = advanced_qa._segment_sentences("\n".join(lines))
+        docs.append((s, qs, [advanced_qa._find_question(q, s) for q in qs]))
+    window = 3 * 2
+    index_seconds = rank_seconds = 0.0
+    for _ in range(repeat):
+        for s, qs, positions in docs:
+            if mode == "heuristic":
+                continue
+            t0 = time.perf_counter()
+            if mode == "bm25":
+                index = BM25Index(s)
+            else:
+                vecs = backend.encode(list(qs) + s)
+                q_emb, s_emb = vecs[:len(qs)], np.stack(vecs[len(qs):])
+            t1 = time.perf_counter()
+            for qi, (q, pos) in enumerate(zip(qs, positions)):
+                lo, hi = (0, len(s)) if pos is None else (pos + 1, pos + 1 + window)
+                if mode == "bm25":
+                    index.best(q, lo, hi)
+                elif hi > lo:
+                    advanced_qa._cos_sim(q_emb[qi], s_emb[lo:hi]).argmax()
+            t2 = time.perf_counter()
+            index_seconds += t1 - t0
+            rank_seconds += t2 - t1
+    return answers, seconds, index_seconds / repeat, rank_seconds / repeat
+
+
+def agreement(answers, reference):
+    pairs = [(a["a"], r["a"]) for doc, ref in zip(answers, reference) for a, r in zip(doc, ref)]
+    # containment either way: heuristic answers join several sentences
+    return sum(1 for a, r in pairs if a == r or (a and r and (r in a or a in r))) / len(pairs) if pairs else None
+
+
+def accuracy(answers, labels):
+    hits = total = 0
+    for doc in answers:
+        for a in doc:
+            gold = labels.get(a["q"])
+            if gold is not None:
+                total += 1
+                hits += gold.strip() in a["a"]
+    return hits / total if total else None
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark QA answer ranking modes")
+    p.add_argument("inputs", nargs="*", help="Transcript files (default: outputs/*_transcript.txt)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--reference", default="embedding", choices=MODES, help="Mode other modes are compared against")
+    p.add_argument("--labels", help="JSON file mapping questions to their gold answer sentence")
+    args = p.parse_args()
+
+    paths = args.inputs or sorted(Path("outputs").glob("*_transcript.txt"))
+    samples = load_samples(paths)
+    n_questions = sum(len(qs) for _, qs in samples)
+    labels = json.loads(Path(args.labels).read_text(encoding="utf-8")) if args.labels else {}
+    backend = advanced_qa._get_backend(None)
+    if backend is not None:
+        backend.encode(["warm up"])
+
+    results = {}
+    for mode in MODES:
+        if mode == "embedding" and backend is None:
+            print("embedding: skipped (no embedding backend installed)")
+            continue
+        results[mode] = run_mode(samples, mode, args.repeat, backend)
+
+    reference = results.get(args.reference, (None,))[0]
+    print(f"{len(samples)} transcripts, {n_questions} questions")
+    print(f"{'mode':>10}{'ms/doc':>10}{'index ms/doc':>14}{'us/q rank':>12}{'answered':>10}{'agree':>8}{'acc':>8}")
+    for mode, (answers, seconds, index_seconds, rank_seconds) in results.items():
+        answered = sum(1 for doc in answers for a in doc if a["a"]) / n_questions if n_questions else 0.0
+        agree = agreement(answers, reference) if reference is not None else None
+        acc = accuracy(answers, labels) if labels else None
+        print(
+            f"{mode:>10}{seconds * 1000 / len(samples):>10.2f}{index_seconds * 1000 / len(samples):>14.2f}"
+            f"{rank_seconds * 1e6 / n_questions:>12.1f}{answered:>10.2f}"
+            f"{'-' if agree is None else f'{agree:.2f}':>8}{'-' if acc is None else f'{acc:.2f}':>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
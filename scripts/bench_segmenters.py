@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Benchmark sentence segmenters on the sample transcripts.
+
+For each available segmenter (`rules`, `regex`, `spacy` if installed)
+reports throughput on the transcripts as stored, and boundary accuracy
+on simulated auto-captions: punctuated samples are lowercased and stripped
+of ``. ! ?`` and the predicted sentence boundaries are scored against the
+original punctuation (precision / recall / F1 over word positions).
+`batch` is the time for `segment_many` over the whole corpus (``nlp.pipe``
+for spaCy, see `--batch-size` / `--n-process`).
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+from yt_transcript_tools.segmenter import SEGMENTERS, get_segmenter
+
+_PUNCT_RE = re.compile(r"[.!?]")
+
+
+def gold_boundaries(text):
+    """Word indices after which the punctuated text ends a sentence."""
+    out = set()
+    for i, w in enumerate(text.split()):
+        if w.rstrip("\"')”’").endswith((".", "!", "?")):
+            out.add(i)
+    return out
+
+
+def predicted_boundaries(sentences):
+    out, n = set(), 0
+    for s in sentences:
+        n += len(s.split())
+        out.add(n - 1)
+    return out
+
+
+def strip_punctuation(text):
+    return _PUNCT_RE.sub("", text).lower()
+
+
+def score(gold, pred):
+    tp = len(gold & pred)
+    p = tp / len(pred) if pred else 0.0
+    r = tp / len(gold) if gold else 0.0
+    f = 2 * p * r / (p + r) if p + r else 0.0
+    return p, r, f
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare sentence segmenters for speed and accuracy")
+    p.add_argument("inputs", nargs="*", help="Transcript files (default: transcript.txt and outputs/*_transcript.txt)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--batch-size", type=int, default=64, help="Docs per nlp.pipe batch")
+    p.add_argument("--n-process", type=int, default=1, help="nlp.pipe worker processes")
+    args = p.parse_args()
+
+    paths = args.inputs or ["transcript.txt"] + sorted(str(x) for x in Path("outputs").glob("*_transcript.txt"))
+    texts = [Path(x).read_text(encoding="utf-8") for x in paths if Path(x).exists()]
+    # only transcripts that actually carry punctuation can serve as gold
+    punctuated = [t for t in texts if len(gold_boundaries(t)) > len(t.split()) / 60]
+    words = sum(len(t.split()) for t in texts)
+    print(f"{len(texts)} transcripts, {words} words; {len(punctuated)} punctuated for accuracy")
+
+    for name in SEGMENTERS:
+        try:
+            seg = get_segmenter(name)
+        except RuntimeError as e:
+            print(f"{name:>6}: unavailable ({e})")
+            continue
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            n_sents = sum(len(seg.segment(t)) for t in texts)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            seg.segment_many(texts, batch_size=args.batch_size, n_process=args.n_process)
+        batch = (time.perf_counter() - start) / args.repeat
+        tot = [0.0, 0.0, 0.0]
+        for t in punctuated:
+            for i, v in enumerate(score(gold_boundaries(t), predicted_boundaries(seg.segment(strip_punctuation(t))))):
+                tot[i] += v
+        k = max(len(punctuated), 1)
+        print(
+            f"{name:>6}: {elapsed * 1000:8.1f} ms (batch {batch * 1000:8.1f} ms)  {words / elapsed:10.0f} words/s  {n_sents:6d} sentences  "
+            f"unpunctuated P={tot[0] / k:.2f} R={tot[1] / k:.2f} F1={tot[2] / k:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
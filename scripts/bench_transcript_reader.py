@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Peak-memory and throughput benchmark: `read_text` vs memory-mapped reading.
+
+Builds an archive of `--size-mb` megabytes by concatenating the sample
+transcripts, then runs `extract_questions` and `extract_qa` over it in a
+fresh subprocess per (task, mode) and reports seconds, MB/s and peak RSS.
+
+Example (GB scale):
+    python scripts/bench_transcript_reader.py --size-mb 1024
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from yt_transcript_tools.extractors import extract_qa, extract_questions
+
+TASKS = {"questions": extract_questions, "qa": extract_qa}
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_worker(path, task, use_mmap):
+    out = Path(path).with_suffix(f".{task}.out")
+    start = time.perf_counter()
+    count = TASKS[task](Path(path), out, use_mmap=use_mmap)
+    return {"seconds": time.perf_counter() - start, "count": count, "peak_rss_mb": _peak_rss_mb()}
+
+
+def build_archive(path, inputs, size_mb):
+    samples = []
+    for p in inputs:
+        text = Path(p).read_text(encoding="utf-8")
+        samples.append((text if text.endswith("\n") else text + "\n").encode("utf-8"))
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "wb") as fh:
+        while written < target:
+            for data in samples:
+                fh.write(data)
+                written += len(data)
+    return written
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare read_text and mmap transcript reading")
+    p.add_argument("inputs", nargs="*", help="Sample transcripts (default: transcript.txt and outputs/*_transcript.txt)")
+    p.add_argument("--size-mb", type=int, default=256, help="Archive size to build")
+    p.add_argument("--tasks", nargs="+", default=list(TASKS), choices=list(TASKS))
+    p.add_argument("--worker", help=argparse.SUPPRESS)
+    p.add_argument("--worker-task", help=argparse.SUPPRESS)
+    p.add_argument("--worker-mmap", action="store_true", help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.worker_task, args.worker_mmap)))
+        return
+
+    inputs = args.inputs or ["transcript.txt"] + sorted(str(x) for x in Path("outputs").glob("*_transcript.txt"))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "archive.txt"
+        size = build_archive(path, [x for x in inputs if Path(x).exists()], args.size_mb)
+        mb = size / (1024 * 1024)
+        print(f"archive: {mb:.0f} MB")
+        print(f"{'task':>10}{'mode':>10}{'seconds':>10}{'MB/s':>10}{'peak MB':>10}{'items':>10}")
+        for task in args.tasks:
+            for mode in ("read_text", "mmap"):
+                cmd = [sys.executable, __file__, "--worker", str(path), "--worker-task", task]
+                if mode == "mmap":
+                    cmd.append("--worker-mmap")
+                proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                print(f"{task:>10}{mode:>10}{r['seconds']:>10.2f}{mb / r['seconds']:>10.1f}{r['peak_rss_mb']:>10.0f}{r['count']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Export processed videos in `outputs/` to Parquet datasets.
+
+Only videos not exported before are appended (see
+`yt_transcript_tools.export`), so the command can run after every batch.
+
+Example:
+    python scripts/export_parquet.py --parquet-dir parquet
+    duckdb -c "SELECT count(*) FROM read_parquet('parquet/transcripts/*/*.parquet')"
+"""
+import argparse
+import json
+import os
+
+from yt_transcript_tools.export import DEFAULT_PARQUET_DIR, PARQUET_DIR_ENV, ParquetExporter, export_outputs
+from yt_transcript_tools.profiling import add_profile_arguments, profiled
+from yt_transcript_tools.providers import FIXTURE_DIR_ENV
+
+
+def main():
+    p = argparse.ArgumentParser(description="Append processed transcripts, questions and QA pairs to Parquet datasets")
+    p.add_argument("--out-dir", default="outputs", help="Directory with <id>_transcript.txt, _questions.txt and _qa.txt files")
+    p.add_argument("--parquet-dir", default=os.environ.get(PARQUET_DIR_ENV) or DEFAULT_PARQUET_DIR, help="Dataset root")
+    p.add_argument("--fixtures", default=os.environ.get(FIXTURE_DIR_ENV), help="Recorded fixtures providing line start/duration")
+    p.add_argument("--batch-videos", type=int, default=500, help="Videos per written file")
+    p.add_argument("--compression", default="zstd", help="Parquet compression codec")
+    add_profile_arguments(p)
+    args = p.parse_args()
+    with profiled(args.profile, args.profiler):
+        exporter = ParquetExporter(args.parquet_dir, compression=args.compression, batch_videos=args.batch_videos)
+        counts = export_outputs(args.out_dir, exporter, fixture_dir=args.fixtures)
+    print(json.dumps({"parquet_dir": str(exporter.root), **counts}))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,29 @@
 import argparse
 from pathlib import Path
 from yt_transcript_tools.extractors import extract_questions
+from yt_transcript_tools.profiling import add_profile_arguments, profiled
+from yt_transcript_tools.tagging import KeywordTagger, tag_file
 
 
 def main():
     p = argparse.ArgumentParser(description="Extract questions from transcript.txt")
     p.add_argument("input", nargs="?", default="transcript.txt", help="Transcript input file")
     p.add_argument("-o", "--output", default="questions.txt", help="Output file for questions")
+    p.add_argument("--mmap", action="store_true", help="Stream the transcript from a memory map (for very large files)")
+    p.add_argument("--keywords", help="Keyword file (one per line); also tag the transcript with the keywords it mentions")
+    p.add_argument("--tags-output", default="tags.json", help="Output file for keyword tags (with --keywords)")
+    add_profile_arguments(p)
     args = p.parse_args()
-    count = extract_questions(Path(args.input), Path(args.output))
+    with profiled(args.profile, args.profiler):
+        run(args)
+
+
+def run(args):
+    count = extract_questions(Path(args.input), Path(args.output), use_mmap=args.mmap)
     print(f"Wrote {args.output} ({count} questions)")
+    if args.keywords:
+        found = tag_file(KeywordTagger.from_file(args.keywords), Path(args.input), Path(args.tags_output))
+        print(f"Wrote {args.tags_output} ({found} keywords)")
 
 
 if __name__ == "__main__":
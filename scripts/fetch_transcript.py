@@ -2,16 +2,76 @@
 """CLI wrapper to fetch a YouTube transcript and save to a file."""
 import argparse
 from pathlib import Path
-from yt_transcript_tools.fetcher import fetch_transcript
+from yt_transcript_tools.fetcher import extract_tail, fetch_transcript, fetch_transcript_tail
+from yt_transcript_tools.profiling import add_profile_arguments, profiled
+from yt_transcript_tools.video_ids import parse_many, parse_playlist_id, parse_video_id
+
+
+def fetch_many(entries, out_dir: Path) -> int:
+    """Fetch every video named by `entries` (URLs, ids or playlists); returns the number of failures.
+
+    A playlist that cannot be expanded counts as one failure, like a video
+    whose transcript cannot be fetched; the other entries still run.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ok = failed = 0
+
+    def _expand_failed(entry, e):
+        nonlocal failed
+        failed += 1
+        print(f"{entry}: {e}")
+
+    for vid in parse_many(entries, unique=True, expand_playlists=True, on_error=_expand_failed):
+        try:
+            fetch_transcript(vid, out_dir / f"{vid}_transcript.txt")
+            ok += 1
+        except Exception as e:
+            failed += 1
+            print(f"{vid}: {e}")
+    print(f"Fetched {ok} transcripts into {out_dir} ({failed} failed)")
+    return failed
 
 
 def main():
     p = argparse.ArgumentParser(description="Fetch YouTube transcript to a text file")
-    p.add_argument("video_id", help="YouTube video ID (not full URL)")
+    p.add_argument("video", nargs="?", help="YouTube URL, video ID or playlist URL")
     p.add_argument("-o", "--output", default="transcript.txt", help="Output path")
+    p.add_argument("-i", "--input-file", help="File with one URL/ID per line; fetches each into --out-dir")
+    p.add_argument("--out-dir", default="outputs", help="Output directory for --input-file and playlists")
+    p.add_argument("--tail", action="store_true", help="Append only snippets that are new since the last --tail run")
+    p.add_argument("--extract", action="store_true", help="With --tail: extract questions/QA from the new region only")
+    p.add_argument("--questions", default="questions.txt", help="Questions file appended to by --extract")
+    p.add_argument("--qa", default="qa.txt", help="Q/A file appended to by --extract")
+    add_profile_arguments(p)
     args = p.parse_args()
-    out = fetch_transcript(args.video_id, args.output)
-    print(f"Wrote transcript to {out}")
+    if not args.input_file and not args.video:
+        p.error("a video URL/ID or --input-file is required")
+    with profiled(args.profile, args.profiler):
+        run(args)
+
+
+def run(args):
+    if args.input_file:
+        with open(args.input_file, encoding="utf-8") as fh:
+            fetch_many(fh, Path(args.out_dir))
+        return
+    try:
+        video_id = parse_video_id(args.video)
+    except ValueError:
+        if not parse_playlist_id(args.video):
+            raise
+        fetch_many([args.video], Path(args.out_dir))
+        return
+
+    if not args.tail:
+        out = fetch_transcript(video_id, args.output)
+        print(f"Wrote transcript to {out}")
+        return
+    update = fetch_transcript_tail(video_id, args.output)
+    print(f"Appended {len(update.new_lines)} new lines to {update.path}")
+    if args.extract:
+        count = extract_tail(update, Path(args.questions), Path(args.qa))
+        print(f"Appended {count} Q/A pairs to {args.qa}")
 
 
 if __name__ == "__main__":
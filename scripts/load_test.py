@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""HTTP load generator for the extraction API.
+
+Drives ``/extract/``, ``/extract_async`` (+ ``/status`` polling until the job
+finishes) and ``/outputs`` downloads, and prints a JSON report with
+throughput, latency percentiles (p50/p95/p99) and error rates per scenario.
+
+By default the app is imported and driven in-process through
+``httpx.ASGITransport`` with stubbed backends, so runs are reproducible on
+an isolated machine (note that in-process, ``BackgroundTasks`` of the older
+app variants complete before the ``/extract_async`` response is returned,
+so for them that scenario measures the whole job):
+
+- transcripts come from the replay provider (`yt_transcript_tools.providers`)
+  over fixtures generated from the sample transcripts, with optional
+  synthetic latency / error injection (``--fetch-latency-ms``,
+  ``--fetch-error-rate``);
+- the Perplexity call is replaced by a stub sleeping ``--perplexity-ms``;
+- outputs are written to a temporary working directory.
+
+Load is either closed-loop (``--concurrency`` clients back to back) or
+open-loop (``--rate`` requests/second with Poisson arrivals, at most
+``--concurrency`` in flight). Compare app variants with ``--app`` and
+configurations with the request flags, e.g.::
+
+    python scripts/load_test.py --duration 30 --concurrency 16 --mix extract=3,async=1,outputs=1
+    python scripts/load_test.py --app scripts.api_app_fixed:app --rate 50 --use-perplexity
+
+``--url`` targets a running server instead; start it with
+``YT_TRANSCRIPT_PROVIDER=replay YT_FIXTURE_DIR=<dir>`` after creating the
+fixtures with ``--prepare-fixtures <dir>``.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from yt_transcript_tools import providers  # noqa: E402
+from yt_transcript_tools.providers import FixtureStore  # noqa: E402
+
+SCENARIOS = ("extract", "async", "outputs")
+
+
+def prepare_fixtures(root, videos, samples):
+    """Write `videos` replay fixtures cycling over the sample transcripts; returns the ids."""
+    texts = [Path(p).read_text(encoding="utf-8").splitlines() for p in samples]
+    store = FixtureStore(root)
+    ids = []
+    for i in range(videos):
+        vid = f"LOAD{i:07d}"
+        lines = texts[i % len(texts)]
+        snippets = [{"text": ln, "start": n * 2.0, "duration": 2.0} for n, ln in enumerate(lines)]
+        store.save(vid, snippets, elapsed=0.0)
+        ids.append(vid)
+    return ids
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # nearest-rank percentile
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(samples):
+    lat = sorted(s["ms"] for s in samples)
+    errors = sum(1 for s in samples if not s["ok"])
+    codes = {}
+    for s in samples:
+        codes[str(s["status"])] = codes.get(str(s["status"]), 0) + 1
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "mean_ms": sum(lat) / len(lat) if lat else None,
+        "p50_ms": percentile(lat, 50),
+        "p95_ms": percentile(lat, 95),
+        "p99_ms": percentile(lat, 99),
+        "max_ms": lat[-1] if lat else None,
+        "status_codes": codes,
+    }
+
+
+class LoadTest:
+    def __init__(self, client, args, video_ids):
+        self.client = client
+        self.args = args
+        self.video_ids = video_ids
+        self.samples = []
+        self.output_urls = []
+        self._rng = random.Random(args.seed)
+        mix = dict(part.split("=") for part in args.mix.split(","))
+        self.mix = [(name, float(w)) for name, w in mix.items() if name in SCENARIOS and float(w) > 0]
+
+    def pick(self):
+        total = sum(w for _, w in self.mix)
+        r = self._rng.random() * total
+        for name, w in self.mix:
+            r -= w
+            if r <= 0:
+                return name
+        return self.mix[-1][0]
+
+    def params(self):
+        return {
+            "youtube_url": self._rng.choice(self.video_ids),
+            "write_files": str(self.args.write_files).lower(),
+            "use_perplexity": str(self.args.use_perplexity).lower(),
+        }
+
+    async def one(self, scenario, arrived=None):
+        if scenario == "outputs" and not self.output_urls:
+            # nothing written yet: produce some outputs first
+            scenario = "extract"
+        # open loop: latency counts from the arrival, including time queued
+        # behind the concurrency limit
+        start = arrived if arrived is not None else time.perf_counter()
+        status, ok = 0, False
+        try:
+            if scenario == "extract":
+                resp = await self.client.get("/extract/", params=self.params())
+                status, ok = resp.status_code, resp.status_code == 200
+                if ok and len(self.output_urls) < 1000:
+                    body = resp.json()
+                    self.output_urls.extend(v for k, v in body.items() if k.endswith("_url") and isinstance(v, str))
+            elif scenario == "async":
+                resp = await self.client.post("/extract_async", params=self.params())
+                status = resp.status_code
+                if status == 200:
+                    job_id = resp.json()["job_id"]
+                    deadline = time.perf_counter() + self.args.timeout
+                    while time.perf_counter() < deadline:
+                        st = await self.client.get(f"/status/{job_id}")
+                        status = st.status_code
+                        job_status = st.json().get("status") if st.status_code == 200 else "error"
+                        if job_status in ("done", "error"):
+                            ok = job_status == "done"
+                            break
+                        await asyncio.sleep(self.args.poll_interval)
+                    else:
+                        status = "timeout"
+            else:
+                resp = await self.client.get(self._rng.choice(self.output_urls))
+                status, ok = resp.status_code, resp.status_code == 200
+        except Exception as e:
+            status = type(e).__name__
+        self.samples.append({"scenario": scenario, "ms": (time.perf_counter() - start) * 1000.0, "status": status, "ok": ok})
+
+    async def run(self):
+        args = self.args
+        stop_at = time.perf_counter() + args.duration
+        budget = args.requests
+
+        def more():
+            nonlocal budget
+            if time.perf_counter() >= stop_at:
+                return False
+            if budget is not None:
+                if budget <= 0:
+                    return False
+                budget -= 1
+            return True
+
+        if args.rate:
+            sem = asyncio.Semaphore(args.concurrency)
+            tasks = set()
+
+            async def guarded(scenario, arrived):
+                async with sem:
+                    await self.one(scenario, arrived)
+
+            while more():
+                t = asyncio.create_task(guarded(self.pick(), time.perf_counter()))
+                tasks.add(t)
+                t.add_done_callback(tasks.discard)
+                await asyncio.sleep(self._rng.expovariate(args.rate))
+            if tasks:
+                await asyncio.gather(*tasks)
+        else:
+            async def client_loop():
+                while more():
+                    await self.one(self.pick())
+
+            await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+
+    def report(self, elapsed):
+        by = {}
+        for s in self.samples:
+            by.setdefault(s["scenario"], []).append(s)
+        return {
+            "config": {k: v for k, v in vars(self.args).items() if k != "prepare_fixtures"},
+            "elapsed_s": elapsed,
+            "requests": len(self.samples),
+            "throughput_rps": len(self.samples) / elapsed if elapsed else 0.0,
+            "overall": summarize(self.samples),
+            "scenarios": {name: summarize(v) for name, v in sorted(by.items())},
+        }
+
+
+def load_app(spec, perplexity_ms):
+    module_name, _, attr = spec.partition(":")
+    module = importlib.import_module(module_name)
+    if hasattr(module, "perplexity_summarize"):
+        def fake_summarize(text, *a, **kw):
+            time.sleep(perplexity_ms / 1000.0)
+            return f"stub summary of {len(text)} characters"
+        module.perplexity_summarize = fake_summarize
+    return getattr(module, attr or "app")
+
+
+async def main_async(args, video_ids):
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        transport, base_url = httpx.ASGITransport(app=load_app(args.app, args.perplexity_ms)), "http://loadtest"
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        test = LoadTest(client, args, video_ids)
+        start = time.perf_counter()
+        await test.run()
+        return test.report(time.perf_counter() - start)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Load-test the extraction API and report latency percentiles")
+    p.add_argument("--app", default="scripts.api_app_clean:app", help="module:attr of the ASGI app to drive in-process")
+    p.add_argument("--url", help="Target a running server instead of the in-process app")
+    p.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    p.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    p.add_argument("--concurrency", type=int, default=8, help="Clients (closed loop) or max in flight (open loop)")
+    p.add_argument("--rate", type=float, default=None, help="Open-loop arrival rate in requests/second")
+    p.add_argument("--mix", default="extract=1", help="Scenario weights, e.g. extract=3,async=1,outputs=1")
+    p.add_argument("--write-files", action=argparse.BooleanOptionalAction, default=False)
+    p.add_argument("--use-perplexity", action="store_true")
+    p.add_argument("--videos", type=int, default=50, help="Distinct video ids (controls cache hit rates)")
+    p.add_argument("--fetch-latency-ms", default="0", help="Replay latency: '50' or '20-80'")
+    p.add_argument("--fetch-error-rate", type=float, default=0.0, help="Injected transcript fetch failure rate")
+    p.add_argument("--perplexity-ms", type=float, default=200.0, help="Stubbed Perplexity latency")
+    p.add_argument("--poll-interval", type=float, default=0.05)
+    p.add_argument("--timeout", type=float, default=60.0)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--samples", nargs="*", help="Transcripts for fixtures (default: outputs/*_transcript.txt)")
+    p.add_argument("--prepare-fixtures", metavar="DIR", help="Only write replay fixtures to DIR and exit")
+    p.add_argument("-o", "--output", help="Write the JSON report here as well as to stdout")
+    args = p.parse_args()
+
+    if args.output:
+        args.output = str(Path(args.output).resolve())
+    samples = args.samples or sorted(str(x) for x in (REPO_ROOT / "outputs").glob("*_transcript.txt"))
+    if not samples:
+        p.error("no sample transcripts found; pass --samples")
+
+    if args.prepare_fixtures:
+        ids = prepare_fixtures(args.prepare_fixtures, args.videos, samples)
+        print(json.dumps({"fixture_dir": args.prepare_fixtures, "video_ids": ids}))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            video_ids = [f"LOAD{i:07d}" for i in range(args.videos)]
+        else:
+            video_ids = prepare_fixtures(Path(tmp) / "fixtures", args.videos, samples)
+            os.environ[providers.PROVIDER_ENV] = "replay"
+            os.environ[providers.FIXTURE_DIR_ENV] = str(Path(tmp) / "fixtures")
+            os.environ[providers.REPLAY_LATENCY_ENV] = args.fetch_latency_ms
+            os.environ[providers.REPLAY_ERROR_RATE_ENV] = str(args.fetch_error_rate)
+            os.environ[providers.REPLAY_SEED_ENV] = str(args.seed)
+            # the app writes outputs relative to the working directory
+            os.chdir(tmp)
+            (Path(tmp) / "outputs").mkdir()
+        report = asyncio.run(main_async(args, video_ids))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Train the zstd dictionary used for stored transcripts and QA artifacts.
+
+Samples ``outputs/`` (plain and already-compressed ``.zst`` files) and
+writes the dictionary; point `YT_ZSTD_DICT` at it and set
+`YT_STORE_COMPRESSION=zstd` to compress new artifacts with it. When
+replacing a dictionary, keep the old one listed after the new one in
+`YT_ZSTD_DICT` until the files compressed with it have expired.
+
+Example:
+    python scripts/train_zstd_dictionary.py -o outputs/.transcripts.dict
+"""
+import argparse
+import random
+from pathlib import Path
+
+from yt_transcript_tools.compression import DEFAULT_DICT_SIZE, DEFAULT_LEVEL, SAMPLE_BYTES, iter_samples, train_dictionary
+from yt_transcript_tools.storage import read_text
+
+PATTERNS = ("*_transcript.txt", "*_qa.txt", "*_questions.txt")
+
+
+def find_inputs(out_dir: Path):
+    paths = []
+    for pattern in PATTERNS:
+        for p in (pattern, pattern + ".zst"):
+            paths.extend(out_dir.glob(p))
+            paths.extend(out_dir.glob(f"*/{p}"))
+    return sorted(paths)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Train a zstd dictionary on stored transcripts and QA files")
+    p.add_argument("inputs", nargs="*", help="Files to sample (default: outputs/ transcripts, QA and question files)")
+    p.add_argument("-o", "--output", required=True, help="Dictionary file to write")
+    p.add_argument("--dict-size", type=int, default=DEFAULT_DICT_SIZE, help="Dictionary size in bytes")
+    p.add_argument("--sample-bytes", type=int, default=SAMPLE_BYTES, help="Size of each training sample")
+    p.add_argument("--max-files", type=int, default=5000, help="Sample at most this many files")
+    p.add_argument("--level", type=int, default=DEFAULT_LEVEL)
+    args = p.parse_args()
+
+    paths = [Path(x) for x in args.inputs] or find_inputs(Path("outputs"))
+    if len(paths) > args.max_files:
+        paths = random.Random(0).sample(paths, args.max_files)
+    samples = list(iter_samples((read_text(x).encode("utf-8") for x in paths), args.sample_bytes))
+    data = train_dictionary(samples, args.dict_size, level=args.level)
+    Path(args.output).write_bytes(data)
+    print(f"{args.output}: {len(data)} bytes from {len(samples)} samples of {len(paths)} files")
+
+
+if __name__ == "__main__":
+    main()
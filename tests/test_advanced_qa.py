@@ -0,0 +1,167 @@
+import threading
+
+import pytest
+
+from yt_transcript_tools import advanced_qa
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        self.calls.append(list(sentences))
+        return [[float(len(s))] for s in sentences]
+
+
+def test_batcher_returns_rows_in_caller_order():
+    model = FakeModel()
+    batcher = advanced_qa.EmbeddingBatcher(model, batch_size=4)
+    try:
+        vecs = batcher.encode(["ccc", "a", "bb"])
+    finally:
+        batcher.close()
+    assert vecs == [[3.0], [1.0], [2.0]]
+    # sentences are handed to the model sorted by length
+    assert model.calls == [["a", "bb", "ccc"]]
+
+
+def test_batcher_merges_concurrent_callers():
+    model = FakeModel()
+    batcher = advanced_qa.EmbeddingBatcher(model, batch_size=100, max_wait=0.2)
+    results = {}
+
+    def worker(n):
+        results[n] = batcher.encode(["x" * n] * 3)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(1, 6)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        batcher.close()
+    for n in range(1, 6):
+        assert results[n] == [[float(n)]] * 3
+    assert sum(len(c) for c in model.calls) == 15
+    assert len(model.calls) < 5
+
+
+def test_unknown_embedding_backend_is_rejected():
+    with pytest.raises(ValueError):
+        advanced_qa.get_embedding_backend("no-such-backend")
+
+
+def test_extract_qa_advanced_uses_given_backend():
+    pytest.importorskip("numpy")
+
+    class KeywordBackend:
+        def encode(self, sentences, batch_size=32, **kwargs):
+            return [[1.0, 0.0] if "python" in s.lower() else [0.0, 1.0] for s in sentences]
+
+    lines = ["What is Python?", "The weather is nice.", "Python is a language.", "Lunch was good."]
+    res = advanced_qa.extract_qa_advanced(lines, questions=["What is Python?"], backend=KeywordBackend())
+    assert res[0]["a"] == "Python is a language."
+
+
+def test_extract_qa_advanced_resolves_backend_by_name(monkeypatch):
+    pytest.importorskip("numpy")
+    from yt_transcript_tools import embeddings
+
+    monkeypatch.setitem(embeddings.EMBEDDING_BACKENDS, "keyword-test", lambda: KeywordBackend())
+    monkeypatch.setattr(embeddings, "_BACKENDS", {})
+    lines = ["What is Python?", "The weather is nice.", "Python is a language.", "Lunch was good."]
+    res = advanced_qa.extract_qa_advanced(lines, questions=["What is Python?"], backend="keyword-test", mode="embedding")
+    assert res[0]["a"] == "Python is a language."
+    with pytest.raises(ValueError):
+        advanced_qa.extract_qa_advanced(lines, questions=["What is Python?"], backend="no-such-backend")
+
+
+def _split_off_question_marks(text):
+    # a segmenter that puts each "?" in a sentence of its own
+    out = []
+    for line in text.splitlines():
+        out.extend(p.strip() for p in line.replace("?", ".?").split(".") if p.strip())
+    return out
+
+
+class KeywordBackend:
+    def encode(self, sentences, batch_size=32, **kwargs):
+        return [[1.0, 0.0] if "python" in s.lower() else [0.0, 1.0] for s in sentences]
+
+
+def test_question_found_when_segmenter_splits_off_question_mark(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(advanced_qa, "_segment_sentences", _split_off_question_marks)
+    lines = ["What is Python?", "The weather is nice.", "Python is a language.", "Lunch was good."]
+    res = advanced_qa.extract_qa_advanced(lines, questions=["What is Python?"], backend=KeywordBackend())
+    assert res[0]["a"] == "Python is a language"
+    heuristic = advanced_qa.extract_qa_advanced(lines, questions=["What is Python?"], mode="heuristic")
+    assert "Python is a language" in heuristic[0]["a"] and "What is Python" not in heuristic[0]["a"]
+
+
+def test_windowed_mode_finds_question_split_from_its_question_mark(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(advanced_qa, "_segment_sentences", _split_off_question_marks)
+    lines = ["What is Python?", "The weather is nice.", "Python is a language.", "Lunch was good."]
+    for chunk in (1, 2):
+        res = advanced_qa.extract_qa_advanced(iter(lines), questions=["What is Python?"], backend=KeywordBackend(), chunk_lines=chunk)
+        assert res[0]["a"] == "Python is a language"
+
+
+def _numbered_lines(n):
+    lines = []
+    for i in range(n):
+        lines.append(f"How does step {i} work?" if i % 5 == 0 else f"Step {i} detail number {i}.")
+    return lines
+
+
+def test_windowed_mode_matches_in_memory_heuristic(monkeypatch):
+    monkeypatch.setattr(advanced_qa, "_get_backend", lambda backend: None)
+    lines = _numbered_lines(60)
+    questions = [ln for ln in lines if ln.endswith("?")]
+    expected = advanced_qa.extract_qa_advanced(lines, questions=questions)
+    for chunk in (1, 4, 25):
+        got = advanced_qa.extract_qa_advanced(iter(lines), questions=questions, chunk_lines=chunk)
+        assert got == expected
+
+
+def test_windowed_mode_matches_in_memory_embeddings():
+    pytest.importorskip("numpy")
+
+    class LengthBackend:
+        def encode(self, sentences, batch_size=32, **kwargs):
+            return [[1.0, float(len(s) % 7)] for s in sentences]
+
+    lines = _numbered_lines(40)
+    questions = [ln for ln in lines if ln.endswith("?")]
+    expected = advanced_qa.extract_qa_advanced(lines, questions=questions, backend=LengthBackend())
+    got = advanced_qa.extract_qa_advanced(lines, questions=questions, backend=LengthBackend(), chunk_lines=3)
+    assert [r["a"] for r in got] == [r["a"] for r in expected]
+
+
+def test_bm25_mode_picks_lexical_answer_in_window():
+    lines = ["What is Python?", "The weather is nice.", "Python is a language.", "Lunch was good."]
+    res = advanced_qa.extract_qa_advanced(lines, questions=["What is Python?"], mode="bm25")
+    assert res[0]["a"] == "Python is a language." and res[0]["score"] > 0
+    windowed = advanced_qa.extract_qa_advanced(iter(lines), questions=["What is Python?"], mode="bm25", chunk_lines=1)
+    assert windowed[0]["a"] == "Python is a language."
+
+
+def test_bm25_mode_falls_back_to_next_sentence_without_overlap():
+    lines = ["Why bother?", "Because it is fun.", "Lunch was good."]
+    assert advanced_qa.extract_qa_advanced(lines, questions=["Why bother?"], mode="bm25")[0]["a"] == "Because it is fun."
+
+
+def test_qa_mode_selection(monkeypatch):
+    lines = ["What is Python?", "The weather is nice.", "Python is a language.", "Lunch was good."]
+    monkeypatch.setattr(advanced_qa, "_get_backend", lambda backend: None)
+    with pytest.raises(ValueError):
+        advanced_qa.extract_qa_advanced(lines, mode="fuzzy")
+    with pytest.raises(RuntimeError):
+        advanced_qa.extract_qa_advanced(lines, questions=["What is Python?"], mode="embedding")
+    monkeypatch.setenv(advanced_qa.QA_MODE_ENV, "bm25")
+    assert advanced_qa.extract_qa_advanced(lines, questions=["What is Python?"])[0]["a"] == "Python is a language."
+    heuristic = advanced_qa.extract_qa_advanced(lines, questions=["What is Python?"], mode="heuristic")
+    assert heuristic[0]["a"] == "The weather is nice. Python is a language. Lunch was good."
@@ -0,0 +1,130 @@
+import os
+import time
+
+import pytest
+
+from yt_transcript_tools.artifacts import ArtifactStore, parse_duration, parse_retention, parse_size
+from yt_transcript_tools.results import ResultCache
+
+
+def _age(store, name, seconds):
+    """Pretend `name` was written and last read `seconds` ago."""
+    t = time.time() - seconds
+    store._conn.execute("UPDATE artifacts SET created = ?, last_access = ? WHERE name = ?", (t, t, name))
+
+
+def test_parsers():
+    assert parse_size("10k") == 10240 and parse_size("2MB") == 2 * 1024 ** 2 and parse_size("512") == 512
+    assert parse_size("") is None and parse_size("0") is None
+    assert parse_duration("15m") == 900 and parse_duration("2d") == 172800 and parse_duration(None) is None
+    assert parse_retention("transcript=30d, summary=1h,qa=0") == {"transcript": 2592000, "summary": 3600, "qa": None}
+    with pytest.raises(ValueError):
+        parse_size("lots")
+    with pytest.raises(ValueError):
+        parse_retention("transcript")
+
+
+def test_put_shards_by_prefix_and_locates_legacy_files(tmp_path):
+    store = ArtifactStore(tmp_path)
+    path = store.put("FOSom6-IWV0_qa.txt", b"Q1: x\n")
+    assert path == tmp_path / "FO" / "FOSom6-IWV0_qa.txt" and path.read_bytes() == b"Q1: x\n"
+    (tmp_path / "old00000000_qa.txt").write_text("legacy")
+    assert store.locate("old00000000_qa.txt") == tmp_path / "old00000000_qa.txt"
+    assert store.locate("../etc_passwd") is None and store.locate(".artifacts.db") is None
+    assert store.stats()["files"] == 1
+    assert store.scan() == {"adopted": 1, "missing": 0}
+    assert store.stats()["files"] == 2
+
+
+def test_lru_evicts_least_recently_read(tmp_path):
+    store = ArtifactStore(tmp_path, max_files=3, min_age=0)
+    for i, name in enumerate(["aa_1.txt", "bb_1.txt", "cc_1.txt"]):
+        store.put(name, b"x" * 10)
+        _age(store, name, 100 - i)
+    store.record_hit("aa_1.txt")
+    store.put("dd_1.txt", b"x")
+    assert store.locate("bb_1.txt") is None
+    assert all(store.locate(n) for n in ("aa_1.txt", "cc_1.txt", "dd_1.txt"))
+    assert store.stats()["files"] == 3
+
+
+def test_lfu_evicts_least_hit_and_respects_byte_quota(tmp_path):
+    store = ArtifactStore(tmp_path, max_bytes=30, policy="lfu", min_age=0)
+    for name in ("aa_1.txt", "bb_1.txt", "cc_1.txt"):
+        store.put(name, b"x" * 10)
+    for _ in range(3):
+        store.record_hit("aa_1.txt")
+        store.record_hit("cc_1.txt")
+    store.record_hit("bb_1.txt")
+    store.put("dd_1.txt", b"x" * 15)
+    assert store.locate("bb_1.txt") is None and store.locate("aa_1.txt") is None
+    assert store.stats()["bytes"] == 25
+
+
+def test_recent_artifacts_are_not_evicted(tmp_path):
+    store = ArtifactStore(tmp_path, max_files=1, min_age=60)
+    store.put("aa_1.txt", b"x")
+    store.put("bb_1.txt", b"x")
+    assert store.locate("aa_1.txt") and store.locate("bb_1.txt")
+    _age(store, "aa_1.txt", 120)
+    assert store.evict() == 1 and store.locate("aa_1.txt") is None
+
+
+def test_artifacts_of_cached_results_survive_eviction_and_expiry(tmp_path):
+    cache = ResultCache(ttl=600)
+    store = ArtifactStore(tmp_path, max_files=1, ttl=60, min_age=cache.ttl)
+    store.put("aa_qa.txt", b"x")
+    cache.put("aa", {"qa_url": "/outputs/aa_qa.txt"})
+    _age(store, "aa_qa.txt", 300)
+    store.put("bb_qa.txt", b"x")
+    # over quota and idle past its TTL, but its cached result still links to it
+    assert store.compact() == {"expired": 0, "evicted": 0}
+    assert cache.get("aa") and store.locate("aa_qa.txt")
+    _age(store, "aa_qa.txt", 601)
+    assert store.compact()["expired"] == 1 and store.locate("aa_qa.txt") is None
+
+
+def test_api_keeps_artifacts_as_long_as_it_caches_results():
+    pytest.importorskip("fastapi")
+    import scripts.api_app_clean as api
+    from yt_transcript_tools import pipeline
+
+    assert api.ARTIFACTS.min_age >= pipeline.RESULTS.ttl
+
+
+def test_tiered_expiry(tmp_path):
+    store = ArtifactStore(tmp_path, ttl=3600, retention=parse_retention("transcript=7d,summary=60,perplexity_summary=0"))
+    names = ["vid_transcript.txt", "vid_summary.txt", "vid_perplexity_summary.txt", "vid_qa.txt"]
+    for name in names:
+        store.put(name, b"x")
+        _age(store, name, 7200)
+    assert store.compact()["expired"] == 2
+    assert [n for n in names if store.locate(n)] == ["vid_transcript.txt", "vid_perplexity_summary.txt"]
+
+
+def test_scan_forgets_deleted_files(tmp_path):
+    store = ArtifactStore(tmp_path)
+    path = store.put("aa_1.txt", b"xyz")
+    os.unlink(path)
+    assert store.scan() == {"adopted": 0, "missing": 1}
+    assert store.stats()["bytes"] == 0
+
+
+def test_api_serves_sharded_artifacts_and_records_hits(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import scripts.api_app_clean as api
+    from yt_transcript_tools import pipeline
+
+    monkeypatch.setattr(pipeline, "get_transcript_from_video_id", lambda vid: ["what is a shard?", "a small directory"])
+    client = TestClient(api.app)
+    r = client.get("/extract/?youtube_url=SHARDtest01&write_files=true")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["transcript_path"] == str(api.OUT_DIR / "SH" / "SHARDtest01_transcript.txt")
+    before = api.ARTIFACTS._hits.get("SHARDtest01_transcript.txt", [0, 0])[1]
+    got = client.get(body["transcript_url"])
+    assert got.status_code == 200 and got.text == "what is a shard?\na small directory"
+    assert api.ARTIFACTS._hits["SHARDtest01_transcript.txt"][1] == before + 1
+    assert client.get("/outputs/.artifacts.db").status_code == 404
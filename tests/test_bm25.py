@@ -0,0 +1,46 @@
+import pytest
+
+from yt_transcript_tools import bm25
+from yt_transcript_tools.bm25 import BM25Index, tokenize
+
+SENTENCES = [
+    "Welcome back to the channel.",
+    "What are Python decorators?",
+    "The weather today is lovely.",
+    "Decorators wrap a function to extend its behaviour.",
+    "Lunch was good.",
+]
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("What are the Decorators of classes?") == ["decorator", "class"]
+    assert tokenize("it's a process") == ["process"]
+
+
+def test_best_ranks_lexical_match_in_window():
+    index = BM25Index(SENTENCES)
+    assert index.best("What are Python decorators?", 2, 5) == (3, pytest.approx(index.scores("decorators")[3]))
+    assert index.best("unrelated question", 2, 5) == (None, 0.0)
+    assert index.best("lunch")[0] == 4
+
+
+def test_range_scores_match_full_scores():
+    index = BM25Index(SENTENCES * 3)
+    full = list(index.scores("python decorators lunch"))
+    assert index.range_scores("python decorators lunch", 4, 12) == pytest.approx(full[4:12])
+
+
+def test_rare_terms_weigh_more():
+    index = BM25Index(["python code", "python tests", "python decorators", "decorators explained"])
+    scores = index.scores("python decorators")
+    assert scores[2] == max(scores)
+    assert scores[3] > scores[0]
+
+
+def test_pure_python_fallback_matches_numpy(monkeypatch):
+    pytest.importorskip("numpy")
+    expected = list(BM25Index(SENTENCES).scores("python decorators"))
+    monkeypatch.setattr(bm25, "NUMPY_AVAILABLE", False)
+    index = BM25Index(SENTENCES)
+    assert index.scores("python decorators") == pytest.approx(expected)
+    assert index.best("python decorators")[0] == 1
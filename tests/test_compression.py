@@ -0,0 +1,150 @@
+import base64
+import hashlib
+import random
+
+import pytest
+
+zstandard = pytest.importorskip("zstandard")
+
+from yt_transcript_tools import compression
+from yt_transcript_tools.artifacts import ArtifactStore
+from yt_transcript_tools.compression import DCZ_MAGIC, ZstdCodec, iter_samples, train_dictionary
+from yt_transcript_tools.extractors import extract_questions
+from yt_transcript_tools.storage import find_stored, iter_lines, read_text, write_stored
+
+WORDS = "what why how is the a video transcript question answer speaker today we talk about compression dictionary".split()
+
+
+def _transcript(seed: int, lines: int = 60) -> bytes:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(lines):
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+        out.append(line + ("?" if line.startswith(("what", "why", "how")) else ""))
+    return ("\n".join(out) + "\n").encode("utf-8")
+
+
+@pytest.fixture
+def dictionary(tmp_path, monkeypatch):
+    data = train_dictionary(list(iter_samples((_transcript(i) for i in range(100)), 512)), 4096)
+    path = tmp_path / "transcripts.dict"
+    path.write_bytes(data)
+    monkeypatch.setenv(compression.ZSTD_DICT_ENV, str(path))
+    return data
+
+
+def test_dictionary_roundtrip_and_unknown_dictionary(dictionary):
+    codec = compression.read_codec()
+    data = _transcript(1000)
+    packed = codec.compress(data)
+    assert codec.decompress(packed) == data
+    assert compression.frame_dict_id(packed) == codec.dictionary_id != 0
+    assert len(packed) < len(ZstdCodec().compress(data))
+    # frames without a dictionary still decode
+    assert codec.decompress(ZstdCodec().compress(data)) == data
+    with pytest.raises(RuntimeError):
+        ZstdCodec().decompress(packed)
+
+
+def test_get_codec_follows_env(monkeypatch):
+    monkeypatch.delenv(compression.STORE_COMPRESSION_ENV, raising=False)
+    assert compression.get_codec() is None
+    monkeypatch.setenv(compression.STORE_COMPRESSION_ENV, "lz4")
+    with pytest.raises(ValueError):
+        compression.get_codec()
+
+
+def test_storage_reads_compressed_files_as_streams(tmp_path, dictionary):
+    data = _transcript(7)
+    path = write_stored(tmp_path / "vid_transcript.txt", data, compression.read_codec())
+    assert path.name == "vid_transcript.txt.zst" and find_stored(tmp_path / "vid_transcript.txt") == path
+    assert read_text(path) == data.decode("utf-8")
+    assert list(iter_lines(path)) == [ln.strip() for ln in data.decode("utf-8").splitlines()]
+    assert compression.content_size(path) == len(data)
+
+    plain = write_stored(tmp_path / "plain_transcript.txt", data)
+    assert extract_questions(path, tmp_path / "q1.txt") == extract_questions(plain, tmp_path / "q2.txt") > 0
+    assert (tmp_path / "q1.txt").read_text() == (tmp_path / "q2.txt").read_text()
+
+
+def test_refetch_replaces_the_other_variant(tmp_path, dictionary, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from yt_transcript_tools import fetcher
+    from yt_transcript_tools.export import ParquetExporter, export_outputs
+
+    snippets = [{"text": "what is new?", "start": 0.0, "duration": 1.0}, {"text": "the refetched text", "start": 1.0, "duration": 1.0}]
+    monkeypatch.setattr(fetcher, "guarded_fetch", lambda vid, fetch: snippets)
+    out = tmp_path / "out" / "REFETCHtest_transcript.txt"
+    out.parent.mkdir()
+    out.write_text("stale plain copy\n")
+    monkeypatch.setenv(compression.STORE_COMPRESSION_ENV, "zstd")
+    path = fetcher.fetch_transcript("REFETCHtest", out)
+    assert path.name.endswith(".zst") and not out.exists() and find_stored(out) == path
+
+    root = tmp_path / "parquet"
+    assert export_outputs(out.parent, ParquetExporter(root)) == {"added": 1, "skipped": 0}
+    table = pq.read_table(next((root / "transcripts").rglob("*.parquet")))
+    assert table.column("text").to_pylist() == ["what is new?", "the refetched text"]
+
+    monkeypatch.delenv(compression.STORE_COMPRESSION_ENV)
+    assert fetcher.fetch_transcript("REFETCHtest", out) == out and not path.exists()
+
+
+def test_artifact_store_compresses_under_the_plain_name(tmp_path, dictionary):
+    root = tmp_path / "outputs"
+    store = ArtifactStore(root, codec=compression.read_codec())
+    path = store.put("ZSTDtest001_qa.txt", _transcript(3))
+    assert path == root / "ZS" / "ZSTDtest001_qa.txt.zst"
+    assert store.locate("ZSTDtest001_qa.txt") == path
+    assert store.stats()["bytes"] == path.stat().st_size
+
+    # switching compression off replaces the compressed copy
+    plain = ArtifactStore(root).put("ZSTDtest001_qa.txt", b"plain\n")
+    assert not path.exists() and plain.read_bytes() == b"plain\n"
+    assert store.scan() == {"adopted": 0, "missing": 0}
+    store.close()
+
+
+def test_outputs_negotiates_zstd_dcz_and_identity(tmp_path, dictionary, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import scripts.api_app_clean as api
+    from yt_transcript_tools import pipeline
+
+    codec = compression.read_codec()
+    monkeypatch.setattr(api.ARTIFACTS, "codec", codec)
+    monkeypatch.setattr(pipeline, "get_transcript_from_video_id", lambda vid: ["what is zstd?", "a fast compressor"] * 50)
+    client = TestClient(api.app)
+    body = client.get("/extract/?youtube_url=ZSTDtest002&write_files=true").json()
+    url = body["transcript_url"]
+    assert api.ARTIFACTS.locate("ZSTDtest002_transcript.txt").name.endswith(".zst")
+    text = "\n".join(["what is zstd?", "a fast compressor"] * 50)
+
+    # no zstd: decompressed on the fly, same ETag as the content, immutable ?v= URL
+    r = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert r.status_code == 200 and r.text == text and "content-encoding" not in r.headers
+    assert r.headers["content-length"] == str(len(text)) and "immutable" in r.headers["cache-control"]
+    assert r.headers["content-type"].startswith("text/plain")
+    etag = r.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # the dictionary frame cannot go out as plain zstd, but as dcz to a client holding the dictionary
+    d = client.get("/compression-dictionary")
+    assert d.content == dictionary and d.headers["use-as-dictionary"] == 'match="/outputs/*"'
+    available = ":" + base64.b64encode(hashlib.sha256(dictionary).digest()).decode() + ":"
+    r = client.get(url, headers={"Accept-Encoding": "zstd, dcz", "Available-Dictionary": available})
+    assert r.headers["content-encoding"] == "dcz" and r.headers["etag"] == etag[:-1] + '-dcz"'
+    raw = r.content  # httpx does not decode dcz
+    assert raw[:8] == DCZ_MAGIC and raw[8:40] == hashlib.sha256(dictionary).digest()
+    assert codec.decompress(raw[40:]).decode("utf-8") == text
+    r = client.get(url, headers={"Accept-Encoding": "zstd"})
+    assert "content-encoding" not in r.headers and r.text == text
+
+    # a frame without a dictionary is sent as-is to zstd clients
+    monkeypatch.setattr(api.ARTIFACTS, "codec", ZstdCodec())
+    client.get("/extract/?youtube_url=ZSTDtest003&write_files=true")
+    path = api.ARTIFACTS.locate("ZSTDtest003_transcript.txt")
+    with client.stream("GET", "/outputs/ZSTDtest003_transcript.txt", headers={"Accept-Encoding": "zstd"}) as r:
+        assert r.headers["content-encoding"] == "zstd" and b"".join(r.iter_raw()) == path.read_bytes()
+    assert client.get("/outputs/ZSTDtest003_transcript.txt", headers={"Accept-Encoding": "zstd"}).text == text
@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from yt_transcript_tools import deadline
+from yt_transcript_tools.deadline import Deadline, StageTimings, plan_extraction
+
+PRIORS = {
+    "analysis:none": 0.0001,
+    "analysis:heuristic": 0.001,
+    "analysis:bm25": 0.002,
+    "analysis:embedding": 0.01,
+    "perplexity": 2.0,
+}
+
+
+def test_ewma_tracks_recent_costs_per_unit():
+    t = StageTimings(alpha=0.5, priors={"perplexity": 5.0})
+    assert t.estimate("perplexity") == 5.0 and t.estimate("unknown") == 0.0
+    t.observe("analysis:bm25", 1.0, units=1000)
+    assert t.estimate("analysis:bm25", 2000) == pytest.approx(2.0)
+    t.observe("analysis:bm25", 3.0, units=1000)
+    assert t.estimate("analysis:bm25", 1000) == pytest.approx(2.0)
+    assert t.snapshot()["analysis:bm25"]["observed"] == 2
+
+
+def test_deadline_counts_down():
+    now = [100.0]
+    d = Deadline(1.5, clock=lambda: now[0])
+    now[0] = 101.0
+    assert d.remaining() == pytest.approx(0.5) and not d.expired()
+    now[0] = 102.0
+    assert d.expired()
+
+
+def test_plan_keeps_everything_that_fits():
+    plan = plan_extraction(10.0, 100, "embedding", True, StageTimings(priors=PRIORS))
+    assert (plan.qa_mode, plan.use_perplexity, plan.partial) == ("embedding", True, False)
+
+
+def test_plan_degrades_embeddings_then_qa_then_perplexity():
+    t = StageTimings(priors=PRIORS)
+    # 1000 lines: embedding 10s, heuristic 1s, questions only 0.1s, perplexity 2s
+    plan = plan_extraction(3.5, 1000, "embedding", True, t)
+    assert (plan.qa_mode, plan.use_perplexity) == ("heuristic", True)
+    assert plan.degraded == [{"stage": "qa", "requested": "embedding", "used": "heuristic"}]
+
+    plan = plan_extraction(2.5, 1000, "embedding", True, t)
+    assert (plan.qa_mode, plan.use_perplexity) == (None, True)
+    assert plan.degraded == [{"stage": "qa", "requested": "embedding", "used": None}]
+
+    plan = plan_extraction(0.5, 1000, "bm25", True, t)
+    assert (plan.qa_mode, plan.use_perplexity) == (None, False)
+    assert [d["stage"] for d in plan.degraded] == ["qa", "perplexity"]
+
+
+def test_plan_skips_steps_that_do_not_save_time():
+    t = StageTimings(priors={**PRIORS, "analysis:auto": PRIORS["analysis:heuristic"]})
+    plan = plan_extraction(0.5, 1000, "auto", False, t)
+    # auto costs what the heuristic costs: go straight to skipping QA
+    assert plan.degraded == [{"stage": "qa", "requested": "auto", "used": None}]
+
+
+def test_budgeted_extract_is_partial_and_upgrades(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import scripts.api_app_clean as api
+    from yt_transcript_tools import pipeline
+
+    monkeypatch.delenv("YT_JOB_QUEUE", raising=False)
+    monkeypatch.setattr(deadline, "_TIMINGS", StageTimings(priors={**PRIORS, "analysis:heuristic": 10.0, "analysis:none": 0.0}))
+    monkeypatch.setattr(pipeline, "get_transcript_from_video_id", lambda vid: ["what is a deadline?", "a point in time"] * 5)
+    pipeline.RESULTS.clear()
+    client = TestClient(api.app)
+    url = "/extract/?youtube_url=BUDGETtest1&write_files=false&qa_mode=heuristic&budget_ms=200"
+
+    r = client.get(url + "&upgrade=true&fields=questions")
+    body = r.json()
+    assert r.status_code == 200 and body["partial"] is True
+    assert body["degraded"] == [{"stage": "qa", "requested": "heuristic", "used": None}]
+    assert body["questions"] and "qa_pairs" not in body
+    # the upgrade runs on the async job scheduler
+    for _ in range(200):
+        job = client.get(f"/status/{body['upgrade_job_id']}").json()
+        if job["status"] == "done":
+            break
+        time.sleep(0.01)
+    assert job["status"] == "done" and job["result"]["qa_pairs"]
+
+    again = client.get(url).json()
+    assert again["partial"] is False and again["qa_pairs"] == job["result"]["qa_pairs"]
+    pipeline.RESULTS.clear()
+
+
+def test_degraded_run_keeps_full_quality_artifacts(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import scripts.api_app_clean as api
+    from yt_transcript_tools import pipeline
+
+    monkeypatch.setattr(pipeline, "get_transcript_from_video_id", lambda vid: ["what is a deadline?", "a point in time"] * 5)
+    pipeline.RESULTS.clear()
+    client = TestClient(api.app)
+    url = "/extract/?youtube_url=BUDGETtest2&write_files=true&qa_mode=heuristic"
+    full = client.get(url).json()
+    qa_before = api.ARTIFACTS.locate("BUDGETtest2_qa.txt").read_bytes()
+    summary_before = api.ARTIFACTS.locate("BUDGETtest2_summary.txt").read_bytes()
+
+    pipeline.RESULTS.clear()
+    monkeypatch.setattr(deadline, "_TIMINGS", StageTimings(priors={**PRIORS, "analysis:heuristic": 10.0, "analysis:none": 0.0}))
+    partial = client.get(url + "&budget_ms=200").json()
+    assert partial["partial"] is True and "qa_url" not in partial and partial["qa_path"] is None
+    assert partial["transcript_url"] == full["transcript_url"]
+    assert api.ARTIFACTS.locate("BUDGETtest2_qa.txt").read_bytes() == qa_before
+    assert api.ARTIFACTS.locate("BUDGETtest2_summary.txt").read_bytes() == summary_before
+    pipeline.RESULTS.clear()
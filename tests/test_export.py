@@ -0,0 +1,126 @@
+import json
+
+import pytest
+
+from yt_transcript_tools import export
+from yt_transcript_tools.export import ParquetExporter, export_outputs, parse_qa_text
+from yt_transcript_tools.providers import FixtureStore
+
+
+def test_parse_qa_text_reads_pairs_and_continuations():
+    text = "Q1: What is X?\nA1: X is a thing\nthat wraps\n\nQ2: Why?\nA2: \n\n"
+    assert parse_qa_text(text) == [
+        {"q": "What is X?", "a": "X is a thing\nthat wraps", "score": None},
+        {"q": "Why?", "a": "", "score": None},
+    ]
+
+
+def _write_outputs(out, vid, lines, questions=None, qa=None):
+    (out / f"{vid}_transcript.txt").write_text("\n".join(lines), encoding="utf-8")
+    if questions is not None:
+        (out / f"{vid}_questions.txt").write_text("\n".join(questions), encoding="utf-8")
+    if qa is not None:
+        (out / f"{vid}_qa.txt").write_text(qa, encoding="utf-8")
+
+
+def test_export_appends_only_new_videos(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "outputs"
+    out.mkdir()
+    _write_outputs(out, "vid00000001", ["what is x?", "x is y"], ["what is x?"], "Q1: what is x?\nA1: x is y\n\n")
+    root = tmp_path / "parquet"
+    assert export_outputs(out, ParquetExporter(root)) == {"added": 1, "skipped": 0}
+
+    _write_outputs(out, "vid00000002", ["hello"])
+    assert export_outputs(out, ParquetExporter(root)) == {"added": 1, "skipped": 1}
+
+    files = sorted((root / "transcripts").rglob("*.parquet"))
+    assert len(files) == 2 and all(f.parent.name.startswith("ingest_date=") for f in files)
+    rows = [r for f in files for r in pq.read_table(f).to_pylist()]
+    assert [(r["video_id"], r["line"], r["text"]) for r in rows] == [
+        ("vid00000001", 0, "what is x?"), ("vid00000001", 1, "x is y"), ("vid00000002", 0, "hello"),
+    ]
+    qa = [r for f in (root / "qa_pairs").rglob("*.parquet") for r in pq.read_table(f).to_pylist()]
+    assert qa == [{"video_id": "vid00000001", "idx": 1, "question": "what is x?", "answer": "x is y", "score": None}]
+    manifest = json.loads((root / export.MANIFEST_NAME).read_text())
+    assert set(manifest["videos"]) == {"vid00000001", "vid00000002"}
+
+
+def test_exporter_keeps_timings_scores_and_batches(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    root = tmp_path / "parquet"
+    exporter = ParquetExporter(root, batch_videos=2)
+    snippets = [{"text": "what is x?", "start": 0.0, "duration": 1.5}, {"text": "x is y", "start": 1.5, "duration": 2.0}]
+    assert exporter.add("a", snippets, ["what is x?"], [{"q": "what is x?", "a": "x is y", "score": 0.5}])
+    assert not exporter.add("a", snippets)
+    assert not list(root.rglob("*.parquet"))
+    exporter.add("b", ["hi"])  # second video fills the batch and flushes
+    table = pq.read_table(next((root / "transcripts").rglob("*.parquet")))
+    assert table.column("start").to_pylist() == [0.0, 1.5, None]
+    qa = pq.read_table(next((root / "qa_pairs").rglob("*.parquet")))
+    assert qa.column("score").to_pylist() == [0.5]
+    assert exporter.flush() == 0
+
+
+def test_export_outputs_takes_timings_from_fixtures(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "outputs"
+    out.mkdir()
+    _write_outputs(out, "vid00000003", ["one", "two"])
+    FixtureStore(tmp_path / "fx").save("vid00000003", [{"text": "one", "start": 1.0, "duration": 1.0}, {"text": "two", "start": 2.0, "duration": 1.0}], 0.1)
+    export_outputs(out, ParquetExporter(tmp_path / "parquet"), fixture_dir=tmp_path / "fx")
+    table = pq.read_table(next((tmp_path / "parquet" / "transcripts").rglob("*.parquet")))
+    assert table.column("start").to_pylist() == [1.0, 2.0]
+
+
+def test_exporter_requires_pyarrow(monkeypatch):
+    monkeypatch.setattr(export, "PYARROW_AVAILABLE", False)
+    with pytest.raises(RuntimeError):
+        ParquetExporter("unused")
+
+
+def test_export_reads_sharded_outputs(tmp_path):
+    pytest.importorskip("pyarrow")
+    out = tmp_path / "outputs"
+    (out / "vi").mkdir(parents=True)
+    _write_outputs(out / "vi", "vid00000004", ["what is y?", "y is z"], ["what is y?"])
+    exporter = ParquetExporter(tmp_path / "parquet")
+    assert export_outputs(out, exporter) == {"added": 1, "skipped": 0}
+    assert exporter.exported("vid00000004")
+
+
+def test_exporters_sharing_a_root_merge_the_manifest(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    root = tmp_path / "parquet"
+    first, second = ParquetExporter(root), ParquetExporter(root)
+    first.add("a", ["one"])
+    second.add("b", ["two"])
+    second.add("a", ["one again"])  # first has not flushed yet
+    assert first.flush() == 1
+    assert second.exported("a")
+    assert second.flush() == 1  # only "b": "a" was exported by the other process
+    manifest = json.loads((root / export.MANIFEST_NAME).read_text())
+    assert set(manifest["videos"]) == {"a", "b"}
+    rows = [r for f in (root / "transcripts").rglob("*.parquet") for r in pq.read_table(f).to_pylist()]
+    assert sorted((r["video_id"], r["text"]) for r in rows) == [("a", "one"), ("b", "two")]
+    assert not first.add("b", ["two"])
+
+
+def test_pipeline_exports_snippet_timings(tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from yt_transcript_tools import pipeline
+    from yt_transcript_tools.downloader import TranscriptLines
+
+    def fetch(vid):
+        lines = TranscriptLines(["what is x?", "x is y"])
+        lines.snippets = [{"text": "what is x?", "start": 0.0, "duration": 1.5}, {"text": "x is y", "start": 1.5, "duration": 2.0}]
+        return lines
+
+    exporter = ParquetExporter(tmp_path / "parquet")
+    monkeypatch.setattr(pipeline, "get_transcript_from_video_id", fetch)
+    monkeypatch.setattr(pipeline, "get_exporter", lambda: exporter)
+    pipeline.run_extraction("EXPORTtest1", False, False)
+    exporter.flush()
+    table = pq.read_table(next((tmp_path / "parquet" / "transcripts").rglob("*.parquet")))
+    assert table.column("start").to_pylist() == [0.0, 1.5]
+    assert table.column("duration").to_pylist() == [1.5, 2.0]
@@ -39,3 +39,30 @@ def test_extract_qa_roundtrip(tmp_path):
     assert count >= 1
     s = out.read_text()
     assert "What is X" in s or "How do you run it" in s
+
+
+def test_iter_extraction_events_is_incremental():
+    pulled = []
+
+    def lines():
+        for ln in ["what is a module", "it is a single python file", "more detail here"] + ["filler"] * 50:
+            pulled.append(ln)
+            yield ln
+
+    events = extractors.iter_extraction_events(lines())
+    first = next(events)
+    assert first == {"type": "question", "line": 0, "text": "what is a module it is a single python file more detail here?"}
+    assert len(pulled) <= 4
+    qa = next(events)
+    assert qa["type"] == "qa" and qa["a"].startswith("filler")
+
+
+def test_iter_extraction_events_matches_extract_qa(tmp_path):
+    sample = "What is X\nX is a thing\n\nHow do you run it\nwith a command\nwhy not\n"
+    p = tmp_path / "transcript.txt"
+    p.write_text(sample)
+    out = tmp_path / "qa.txt"
+    count = extractors.extract_qa(p, out)
+    qa = [e for e in extractors.iter_extraction_events(sample.splitlines()) if e["type"] == "qa"]
+    assert len(qa) == count
+    assert f"Q1: {qa[0]['q']}" in out.read_text()
@@ -0,0 +1,71 @@
+from yt_transcript_tools import fetcher
+
+
+class FakeApi:
+    snippets = []
+
+    def fetch(self, video_id):
+        return list(self.snippets)
+
+
+def _snip(text, start):
+    return {"text": text, "start": start, "duration": 1.0}
+
+
+def test_tail_appends_only_new_snippets(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "get_provider", FakeApi)
+    out = tmp_path / "transcript.txt"
+    FakeApi.snippets = [_snip("hello there", 0.0), _snip("what is a module", 1.0)]
+    first = fetcher.fetch_transcript_tail("vid", out)
+    assert first.first_line == 0 and len(first.new_lines) == 2
+
+    FakeApi.snippets += [_snip("a single file", 2.0), _snip("how do I run it", 3.0), _snip("with python", 4.0)]
+    second = fetcher.fetch_transcript_tail("vid", out)
+    assert second.first_line == 2
+    assert second.new_lines == ["a single file", "how do I run it", "with python"]
+    assert second.context_lines == ["hello there", "what is a module"]
+    assert out.read_text().splitlines() == [s["text"] for s in FakeApi.snippets]
+
+    assert fetcher.fetch_transcript_tail("vid", out).new_lines == []
+
+
+def test_extract_tail_skips_context_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "get_provider", FakeApi)
+    out = tmp_path / "transcript.txt"
+    FakeApi.snippets = [_snip("what is a module", 0.0), _snip("a single file", 1.0)]
+    qa = tmp_path / "qa.txt"
+    questions = tmp_path / "questions.txt"
+    assert fetcher.extract_tail(fetcher.fetch_transcript_tail("vid", out), questions, qa) == 1
+
+    FakeApi.snippets += [_snip("ok", 2.0), _snip("how do I run it", 3.0), _snip("with python", 4.0)]
+    assert fetcher.extract_tail(fetcher.fetch_transcript_tail("vid", out), questions, qa) == 1
+    text = qa.read_text()
+    assert "Q1: what is a module" in text and "Q2: how do I run it" in text
+
+
+def test_extract_tail_completes_answer_after_previous_end(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "get_provider", FakeApi)
+    out, questions, qa = tmp_path / "transcript.txt", tmp_path / "questions.txt", tmp_path / "qa.txt"
+    FakeApi.snippets = [_snip("what is a module", 0.0), _snip("a single file", 1.0), _snip("What is a decorator?", 2.0)]
+    assert fetcher.extract_tail(fetcher.fetch_transcript_tail("vid", out), questions, qa) == 2
+    assert "A2: [No answer found]" in qa.read_text()
+
+    FakeApi.snippets += [_snip("A decorator wraps a function.", 3.0), _snip("how do I use one", 4.0), _snip("put it above", 5.0)]
+    assert fetcher.extract_tail(fetcher.fetch_transcript_tail("vid", out), questions, qa) == 1
+    # same files as a single poll over all the lines
+    full = tmp_path / "full"
+    full.mkdir()
+    assert fetcher.extract_tail(fetcher.fetch_transcript_tail("vid", full / "t.txt"), full / "q.txt", full / "qa.txt") == 3
+    assert "A decorator wraps a function." in qa.read_text() and "A2: [No answer found]" not in qa.read_text()
+    assert qa.read_text() == (full / "qa.txt").read_text()
+    assert questions.read_text() == (full / "q.txt").read_text()
+
+
+def test_extract_tail_without_earlier_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetcher, "get_provider", FakeApi)
+    out, questions, qa = tmp_path / "transcript.txt", tmp_path / "questions.txt", tmp_path / "qa.txt"
+    FakeApi.snippets = [_snip("alpha beta gamma delta epsilon zeta eta", 0.0), _snip("tell me", 1.0)]
+    assert fetcher.extract_tail(fetcher.fetch_transcript_tail("vid", out), questions, qa) == 0
+    FakeApi.snippets += [_snip("why that is", 2.0), _snip("because of reasons", 3.0)]
+    assert fetcher.extract_tail(fetcher.fetch_transcript_tail("vid", out), questions, qa) == 1
+    assert qa.read_text().startswith("Q1: ") and "because of reasons" in qa.read_text()
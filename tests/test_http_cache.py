@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+
+from yt_transcript_tools import http_cache
+
+
+def test_etag_matching_ignores_weak_prefix_and_encoding_suffix():
+    etag = http_cache.content_etag(b"hello")
+    assert http_cache.etag_matches(etag, etag)
+    assert http_cache.etag_matches('"other", W/' + etag, etag)
+    assert http_cache.etag_matches(http_cache.encoded_etag(etag, "gzip"), etag)
+    assert http_cache.etag_matches("*", etag)
+    assert not http_cache.etag_matches('"other"', etag)
+    assert not http_cache.etag_matches(None, etag)
+
+
+def test_negotiate_encoding_respects_q_zero():
+    assert http_cache.negotiate_encoding("gzip, deflate") == "gzip"
+    assert http_cache.negotiate_encoding("gzip;q=0, identity") is None
+    assert http_cache.negotiate_encoding(None) is None
+    assert gzip.decompress(http_cache.compress(b"x" * 10, "gzip")) == b"x" * 10
+
+
+def test_extract_json_revalidates_and_compresses(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import scripts.api_app_clean as api
+    from yt_transcript_tools import pipeline
+
+    monkeypatch.setattr(pipeline, "get_transcript_from_video_id", lambda vid: ["what is a module", "a python file"] * 200)
+    client = TestClient(api.app)
+    url = "/extract/?youtube_url=dQw4w9WgXcQ&write_files=false"
+    r = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.json()["video_id"] == "dQw4w9WgXcQ"
+    r2 = client.get(url, headers={"If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 304 and r2.content == b""
+
+
+def test_outputs_use_content_etags_and_immutable_versions():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import scripts.api_app_clean as api
+
+    client = TestClient(api.app)
+    r = client.get("/outputs/FOSom6-IWV0_summary.txt")
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert etag == http_cache.content_etag(r.content)
+    assert r.headers["cache-control"] == http_cache.REVALIDATE_CACHE_CONTROL
+    assert client.get("/outputs/FOSom6-IWV0_summary.txt", headers={"If-None-Match": etag}).status_code == 304
+    versioned = client.get(f"/outputs/FOSom6-IWV0_summary.txt?v={http_cache.artifact_version(etag)}")
+    assert versioned.headers["cache-control"] == http_cache.IMMUTABLE_CACHE_CONTROL
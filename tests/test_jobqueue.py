@@ -0,0 +1,140 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from yt_transcript_tools.jobqueue import SQLiteJobQueue, open_queue
+from yt_transcript_tools.queue_worker import DEFAULT_WORKER_APP, QueueWorker
+
+
+def test_claim_and_complete(tmp_path):
+    q = open_queue(f"sqlite:///{tmp_path / 'jobs.db'}")
+    job_id = q.enqueue("extract", {"video_id": "abc"})
+    assert q.get(job_id)["status"] == "queued"
+    job = q.claim("w1")
+    assert job["job_id"] == job_id and job["payload"] == {"video_id": "abc"} and job["attempts"] == 1
+    assert q.claim("w2") is None
+    assert q.complete(job_id, "w1", "done", {"ok": True})
+    got = q.get(job_id)
+    assert (got["status"], got["result"]) == ("done", {"ok": True})
+    assert q.get("missing") is None
+
+
+def test_concurrent_workers_never_claim_the_same_job(tmp_path):
+    path = tmp_path / "jobs.db"
+    q = SQLiteJobQueue(path)
+    ids = {q.enqueue("extract", {"n": i}) for i in range(60)}
+    claimed = []
+
+    def worker(name):
+        # each worker process has its own connection
+        mine = SQLiteJobQueue(path)
+        while True:
+            job = mine.claim(name)
+            if job is None:
+                return
+            claimed.append(job["job_id"])
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == sorted(ids)
+
+
+def test_stale_jobs_are_requeued_then_failed(tmp_path):
+    q = SQLiteJobQueue(tmp_path / "jobs.db")
+    job_id = q.enqueue("extract", {})
+    q.claim("dead")
+    assert q.requeue_stale(stale_after=60) == 0
+    time.sleep(0.05)
+    assert q.requeue_stale(stale_after=0.01, max_attempts=2) == 1
+    assert q.get(job_id)["status"] == "queued"
+    # the dead worker's late result is not recorded over the requeued job
+    assert not q.complete(job_id, "dead", "done", {})
+    q.claim("w2")
+    time.sleep(0.05)
+    q.requeue_stale(stale_after=0.01, max_attempts=2)
+    job = q.get(job_id)
+    assert job["status"] == "error" and "worker lost" in job["result"]["error"]
+
+
+def test_heartbeat_keeps_running_jobs(tmp_path):
+    q = SQLiteJobQueue(tmp_path / "jobs.db")
+    q.register_worker("w1", "host", 1)
+    job_id = q.enqueue("extract", {})
+    q.claim("w1")
+    time.sleep(0.05)
+    q.heartbeat("w1")
+    assert q.requeue_stale(stale_after=0.04) == 0
+    assert q.get(job_id)["status"] == "running"
+    assert q.stats()["jobs"] == {"running": 1}
+
+
+def test_worker_drains_queue(tmp_path):
+    q = SQLiteJobQueue(tmp_path / "jobs.db")
+    ids = [q.enqueue("extract", {"n": i}) for i in range(5)]
+
+    def handler(payload):
+        if payload["n"] == 3:
+            raise ValueError("boom")
+        return {"status": "done", "result": payload["n"] * 2}
+
+    worker = QueueWorker(q, handler, worker_id="w1", concurrency=2, heartbeat_interval=0.01)
+    assert worker.run(drain=True) == 5
+    results = [q.get(i) for i in ids]
+    assert [r["result"] for r in results] == [0, 2, 4, {"error": "boom"}, 8]
+    assert [r["status"] for r in results].count("error") == 1
+    assert q.stats()["workers"] == []
+
+
+def test_worker_survives_results_it_cannot_store(tmp_path):
+    q = SQLiteJobQueue(tmp_path / "jobs.db")
+    ids = [q.enqueue("extract", {"n": i}) for i in range(3)]
+
+    def handler(payload):
+        # a set is not JSON-serialisable
+        return {"status": "done", "result": {1} if payload["n"] == 1 else payload["n"]}
+
+    worker = QueueWorker(q, handler, worker_id="w1", heartbeat_interval=0.01)
+    assert worker.run(drain=True) == 3
+    results = [q.get(i) for i in ids]
+    assert [r["status"] for r in results] == ["done", "error", "done"]
+    assert "could not store result" in results[1]["result"]["error"]
+
+
+def test_api_enqueues_and_reads_shared_status(monkeypatch, tmp_path):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import scripts.api_app_clean as api
+    from yt_transcript_tools import pipeline
+
+    monkeypatch.setenv("YT_JOB_QUEUE", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(pipeline, "get_transcript_from_video_id", lambda vid: ["what is a queue?", "a list of jobs."])
+    client = TestClient(api.app)
+    job_id = client.post("/extract_async?youtube_url=queue123456&write_files=false").json()["job_id"]
+    assert client.get(f"/status/{job_id}").json() == {"status": "queued", "result": None}
+
+    worker = QueueWorker(api.get_job_queue(), pipeline.run_job, worker_id="node-2")
+    assert worker.run(drain=True) == 1
+    body = client.get(f"/status/{job_id}").json()
+    assert body["status"] == "done" and body["result"]["video_id"] == "queue123456"
+    assert client.get("/status/unknown").status_code == 404
+
+
+def test_default_handler_does_not_import_the_web_app(tmp_path):
+    # run from elsewhere: installed workers have no checkout on sys.path
+    code = (
+        "import sys; from yt_transcript_tools.queue_worker import load_handler; "
+        f"h = load_handler({DEFAULT_WORKER_APP!r}); "
+        "print(h.__module__, any(m.split('.')[0] in ('fastapi', 'starlette', 'scripts') for m in sys.modules))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": root}
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["yt_transcript_tools.pipeline", "False"]
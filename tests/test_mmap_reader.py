@@ -0,0 +1,44 @@
+from yt_transcript_tools import mmap_reader
+from yt_transcript_tools.extractors import extract_qa, extract_questions
+from yt_transcript_tools.mmap_reader import MappedTranscript
+
+
+def test_lines_match_splitlines(tmp_path):
+    text = "  first line \r\nsecond\n\n\tthird with ünïcode\nlast without newline"
+    path = tmp_path / "t.txt"
+    path.write_bytes(text.encode("utf-8"))
+    with MappedTranscript(path) as lines:
+        assert list(lines) == [ln.strip() for ln in text.splitlines()]
+        assert len(lines) == 5
+        assert lines.head(2) == ["first line", "second"]
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    with MappedTranscript(path) as lines:
+        assert list(lines) == []
+        assert len(lines) == 0
+
+
+def test_small_blocks_and_page_release(tmp_path, monkeypatch):
+    monkeypatch.setattr(mmap_reader, "RELEASE_BYTES", 4096)
+    monkeypatch.setattr(mmap_reader, "DECODE_BYTES", 100)
+    text = "".join(f"line {i} ß\n" if i % 7 else "x" * 150 + "\n" for i in range(20000))
+    path = tmp_path / "big.txt"
+    path.write_text(text, encoding="utf-8")
+    with MappedTranscript(path) as lines:
+        assert list(lines) == text.splitlines()
+
+
+def test_extractors_give_same_output_with_mmap(tmp_path):
+    src = tmp_path / "transcript.txt"
+    src.write_text(
+        "Welcome everyone\nWhat is a closure\nit keeps state\nfrom the enclosing scope\n\n"
+        "How do we test it?\nwith pytest\nThanks\n",
+        encoding="utf-8",
+    )
+    for fn in (extract_questions, extract_qa):
+        a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+        assert fn(src, a) == fn(src, b, use_mmap=True)
+        assert a.read_bytes() == b.read_bytes()
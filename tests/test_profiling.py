@@ -0,0 +1,118 @@
+import pstats
+import threading
+import time
+
+import pytest
+
+from yt_transcript_tools import profiling
+from yt_transcript_tools.profiling import StackSampler, profile_scope, profiled, start_request_profile, end_request_profile
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+def test_profiled_cprofile_writes_stats(tmp_path, capsys):
+    path = tmp_path / "run.prof"
+    with profiled(str(path)):
+        _busy(0.01)
+    stats = pstats.Stats(str(path))
+    assert any(func[2] == "_busy" for func in stats.stats)
+    assert "Profile written" in capsys.readouterr().err
+
+
+def test_profiled_without_path_is_a_no_op(tmp_path):
+    with profiled(None):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sampling_profile_is_in_collapsed_format(tmp_path):
+    path = tmp_path / "run.collapsed"
+    with profiled(str(path), "sampling"):
+        _busy(0.1)
+    lines = path.read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("_busy (test_profiling.py" in ln for ln in lines)
+
+
+def test_sampler_only_records_registered_threads():
+    sampler = StackSampler()
+    other = threading.Thread(target=_busy, args=(0.1,))
+    other.start()
+    sampler.add_thread()
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+    other.join()
+    assert sampler.counts
+    assert not any("_busy" in stack for stack in sampler.counts)
+
+
+def test_profile_scope_records_into_active_request_profile(tmp_path):
+    with profile_scope():
+        pass  # no active profile
+    prof, token = start_request_profile("cprofile")
+    try:
+        with profile_scope():
+            _busy(0.01)
+    finally:
+        end_request_profile(token)
+        prof.close()
+    path = prof.save(tmp_path, "req")
+    assert path.name == "req.prof"
+    assert any(func[2] == "_busy" for func in pstats.Stats(str(path)).stats)
+    with pytest.raises(ValueError):
+        start_request_profile("perf")
+
+
+def test_tracemalloc_report_lists_allocation_sites():
+    try:
+        assert profiling.tracemalloc_report()["started"]
+        keep = [bytearray(1000) for _ in range(500)]
+        report = profiling.tracemalloc_report(limit=5)
+        assert not report["started"]
+        assert len(report["top"]) <= 5
+        assert any("test_profiling.py" in site["site"][0] for site in report["top"])
+        del keep
+    finally:
+        assert profiling.stop_tracemalloc()
+
+
+def test_api_profiles_requests_and_reports_allocations(monkeypatch, tmp_path):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import scripts.api_app_clean as api
+    from yt_transcript_tools import pipeline
+
+    monkeypatch.setattr(pipeline, "get_transcript_from_video_id", lambda vid: ["what is a profile", "a record of time spent"] * 50)
+    monkeypatch.setenv(profiling.PROFILE_DIR_ENV, str(tmp_path))
+    client = TestClient(api.app)
+    url = "/extract/?youtube_url=prof1234567&write_files=false"
+
+    monkeypatch.delenv(api.ADMIN_TOKEN_ENV, raising=False)
+    assert client.get(url, headers={"X-Profile": "1"}).status_code == 403
+    assert client.get("/admin/tracemalloc").status_code == 403
+
+    monkeypatch.setenv(api.ADMIN_TOKEN_ENV, "secret")
+    admin = {"X-Admin-Token": "secret"}
+    r = client.get(url, headers={"X-Profile": "cprofile", **admin})
+    assert r.status_code == 200
+    name = r.headers["x-profile-id"]
+    assert (tmp_path / name).is_file() and name.endswith(".prof")
+    assert client.get(f"/admin/profiles/{name}", headers=admin).status_code == 200
+    assert client.get(url, headers={"X-Profile": "perf", **admin}).status_code == 400
+
+    try:
+        assert client.get("/admin/tracemalloc", headers=admin).json()["started"]
+        report = client.get("/admin/tracemalloc?limit=3", headers=admin).json()
+        assert len(report["top"]) <= 3
+    finally:
+        assert client.get("/admin/tracemalloc?stop=true", headers=admin).json() == {"stopped": True}
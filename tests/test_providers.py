@@ -0,0 +1,91 @@
+import pytest
+
+from yt_transcript_tools import downloader, providers
+from yt_transcript_tools.providers import FixtureStore, RecordingProvider, ReplayError, ReplayProvider
+from yt_transcript_tools.resilience import CircuitBreaker, NegativeCache, classify_error, guarded_fetch
+
+
+class Snippet:
+    def __init__(self, text, start):
+        self.text, self.start, self.duration = text, start, 1.5
+
+
+class FakeLive:
+    def fetch(self, video_id):
+        if video_id == "disabled000":
+            err = type("TranscriptsDisabled", (Exception,), {})
+            raise err("subtitles are disabled")
+        return [Snippet("what is a module", 0.0), Snippet("a single file", 1.5)]
+
+
+def test_record_then_replay(tmp_path):
+    store = FixtureStore(tmp_path)
+    rec = RecordingProvider(FakeLive(), store)
+    assert [s.text for s in rec.fetch("abcdefghijk")] == ["what is a module", "a single file"]
+    with pytest.raises(Exception):
+        rec.fetch("disabled000")
+
+    replay = ReplayProvider(store)
+    assert replay.fetch("abcdefghijk") == [
+        {"text": "what is a module", "start": 0.0, "duration": 1.5},
+        {"text": "a single file", "start": 1.5, "duration": 1.5},
+    ]
+    with pytest.raises(ReplayError) as exc:
+        replay.fetch("disabled000")
+    assert classify_error(exc.value) == "disabled"
+    with pytest.raises(ReplayError) as exc:
+        replay.fetch("missing0000")
+    assert exc.value.kind == "not_found"
+
+
+def test_replay_latency_and_error_injection(tmp_path):
+    store = FixtureStore(tmp_path)
+    RecordingProvider(FakeLive(), store).fetch("abcdefghijk")
+    slept = []
+    replay = ReplayProvider(store, latency=(0.01, 0.02), error_rate=0.5, seed=1, sleep=slept.append)
+    outcomes = []
+    for _ in range(40):
+        try:
+            replay.fetch("abcdefghijk")
+            outcomes.append("ok")
+        except ReplayError as e:
+            assert e.kind == "rate_limited"
+            outcomes.append("err")
+    assert 5 < outcomes.count("err") < 35
+    assert len(slept) == 40 and all(0.01 <= d <= 0.02 for d in slept)
+    # same seed, same sequence
+    again = ReplayProvider(store, latency=(0.01, 0.02), error_rate=0.5, seed=1, sleep=lambda d: None)
+    seq = []
+    for _ in range(40):
+        try:
+            again.fetch("abcdefghijk")
+            seq.append("ok")
+        except ReplayError:
+            seq.append("err")
+    assert seq == outcomes
+
+    # injected failures go through the resilience layer like real ones
+    cache = NegativeCache()
+    failing = ReplayProvider(store, error_rate=1.0)
+    with pytest.raises(Exception) as exc:
+        guarded_fetch("abcdefghijk", failing.fetch, cache=cache, breaker=CircuitBreaker())
+    assert exc.value.kind == "rate_limited"
+    assert cache.get("abcdefghijk").kind == "rate_limited"
+
+
+def test_entry_points_use_configured_provider(tmp_path, monkeypatch):
+    RecordingProvider(FakeLive(), FixtureStore(tmp_path)).fetch("abcdefghijk")
+    monkeypatch.setenv(providers.PROVIDER_ENV, "replay")
+    monkeypatch.setenv(providers.FIXTURE_DIR_ENV, str(tmp_path))
+    monkeypatch.setenv(providers.REPLAY_LATENCY_ENV, "0-1")
+    assert isinstance(providers.get_provider(), ReplayProvider)
+    lines = downloader.get_transcript_from_video_id("abcdefghijk")
+    assert lines == ["what is a module", "a single file"]
+    assert [s["start"] for s in lines.snippets] == [0.0, 1.5]
+
+
+def test_parse_latency():
+    assert providers.parse_latency("50") == (0.05, 0.05, False)
+    assert providers.parse_latency("20-80") == (0.02, 0.08, False)
+    assert providers.parse_latency("recorded") == (None, None, True)
+    assert providers.parse_latency(None) == (None, None, False)
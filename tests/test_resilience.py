@@ -0,0 +1,72 @@
+import pytest
+
+from yt_transcript_tools import resilience
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TranscriptsDisabled(Exception):
+    pass
+
+
+class TooManyRequests(Exception):
+    pass
+
+
+def test_classify_error_by_class_name():
+    assert resilience.classify_error(TranscriptsDisabled("x")) == "disabled"
+    assert resilience.classify_error(TooManyRequests("x")) == "rate_limited"
+    assert resilience.classify_error(ValueError("x")) == "error"
+
+
+def test_negative_cache_serves_failures_until_ttl():
+    clock = Clock()
+    cache = resilience.NegativeCache(clock=clock)
+    breaker = resilience.CircuitBreaker(clock=clock)
+    calls = []
+
+    def fetch(video_id):
+        calls.append(video_id)
+        raise TranscriptsDisabled("disabled by uploader")
+
+    for _ in range(3):
+        with pytest.raises(resilience.TranscriptUnavailable) as exc:
+            resilience.guarded_fetch("vid", fetch, cache, breaker)
+        assert exc.value.kind == "disabled"
+    assert calls == ["vid"]
+    assert breaker.state == "closed"
+
+    clock.now += resilience.NEGATIVE_TTLS["disabled"] + 1
+    with pytest.raises(resilience.TranscriptUnavailable):
+        resilience.guarded_fetch("vid", fetch, cache, breaker)
+    assert calls == ["vid", "vid"]
+
+
+def test_circuit_breaker_opens_and_probes():
+    clock = Clock()
+    cache = resilience.NegativeCache(ttls={}, clock=clock)
+    breaker = resilience.CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    calls = []
+
+    def failing(video_id):
+        calls.append(video_id)
+        raise TooManyRequests("slow down")
+
+    for vid in ("a", "b"):
+        with pytest.raises(resilience.TranscriptUnavailable):
+            resilience.guarded_fetch(vid, failing, cache, breaker)
+    assert breaker.state == "open"
+    with pytest.raises(resilience.CircuitOpenError):
+        resilience.guarded_fetch("c", failing, cache, breaker)
+    assert calls == ["a", "b"]
+
+    clock.now += 10
+    assert breaker.state == "half_open"
+    assert resilience.guarded_fetch("d", lambda v: ["ok"], cache, breaker) == ["ok"]
+    assert breaker.state == "closed"
@@ -0,0 +1,55 @@
+import pytest
+
+from yt_transcript_tools import results
+
+
+RESULT = {
+    "status": "ok",
+    "video_id": "dQw4w9WgXcQ",
+    "transcript": [f"line {i}" for i in range(25)],
+    "questions": ["what is it?"],
+    "qa_pairs": [{"q": f"q{i}", "a": f"a{i}", "score": 0.0} for i in range(7)],
+    "perplexity_summary": None,
+}
+
+
+def test_fields_projection_keeps_identity_fields():
+    out = results.shape_result(RESULT, results.parse_fields("questions"))
+    assert out == {"status": "ok", "video_id": "dQw4w9WgXcQ", "questions": ["what is it?"]}
+
+
+def test_cursor_pagination_walks_all_items():
+    seen_lines, seen_qa, cursor = [], [], None
+    pages = 0
+    while True:
+        out = results.shape_result(RESULT, None, limit=10, cursor=cursor)
+        seen_lines += out["transcript"]
+        seen_qa += out["qa_pairs"]
+        pages += 1
+        cursor = out["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == 3
+    assert seen_lines == RESULT["transcript"]
+    assert seen_qa == RESULT["qa_pairs"]
+    assert out["page"]["transcript"] == {"offset": 20, "count": 5, "total": 25}
+
+
+def test_stale_or_garbage_cursor_is_rejected():
+    cursor = results.shape_result(RESULT, None, limit=10)["next_cursor"]
+    changed = dict(RESULT, transcript=RESULT["transcript"][:-1])
+    with pytest.raises(ValueError):
+        results.shape_result(changed, None, limit=10, cursor=cursor)
+    with pytest.raises(ValueError):
+        results.shape_result(RESULT, None, limit=10, cursor="not-a-cursor")
+
+
+def test_result_cache_expires_and_evicts():
+    now = [0.0]
+    cache = results.ResultCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)
+    assert cache.get("a") is None and cache.get("c") == 3
+    now[0] = 11
+    assert cache.get("b") is None
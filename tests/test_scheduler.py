@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+
+import pytest
+
+from yt_transcript_tools import scheduler
+from yt_transcript_tools.scheduler import ClientPolicy, FairScheduler, QuotaExceeded, TokenBucket, load_client_config
+
+
+def _wait_until(cond, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > end:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+def test_token_bucket_refills_at_rate():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, burst=2, clock=lambda: now[0])
+    assert bucket.take() == 0 and bucket.take() == 0
+    assert bucket.take() == pytest.approx(0.5)
+    now[0] = 0.5
+    assert bucket.take() == 0
+    assert TokenBucket(rate=None).take(1000) == 0
+
+
+def test_quota_and_queue_limits_raise():
+    s = FairScheduler(1, clients={"k1": ClientPolicy("bulk", rate=1.0, burst=2)}, anonymous=ClientPolicy("anonymous", max_queued=1))
+    gate = threading.Event()
+    try:
+        s.submit("k1", gate.wait)
+        s.submit("k1", gate.wait)
+        with pytest.raises(QuotaExceeded) as e:
+            s.submit("k1", gate.wait)
+        assert e.value.retry_after > 0
+        _wait_until(lambda: s.stats()["clients"]["bulk"]["running"] == 1)
+        s.submit(None, gate.wait)
+        with pytest.raises(QuotaExceeded):
+            s.submit(None, gate.wait)
+        stats = s.stats()["clients"]
+        assert stats["bulk"]["rejected"] == 1 and stats["anonymous"]["queued"] == 1
+    finally:
+        gate.set()
+        s.shutdown()
+
+
+def test_small_client_is_not_stuck_behind_bulk_backlog():
+    s = FairScheduler(1)
+    order = []
+    gate = threading.Event()
+    try:
+        s.submit("bulk-key", gate.wait)
+        for i in range(50):
+            s.submit("bulk-key", order.append, f"bulk{i}")
+        s.submit(None, order.append, "ui")
+        gate.set()
+        _wait_until(lambda: len(order) == 51)
+        assert order.index("ui") <= 1
+        stats = s.stats()["clients"]
+        bulk = next(v for k, v in stats.items() if k.startswith("key-"))
+        assert bulk["completed"] == 51 and stats["anonymous"]["wait_ms"]["p50"] is not None
+    finally:
+        s.shutdown()
+
+
+def test_weights_share_workers_proportionally():
+    s = FairScheduler(1, clients={"a": ClientPolicy("heavy", weight=3), "b": ClientPolicy("light")})
+    order = []
+    gate = threading.Event()
+    try:
+        s.submit("a", gate.wait)
+        for i in range(30):
+            s.submit("a", order.append, "a")
+            s.submit("b", order.append, "b")
+        gate.set()
+        _wait_until(lambda: len(order) == 60)
+        assert order[:20].count("a") == 15
+    finally:
+        s.shutdown()
+
+
+def test_concurrency_cap_per_client():
+    s = FairScheduler(4, clients={"k": ClientPolicy("capped", max_concurrency=2)})
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def job():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+
+    try:
+        for _ in range(10):
+            s.submit("k", job)
+        _wait_until(lambda: s.stats()["clients"]["capped"]["completed"] == 10)
+        assert peak[0] == 2
+    finally:
+        s.shutdown()
+
+
+def test_load_client_config(tmp_path):
+    path = tmp_path / "clients.json"
+    path.write_text(json.dumps({"clients": {"secret": {"name": "ingest", "rate": 2}}, "anonymous": {"weight": 4}}))
+    config = load_client_config(path)
+    assert config["clients"]["secret"] == ClientPolicy("ingest", rate=2)
+    assert config["anonymous"].weight == 4
+    path.write_text(json.dumps({"clients": {"secret": {"speed": 2}}}))
+    with pytest.raises(ValueError):
+        load_client_config(path)
+
+
+def test_extract_async_returns_429_over_quota(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import scripts.api_app_clean as api
+    from yt_transcript_tools import pipeline
+
+    monkeypatch.delenv("YT_JOB_QUEUE", raising=False)
+    monkeypatch.setenv("YT_ADMIN_TOKEN", "t0ken")
+    s = FairScheduler(2, clients={"bulk-key": ClientPolicy("bulk", rate=0.5, burst=1)})
+    monkeypatch.setattr(scheduler, "_SCHEDULER", s)
+    monkeypatch.setattr(pipeline, "get_transcript_from_video_id", lambda vid: ["what is fair?", "equal shares"])
+    client = TestClient(api.app)
+    url = "/extract_async?youtube_url=FAIRtest001&write_files=false"
+    try:
+        assert client.post(url, headers={"X-API-Key": "bulk-key"}).status_code == 200
+        r = client.post(url, headers={"X-API-Key": "bulk-key"})
+        assert r.status_code == 429 and int(r.headers["retry-after"]) >= 1
+        assert client.post(url).status_code == 200
+        stats = client.get("/admin/scheduler", headers={"X-Admin-Token": "t0ken"}).json()
+        assert stats["clients"]["bulk"]["rejected"] == 1 and stats["clients"]["anonymous"]["submitted"] == 1
+        assert "bulk-key" not in json.dumps(stats)
+    finally:
+        s.shutdown()
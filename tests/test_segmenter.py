@@ -0,0 +1,71 @@
+import pytest
+
+from yt_transcript_tools import segmenter
+from yt_transcript_tools.question_extractor import extract_questions, extract_questions_many
+from yt_transcript_tools.segmenter import RuleSegmenter, get_segmenter, segment_sentences
+
+
+def test_rules_join_caption_lines_and_split_on_punctuation():
+    text = "Welcome to the course\nwith Dr. Smith. He is the best\ndeveloper, e.g. for Python. Ready?\n"
+    assert RuleSegmenter().segment(text) == [
+        "Welcome to the course with Dr. Smith.",
+        "He is the best developer, e.g. for Python.",
+        "Ready?",
+    ]
+
+
+def test_rules_drop_cues_and_split_speaker_turns():
+    text = "[Music] so let's start\n>> what is a decorator\n>> it wraps a function [Applause]"
+    assert RuleSegmenter().segment(text) == ["so let's start", "what is a decorator", "it wraps a function"]
+
+
+def test_rules_cut_unpunctuated_runs_at_openers_and_max_words():
+    seg = RuleSegmenter(min_words=3, soft_words=8, max_words=10)
+    text = "this is a long run of words with no punctuation so what is the answer here " + "x " * 25
+    out = seg.segment(text)
+    assert out[0] == "this is a long run of words with no punctuation"
+    # "what" does not start another sentence: "so" alone is below min_words
+    assert out[1] == "so what is the answer here x x x x"
+    assert all(len(s.split()) <= 10 for s in out)
+    assert " ".join(out).split() == text.split()
+
+
+def test_get_segmenter_selection(monkeypatch):
+    with pytest.raises(ValueError):
+        get_segmenter("nope")
+    monkeypatch.setenv(segmenter.SEGMENTER_ENV, "regex")
+    assert get_segmenter().name == "regex"
+    if not segmenter.SPACY_AVAILABLE:
+        # an unavailable opt-in backend falls back to the rules
+        monkeypatch.setenv(segmenter.SEGMENTER_ENV, "spacy")
+        assert segment_sentences("One. Two.") == ["One.", "Two."]
+
+
+def test_extract_questions_uses_shared_segmenter():
+    text = "Welcome everyone.\nWhat is a\nclosure? It keeps state.\nHow do I use it"
+    assert extract_questions(text) == ["What is a closure?", "How do I use it"]
+
+
+def test_chunk_text_respects_max_length():
+    text = "\n".join(f"line {i} with some words" for i in range(50))
+    chunks = segmenter._chunk_text(text, 100)
+    assert "".join(chunks) == text
+    assert all(len(c) < 100 for c in chunks)
+    # cuts happen at line breaks
+    assert all(c.endswith("words") for c in chunks[:-1])
+
+
+def test_extract_questions_many_matches_single():
+    texts = ["Hi there. What is a closure? It keeps state.", "", "How do I test it? With pytest."]
+    assert extract_questions_many(texts) == [extract_questions(t) for t in texts]
+
+
+def test_spacy_segment_many_chunks_long_texts():
+    pytest.importorskip("spacy")
+    seg = segmenter.SpacySegmenter()
+    seg.nlp.max_length = 60
+    texts = ["First sentence here. Second one follows.\nThird is on a new line. Fourth ends it.", "Short text."]
+    out = seg.segment_many(texts, batch_size=2)
+    assert len(out) == 2
+    assert " ".join(out[0]).split() == texts[0].split()
+    assert out[1] == ["Short text."]
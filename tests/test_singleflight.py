@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+
+import pytest
+
+from yt_transcript_tools.singleflight import SingleFlight
+from yt_transcript_tools import storage
+from yt_transcript_tools.storage import atomic_write_text
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"status": "ok"}
+
+    results = []
+
+    def caller():
+        results.append(flight.do("vid", compute))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=caller) for _ in range(5)]
+    for t in followers:
+        t.start()
+    while flight._calls["vid"].waiters < 5:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader] + followers:
+        t.join()
+    assert calls == [1]
+    assert len(results) == 6 and all(r is results[0] for r in results)
+    assert flight.in_flight() == 0
+
+
+def test_errors_propagate_and_are_not_cached():
+    flight = SingleFlight()
+
+    def boom():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("vid", boom)
+    assert flight.do("vid", lambda: 42) == 42
+
+
+def test_atomic_write_text_replaces_without_leftovers(tmp_path):
+    target = tmp_path / "vid_qa.txt"
+    target.write_text("old")
+    atomic_write_text(target, "new contents")
+    assert target.read_text() == "new contents"
+    assert [p.name for p in tmp_path.iterdir()] == ["vid_qa.txt"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_atomic_write_uses_umask_mode_or_keeps_existing_mode(tmp_path):
+    new = atomic_write_text(tmp_path / "new_qa.txt", "x")
+    assert new.stat().st_mode & 0o777 == 0o666 & ~storage._UMASK
+    kept = tmp_path / "kept_qa.txt"
+    kept.write_text("old")
+    kept.chmod(0o640)
+    atomic_write_text(kept, "new")
+    assert kept.stat().st_mode & 0o777 == 0o640
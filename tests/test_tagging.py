@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from yt_transcript_tools.tagging import KeywordTagger, _PyAutomaton, tag_file
+
+
+def test_tag_lines_counts_and_lines():
+    tagger = KeywordTagger(["Python", "machine learning", "Java", "C++"])
+    lines = [
+        "Today we talk about python and JavaScript",
+        "then some machine",
+        "learning with Python, and c++!",
+    ]
+    tags = tagger.tag_lines(lines)
+    assert tags["Python"] == {"count": 2, "lines": [0, 2]}
+    # split across a caption line break, reported where it starts
+    assert tags["machine learning"] == {"count": 1, "lines": [1]}
+    assert tags["C++"] == {"count": 1, "lines": [2]}
+    # word boundaries: no match inside "JavaScript"
+    assert "Java" not in tags
+
+
+def test_overlapping_keywords_all_reported():
+    tagger = KeywordTagger(["deep learning", "learning", "deep learning models"])
+    tags = tagger.tag_lines(["deep learning models are learning"])
+    assert tags["deep learning"]["count"] == 1
+    assert tags["deep learning models"]["count"] == 1
+    assert tags["learning"]["count"] == 2
+
+
+def test_pure_python_automaton_matches_suffixes():
+    auto = _PyAutomaton(["he", "she", "his", "hers"])
+    found = sorted((end, w) for end, w in auto.iter("ushers"))
+    assert found == [(3, "he"), (3, "she"), (5, "hers")]
+
+
+def test_from_file_and_tag_file(tmp_path):
+    kw = tmp_path / "keywords.txt"
+    kw.write_text("# comment\nFastAPI\n\nDocker\n", encoding="utf-8")
+    tagger = KeywordTagger.from_file(kw)
+    assert len(tagger) == 2
+    src = tmp_path / "t.txt"
+    src.write_text("we deploy fastapi\nwith docker and Docker compose\n", encoding="utf-8")
+    out = tmp_path / "tags.json"
+    assert tag_file(tagger, src, out) == 2
+    tags = json.loads(out.read_text(encoding="utf-8"))
+    assert tags["Docker"] == {"count": 2, "lines": [1]}
+
+
+def test_tag_file_reads_compressed_transcripts(tmp_path):
+    pytest.importorskip("zstandard")
+    from yt_transcript_tools.compression import ZstdCodec
+    from yt_transcript_tools.storage import write_stored
+
+    src = write_stored(tmp_path / "t.txt", b"we deploy fastapi\nwith docker\n", ZstdCodec())
+    assert src.name == "t.txt.zst"
+    out = tmp_path / "tags.json"
+    assert tag_file(KeywordTagger(["FastAPI", "Docker"]), src, out) == 2
+    assert json.loads(out.read_text(encoding="utf-8"))["Docker"] == {"count": 1, "lines": [1]}
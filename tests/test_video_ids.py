@@ -0,0 +1,62 @@
+import pytest
+
+from yt_transcript_tools import video_ids
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=42",
+        "https://youtu.be/dQw4w9WgXcQ?si=abc",
+        "https://www.youtube.com/embed/dQw4w9WgXcQ",
+        "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ?start=3",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://www.youtube.com/live/dQw4w9WgXcQ?feature=share",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLabcdefghijklmnop",
+    ],
+)
+def test_parse_video_id(url):
+    assert video_ids.parse_video_id(url) == "dQw4w9WgXcQ"
+
+
+def test_parse_video_id_rejects_invalid():
+    for bad in ("", "https://www.youtube.com/watch?v=short", "https://www.youtube.com/playlist?list=PLabcdefghijklmnop"):
+        with pytest.raises(ValueError):
+            video_ids.parse_video_id(bad)
+
+
+def test_parse_playlist_id():
+    assert video_ids.parse_playlist_id("https://www.youtube.com/playlist?list=PLabcdefghijklmnop") == "PLabcdefghijklmnop"
+    assert video_ids.parse_playlist_id("PLabcdefghijklmnop") == "PLabcdefghijklmnop"
+    assert video_ids.parse_playlist_id("https://youtu.be/dQw4w9WgXcQ") is None
+
+
+def test_parse_many_skips_noise_and_dedupes():
+    lines = ["# header\n", "\n", "https://youtu.be/dQw4w9WgXcQ\n", "not a url\n", "dQw4w9WgXcQ\n", "https://www.youtube.com/shorts/aaaaaaaaaaa\n"]
+    assert list(video_ids.parse_many(lines)) == ["dQw4w9WgXcQ", "dQw4w9WgXcQ", "aaaaaaaaaaa"]
+    assert list(video_ids.parse_many(lines, unique=True)) == ["dQw4w9WgXcQ", "aaaaaaaaaaa"]
+    with pytest.raises(ValueError):
+        list(video_ids.parse_many(lines, strict=True))
+
+
+def test_failed_playlist_expansion_is_reported_per_entry(monkeypatch, tmp_path, capsys):
+    import scripts.fetch_transcript as cli
+
+    def expand(url):
+        if "PLbroken" in url:
+            raise RuntimeError("Could not read playlist")
+        return ["bbbbbbbbbbb"]
+
+    monkeypatch.setattr(video_ids, "expand_playlist", expand)
+    monkeypatch.setattr(cli, "fetch_transcript", lambda vid, out: out)
+    lines = ["aaaaaaaaaaa", "PLbrokenplaylist00", "PLgoodplaylist0000"]
+    with pytest.raises(RuntimeError):
+        list(video_ids.parse_many(lines, expand_playlists=True))
+    errors = []
+    assert list(video_ids.parse_many(lines, expand_playlists=True, on_error=lambda s, e: errors.append(s))) == ["aaaaaaaaaaa", "bbbbbbbbbbb"]
+    assert errors == ["PLbrokenplaylist00"]
+    assert cli.fetch_many(lines, tmp_path) == 1
+    out = capsys.readouterr().out
+    assert "PLbrokenplaylist00: Could not read playlist" in out and "Fetched 2 transcripts" in out
@@ -0,0 +1,50 @@
+import os
+import threading
+import time
+
+import pytest
+
+from yt_transcript_tools import workers
+from yt_transcript_tools.workers import NLPWorkerPool, PoolBusy, analyze_transcript
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+LINES = ["Welcome to the talk.", "What is a closure?", "It keeps state from its scope.", "Thanks."]
+
+
+def test_analyze_transcript_in_process():
+    res = analyze_transcript(LINES)
+    assert res["questions"] == ["What is a closure?"]
+    assert [p["q"] for p in res["qa_pairs"]] == ["What is a closure?"]
+
+
+def test_pool_runs_analysis_in_worker_processes():
+    pool = NLPWorkerPool(2, preload=False)
+    try:
+        pids = pool.warm()
+        assert os.getpid() not in pids
+        assert pool.analyze(LINES) == analyze_transcript(LINES)
+    finally:
+        pool.shutdown()
+
+
+def test_pool_bounds_pending_tasks():
+    pool = NLPWorkerPool(1, max_pending=1, preload=False)
+    try:
+        first = pool.submit(_sleep, 0.5)
+        with pytest.raises(PoolBusy):
+            pool.submit(_sleep, 0, timeout=0.05)
+        first.result()
+        # the slot is released once the task is done
+        assert pool.run(_sleep, 0, timeout=1) != os.getpid()
+    finally:
+        pool.shutdown()
+
+
+def test_pool_from_env(monkeypatch):
+    monkeypatch.delenv(workers.NLP_WORKERS_ENV, raising=False)
+    assert workers.pool_from_env() is None
@@ -1,25 +1,19 @@
-from yt_transcript_tools.fetcher import fetch_transcript
-import re
+import argparse
 
-def extract_video_id(url_or_id):
-    m = re.search(r"[?&]v=([\w-]{11})", url_or_id)
-    if m:
-        return m.group(1)
-    m = re.search(r"youtu\.be/([\w-]{11})", url_or_id)
-    if m:
-        return m.group(1)
-    m = re.search(r"embed/([\w-]{11})", url_or_id)
-    if m:
-        return m.group(1)
-    if re.match(r"^[\w-]{11}$", url_or_id):
-        return url_or_id
-    raise ValueError("Could not extract video id from input!")
+from yt_transcript_tools.fetcher import fetch_transcript
+from yt_transcript_tools.profiling import add_profile_arguments, profiled
+from yt_transcript_tools.video_ids import parse_video_id as extract_video_id
 
 if __name__ == "__main__":
-    url_or_id = input("Paste YouTube URL or video id: ").strip()
+    p = argparse.ArgumentParser(description="Fetch a YouTube transcript to transcript.txt")
+    p.add_argument("video", nargs="?", help="YouTube URL or video id (prompted for if omitted)")
+    add_profile_arguments(p)
+    args = p.parse_args()
+    url_or_id = args.video or input("Paste YouTube URL or video id: ").strip()
     try:
         video_id = extract_video_id(url_or_id)
-        out = fetch_transcript(video_id, "transcript.txt")
+        with profiled(args.profile, args.profiler):
+            out = fetch_transcript(video_id, "transcript.txt")
         print(f"Wrote transcript to {out}")
     except Exception as e:
         print(f"Failed to fetch transcript: {e}")
@@ -1,88 +1,447 @@
-"""Advanced QA helper: optional spaCy sentence segmentation and optional
-sentence-transformers embeddings to select best answer sentences for
+"""Advanced QA helper: sentence segmentation (see `yt_transcript_tools.segmenter`)
+and optional sentence embeddings to select best answer sentences for
 detected questions.
 
+Embeddings come from a pluggable backend (see `yt_transcript_tools.embeddings`);
+the PyTorch sentence-transformers model is the default and ONNX / int8
+backends can be selected with `YT_EMBED_BACKEND`.
+
 This module is optional — it falls back to simple heuristics when
 dependencies are unavailable.
-"""
-from typing import List, Dict, Optional
 
-try:
-    import spacy
-    from spacy.lang.en import English
-    SPACY_AVAILABLE = True
-except Exception:
-    spacy = None
-    SPACY_AVAILABLE = False
+Answer ranking is selected with `mode` (default `YT_QA_MODE`, else
+``auto``): ``embedding`` (cosine similarity, requires a backend), ``bm25``
+(lexical ranking with `yt_transcript_tools.bm25`, no model), ``heuristic``
+(the N sentences after the question) or ``auto`` (embeddings when a backend
+is available, otherwise the heuristic).
+
+When many extractions run concurrently (batch ingest, the API server), pass
+a shared `EmbeddingBatcher` (see `get_batcher`) so their sentences are
+encoded together in length-sorted batches instead of many small calls.
+"""
+from itertools import islice
+from typing import Iterable, List, Dict, Optional, Sequence
+import os
+import queue
+import threading
+import time
 
 try:
-    from sentence_transformers import SentenceTransformer, util
+    import sentence_transformers  # noqa: F401
     EMBED_AVAILABLE = True
 except Exception:
-    SentenceTransformer = None
-    util = None
     EMBED_AVAILABLE = False
 
+from .embeddings import (  # noqa: F401  (re-exported)
+    EMBED_THREADS_ENV,
+    EMBEDDING_BACKENDS,
+    EmbeddingBackend,
+    get_embedding_backend,
+)
+from .bm25 import BM25Index
+from .segmenter import SPACY_AVAILABLE, segment_sentences  # noqa: F401
+
+EMBED_BATCH_SIZE_ENV = "YT_EMBED_BATCH_SIZE"
+QA_MODE_ENV = "YT_QA_MODE"
+QA_MODES = ("auto", "embedding", "bm25", "heuristic")
+
 # cache model instances to avoid re-loading on each call
-_EMBED_MODEL = None
-_SPACY_NLP = None
+_BATCHER = None
+_BATCHER_LOCK = threading.Lock()
 
-def _segment_sentences(text: str) -> List[str]:
-    global _SPACY_NLP
-    if SPACY_AVAILABLE:
-        try:
-            if _SPACY_NLP is None:
+
+def _get_backend(backend) -> Optional[EmbeddingBackend]:
+    """Resolve `backend` (instance, name or None for the default); None if unusable."""
+    # str has an .encode() of its own: names must be resolved, not used as models
+    if backend is not None and not isinstance(backend, str) and (isinstance(backend, EmbeddingBackend) or hasattr(backend, "encode")):
+        return backend
+    try:
+        return get_embedding_backend(backend)
+    except ValueError:
+        raise
+    except Exception:
+        return None
+
+
+def _cos_sim(vec, mat):
+    """Cosine similarity of one vector against each row of `mat` (numpy)."""
+    import numpy as np
+
+    vec = np.asarray(vec, dtype=np.float32)
+    mat = np.asarray(mat, dtype=np.float32)
+    denom = np.linalg.norm(mat, axis=1) * np.linalg.norm(vec)
+    return mat @ vec / np.clip(denom, 1e-12, None)
+
+
+class _EncodeRequest:
+    __slots__ = ("sentences", "vectors", "error", "done")
+
+    def __init__(self, sentences: Sequence[str]):
+        self.sentences = list(sentences)
+        self.vectors: list = [None] * len(self.sentences)
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class EmbeddingBatcher:
+    """Batching inference service shared by concurrent extractions.
+
+    Callers block in `encode`; a single background thread collects pending
+    requests for up to `max_wait` seconds, sorts all of their sentences by
+    length (so padding inside each batch is minimal), encodes them in
+    batches of `batch_size` and hands each caller back its own rows, in the
+    order it submitted them.
+
+    `model` is anything with a SentenceTransformer-style
+    `encode(sentences, batch_size=..., ...)` method; it defaults to the
+    configured embedding backend (`get_embedding_backend()`). `num_threads` sets torch's intra-op thread
+    count for the inference thread.
+    """
+
+    def __init__(self, model=None, batch_size: int = 64, max_wait: float = 0.005, num_threads: Optional[int] = None):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.num_threads = num_threads
+        self._queue: "queue.Queue[Optional[_EncodeRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.sentences_encoded = 0
+        self.batches_run = 0
+
+    def encode(self, sentences: Sequence[str]) -> list:
+        """Return one embedding row per sentence (blocks until encoded)."""
+        req = _EncodeRequest(sentences)
+        if not req.sentences:
+            return []
+        self._ensure_started()
+        self._queue.put(req)
+        req.done.wait()
+        if req.error is not None:
+            raise req.error
+        return req.vectors
+
+    def close(self) -> None:
+        """Stop the inference thread once pending requests are drained."""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        if self.num_threads:
+            try:
+                import torch
+
+                torch.set_num_threads(self.num_threads)
+            except Exception:
+                pass
+        while True:
+            req = self._queue.get()
+            if req is None:
+                return
+            pending = [req]
+            total = len(req.sentences)
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            # keep collecting until a full batch is available or the window closes
+            while total < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
                 try:
-                    _SPACY_NLP = spacy.load("en_core_web_sm")
-                except Exception:
-                    _SPACY_NLP = English()
-                    _SPACY_NLP.add_pipe("sentencizer")
-            doc = _SPACY_NLP(text)
-            return [sent.text.strip() for sent in doc.sents if sent.text.strip()]
-        except Exception:
-            pass
-    # fallback: split on newlines and punctuation heuristically
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
-    # further split long lines at sentence enders
-    out = []
-    for l in lines:
-        parts = [p.strip() for p in l.replace('?', '.?').split('.') if p.strip()]
-        out.extend(parts)
-    return out
-
-def extract_qa_advanced(transcript_lines: List[str], questions: Optional[List[str]] = None, max_answer_sentences: int = 3) -> List[Dict[str, str]]:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                pending.append(nxt)
+                total += len(nxt.sentences)
+            self._process(pending)
+            if stop:
+                return
+
+    def _process(self, pending: List[_EncodeRequest]) -> None:
+        try:
+            model = self.model if self.model is not None else get_embedding_backend()
+            items = [(ri, si) for ri, r in enumerate(pending) for si in range(len(r.sentences))]
+            items.sort(key=lambda it: len(pending[it[0]].sentences[it[1]]))
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                texts = [pending[ri].sentences[si] for ri, si in chunk]
+                vecs = model.encode(texts, batch_size=len(texts), show_progress_bar=False)
+                for (ri, si), vec in zip(chunk, vecs):
+                    pending[ri].vectors[si] = vec
+                self.batches_run += 1
+                self.sentences_encoded += len(texts)
+        except BaseException as e:
+            for r in pending:
+                r.error = e
+        finally:
+            for r in pending:
+                r.done.set()
+
+
+def get_batcher() -> EmbeddingBatcher:
+    """Return the process-wide batcher, configured from the environment.
+
+    `YT_EMBED_BATCH_SIZE` (default 64) and `YT_EMBED_THREADS` (default: torch's
+    own choice) are read the first time this is called.
+    """
+    global _BATCHER
+    with _BATCHER_LOCK:
+        if _BATCHER is None:
+            threads = os.environ.get(EMBED_THREADS_ENV)
+            _BATCHER = EmbeddingBatcher(
+                batch_size=int(os.environ.get(EMBED_BATCH_SIZE_ENV, "64")),
+                num_threads=int(threads) if threads else None,
+            )
+        return _BATCHER
+
+def _segment_sentences(text: str) -> List[str]:
+    return segment_sentences(text)
+
+
+def _question_key(question: str) -> str:
+    """Lower-cased `question` without its trailing punctuation, for locating it in sentences.
+
+    Segmenters may split the "?" off into a sentence of its own, so the
+    question text is matched without it.
+    """
+    q = question.strip().lower()
+    return q.rstrip("?!.").strip() or q
+
+
+def _find_question(question: str, sents: List[str]) -> Optional[int]:
+    q = _question_key(question)
+    return next((i for i, s in enumerate(sents) if q in s.strip().lower()), None)
+
+
+def resolve_qa_mode(mode: Optional[str] = None) -> str:
+    """Validate `mode`, defaulting to `YT_QA_MODE` and then ``auto``."""
+    mode = mode or os.environ.get(QA_MODE_ENV) or "auto"
+    if mode not in QA_MODES:
+        raise ValueError(f"Unknown QA mode {mode!r}; choose from {QA_MODES}")
+    return mode
+
+
+def _bm25_answer(index: BM25Index, question: str, start: int, stop: int, nearest: bool) -> tuple:
+    """(sentence index, score) of the best BM25 candidate in ``start..stop-1``.
+
+    With no lexical overlap, `nearest` falls back to the first candidate
+    (the sentence right after the question), else to no answer.
+    """
+    bi, score = index.best(question, start, stop)
+    if bi is None and nearest and stop > start:
+        bi = start
+    return bi, score
+
+def _extract_qa_windowed(transcript_lines: Iterable[str], questions: Optional[List[str]], max_answer_sentences: int, chunk_lines: int, model, bm25: bool = False) -> List[Dict[str, str]]:
+    """Bounded-memory variant of `extract_qa_advanced` (see `chunk_lines`).
+
+    Lines are segmented and embedded `chunk_lines` at a time. A question is
+    answered from the sentences following its first occurrence (the same
+    local window the in-memory path prefers); only the few sentences still
+    needed for unresolved windows are carried into the next chunk, and each
+    chunk's embeddings are dropped once it has been processed. Questions that
+    never occur in the text keep a running best over all sentences.
+
+    With `bm25`, sentences are ranked by a BM25 index over the sentences
+    held at the time, so term statistics are per chunk rather than global.
+    """
+    np = None
+    if model is not None:
+        import numpy as np
+    ranked = model is not None or bm25
+    window = max_answer_sentences * 2 if ranked else max_answer_sentences
+    detect = not questions
+    questions = [] if detect else list(questions)
+    q_norm = [_question_key(q) for q in questions]
+    q_vecs: Dict[int, object] = {}
+    results: List[Optional[Dict[str, object]]] = [None] * len(questions)
+    located = [False] * len(questions)
+    best: Dict[int, tuple] = {}  # running (score, sentence) for questions not found yet
+    pending: Dict[int, int] = {}  # question -> index of its sentence in `buf`
+    buf: List[str] = []
+
+    def resolve(qi: int, idx: int, s_emb, index, final: bool) -> bool:
+        end = idx + 1 + window
+        if end > len(buf) and not final:
+            return False
+        candidates = list(range(idx + 1, min(len(buf), end)))
+        if index is not None and candidates:
+            bi, score = _bm25_answer(index, questions[qi], candidates[0], candidates[-1] + 1, nearest=True)
+            results[qi] = {"q": questions[qi], "a": buf[bi], "score": score}
+        elif s_emb is None and index is None:
+            ans = " ".join(buf[idx + 1:idx + 1 + max_answer_sentences])
+            results[qi] = {"q": questions[qi], "a": ans, "score": 0.0}
+        elif candidates:
+            sims = _cos_sim(q_vecs[qi], s_emb[candidates])
+            bi = int(sims.argmax())
+            results[qi] = {"q": questions[qi], "a": buf[candidates[bi]], "score": float(sims[bi])}
+        else:
+            score, sent = best.get(qi, (0.0, ""))
+            results[qi] = {"q": questions[qi], "a": sent, "score": float(score)}
+        return True
+
+    def process(new_sents: List[str], final: bool) -> None:
+        nonlocal buf
+        searched = len(buf)
+        buf = buf + new_sents
+        if detect:
+            for s in new_sents:
+                if len(questions) >= 100:
+                    break
+                if s.endswith("?"):
+                    questions.append(s)
+                    q_norm.append(_question_key(s))
+                    results.append(None)
+                    located.append(False)
+        new_q = [qi for qi in range(len(questions)) if qi not in q_vecs]
+        for qi in range(len(questions)):
+            if located[qi]:
+                continue
+            for idx in range(searched, len(buf)):
+                if q_norm[qi] in buf[idx].lower():
+                    located[qi] = True
+                    pending[qi] = idx
+                    break
+        s_emb = None
+        if model is not None and buf:
+            vecs = model.encode([questions[qi] for qi in new_q] + buf)
+            for qi, vec in zip(new_q, vecs[:len(new_q)]):
+                q_vecs[qi] = vec
+            s_emb = np.stack(vecs[len(new_q):])
+            # questions not located yet may still fall back to "best anywhere"
+            for qi in range(len(questions)):
+                if located[qi] and qi not in pending:
+                    continue
+                if searched < len(buf):
+                    sims = _cos_sim(q_vecs[qi], s_emb[searched:])
+                    bi = int(sims.argmax())
+                    if qi not in best or sims[bi] > best[qi][0]:
+                        best[qi] = (float(sims[bi]), buf[searched + bi])
+        index = BM25Index(buf) if bm25 and buf else None
+        if index is not None and searched < len(buf):
+            for qi in range(len(questions)):
+                if located[qi] and qi not in pending:
+                    continue
+                bi, score = index.best(questions[qi], searched, len(buf))
+                if bi is not None and (qi not in best or score > best[qi][0]):
+                    best[qi] = (score, buf[bi])
+        for qi, idx in list(pending.items()):
+            if resolve(qi, idx, s_emb, index, final):
+                del pending[qi]
+        del s_emb, index
+        # carry only what unresolved windows still need
+        keep = min(pending.values()) if pending else len(buf)
+        buf = buf[keep:]
+        for qi in pending:
+            pending[qi] -= keep
+
+    it = iter(transcript_lines)
+    while True:
+        chunk = list(islice(it, chunk_lines))
+        if not chunk:
+            break
+        process(_segment_sentences("\n".join(chunk)), final=False)
+    process([], final=True)
+
+    for qi, r in enumerate(results):
+        if r is None:
+            if ranked and qi in best:
+                score, sent = best[qi]
+                results[qi] = {"q": questions[qi], "a": sent, "score": float(score)}
+            else:
+                results[qi] = {"q": questions[qi], "a": "", "score": 0.0}
+    return results
+
+
+def extract_qa_advanced(transcript_lines: Iterable[str], questions: Optional[List[str]] = None, max_answer_sentences: int = 3, batcher: Optional[EmbeddingBatcher] = None, backend=None, chunk_lines: Optional[int] = None, mode: Optional[str] = None) -> List[Dict[str, str]]:
     """Return list of {q, a, score} for provided transcript lines.
 
     If `questions` is None, the caller should have detected questions already
     (e.g., via yt_transcript_tools.question_extractor.extract_questions);
     otherwise we cannot reliably detect them here.
+
+    If `batcher` is given, embeddings are computed through it so that
+    concurrent callers share inference batches. Otherwise `backend` (an
+    `EmbeddingBackend` or a backend name) is used, defaulting to the
+    configured backend.
+
+    If `chunk_lines` is set, the transcript (which may then be any iterable,
+    e.g. a file object) is processed in a sliding window of that many lines
+    so peak memory stays flat regardless of transcript length.
+
+    `mode` selects the answer ranking (see the module docstring); an
+    explicit ``embedding`` raises RuntimeError when no backend is available
+    instead of falling back to the heuristic.
     """
+    mode = resolve_qa_mode(mode)
+    model = None
+    if mode in ("auto", "embedding"):
+        model = batcher if batcher is not None else _get_backend(backend)
+        if model is None and mode == "embedding":
+            raise RuntimeError("QA mode 'embedding' needs an embedding backend (sentence-transformers or onnxruntime)")
+
+    if chunk_lines:
+        if mode == "bm25":
+            return _extract_qa_windowed(transcript_lines, questions, max_answer_sentences, chunk_lines, None, bm25=True)
+        if model is not None:
+            try:
+                return _extract_qa_windowed(transcript_lines, questions, max_answer_sentences, chunk_lines, model)
+            except Exception:
+                # a consumed iterator cannot be replayed through the fallback
+                if mode == "embedding" or not isinstance(transcript_lines, Sequence):
+                    raise
+        return _extract_qa_windowed(transcript_lines, questions, max_answer_sentences, chunk_lines, None)
+
     text = "\n".join(transcript_lines)
     sents = _segment_sentences(text)
     if not questions:
         # fallback: look for sentences containing question mark
         questions = [s for s in sents if s.endswith('?')][:100]
 
+    if mode == "bm25":
+        index = BM25Index(sents)
+        results = []
+        for q in questions:
+            q_idx = _find_question(q, sents)
+            if q_idx is not None and q_idx + 1 < len(sents):
+                stop = min(len(sents), q_idx + 1 + max_answer_sentences * 2)
+                bi, score = _bm25_answer(index, q, q_idx + 1, stop, nearest=True)
+            else:
+                bi, score = _bm25_answer(index, q, 0, len(sents), nearest=False)
+            results.append({"q": q, "a": sents[bi] if bi is not None else "", "score": score})
+        return results
+
     # If embeddings are available, compute embeddings and pick best candidate
-    if EMBED_AVAILABLE and SentenceTransformer is not None:
+    if model is not None:
         try:
-            global _EMBED_MODEL
-            if _EMBED_MODEL is None:
-                _EMBED_MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-            model = _EMBED_MODEL
-            # embed questions and sentences
-            q_emb = model.encode(questions, convert_to_tensor=True)
-            s_emb = model.encode(sents, convert_to_tensor=True)
+            import numpy as np
+
+            # one call so questions and sentences land in the same batches
+            vecs = model.encode(list(questions) + sents)
+            q_emb = np.stack(vecs[:len(questions)])
+            s_emb = np.stack(vecs[len(questions):])
             results = []
             for qi, q in enumerate(questions):
                 # compute cosine similarities
-                sims = util.cos_sim(q_emb[qi], s_emb)[0].tolist()
+                sims = _cos_sim(q_emb[qi], s_emb).tolist()
                 # consider only sentences after the question occurrence to prefer nearby answers
                 # find first sentence index that matches the question text
-                try:
-                    q_idx = next(i for i, s in enumerate(sents) if q.strip().lower() in s.strip().lower())
-                except StopIteration:
-                    q_idx = None
+                q_idx = _find_question(q, sents)
                 # candidate sentences: those within next max_answer_sentences*2 window
                 candidates = list(range(len(sims)))
                 if q_idx is not None:
@@ -96,16 +455,14 @@ def extract_qa_advanced(transcript_lines: List[str], questions: Optional[List[st
                 results.append({"q": q, "a": answer, "score": float(best_score)})
             return results
         except Exception:
+            if mode == "embedding":
+                raise
             # fall through to heuristic fallback
-            pass
 
     # fallback heuristic: for each question, find its index and take next N sentences
     results = []
     for q in questions:
-        try:
-            q_idx = next(i for i, s in enumerate(sents) if q.strip().lower() in s.strip().lower())
-        except StopIteration:
-            q_idx = None
+        q_idx = _find_question(q, sents)
         ans = ""
         if q_idx is not None:
             start = q_idx + 1
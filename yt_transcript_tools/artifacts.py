@@ -0,0 +1,438 @@
+"""Size-bounded, sharded store for the API's output artifacts (``outputs/``).
+
+Artifacts keep their flat names (``<video_id>_qa.txt``) and URLs
+(``/outputs/<name>``) but live in shard directories named after the id
+prefix (``outputs/FO/FOSom6-IWV0_qa.txt``) so no directory grows huge.
+Files written before sharding stay readable at their flat location. With
+a `codec` (``YT_STORE_COMPRESSION=zstd``) artifacts are stored
+zstd-compressed as ``<name>.zst``; the index and URLs keep the plain name.
+
+A SQLite index next to the files (``.artifacts.db``) tracks size, creation
+time, last access and hit count of every artifact; `/outputs` hits are
+buffered in memory and written to it in batches. When the store exceeds
+`YT_ARTIFACT_MAX_BYTES` / `YT_ARTIFACT_MAX_FILES`, artifacts are evicted
+least recently (``lru``) or least frequently (``lfu``, `YT_ARTIFACT_POLICY`)
+used first; artifacts younger than `min_age` are never evicted or expired,
+so a result is not deleted while its URLs are being handed out (the API
+sets it to its result-cache TTL, for as long as it serves cached results).
+
+Retention is tiered by artifact kind: `YT_ARTIFACT_TTL` is the default
+idle time after which an artifact expires, and `YT_ARTIFACT_RETENTION`
+overrides it per kind (``transcript=30d,qa=7d,summary=1d``; a kind matches
+names ending in ``_<kind>.<ext>``). Expired artifacts are removed by the
+background compactor, which also adopts files it finds unindexed (e.g.
+written by an older version) and reconciles the totals with the other
+processes sharing the directory.
+
+Sizes accept ``k``/``m``/``g``/``t`` suffixes (powers of 1024), durations
+``s``/``m``/``h``/``d``/``w``.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from .compression import ZSTD_SUFFIX, get_codec
+from .storage import write_stored
+
+ARTIFACT_MAX_BYTES_ENV = "YT_ARTIFACT_MAX_BYTES"
+ARTIFACT_MAX_FILES_ENV = "YT_ARTIFACT_MAX_FILES"
+ARTIFACT_POLICY_ENV = "YT_ARTIFACT_POLICY"
+ARTIFACT_TTL_ENV = "YT_ARTIFACT_TTL"
+ARTIFACT_RETENTION_ENV = "YT_ARTIFACT_RETENTION"
+ARTIFACT_SHARD_ENV = "YT_ARTIFACT_SHARD_CHARS"
+ARTIFACT_COMPACT_ENV = "YT_ARTIFACT_COMPACT_INTERVAL"
+POLICIES = ("lru", "lfu")
+INDEX_NAME = ".artifacts.db"
+DEFAULT_SHARD_CHARS = 2
+DEFAULT_COMPACT_INTERVAL = 300.0
+DEFAULT_MIN_AGE = 60.0
+
+_SIZE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?$", re.I)
+_DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhdw]?)$", re.I)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+# evict/expire in batches so the candidate query stays cheap on large stores
+_BATCH = 256
+# buffered access records written to the index at once
+_HIT_FLUSH = 256
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS artifacts (
+        name TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created REAL NOT NULL,
+        last_access REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    )""",
+    "CREATE INDEX IF NOT EXISTS artifacts_last_access ON artifacts (last_access)",
+    "CREATE INDEX IF NOT EXISTS artifacts_hits ON artifacts (hits, last_access)",
+)
+
+_EVICTION_ORDER = {"lru": "last_access, created", "lfu": "hits, last_access"}
+
+log = logging.getLogger(__name__)
+
+
+def parse_size(value) -> Optional[int]:
+    """Bytes for ``"500M"`` / ``"10g"`` / ``"1048576"``; None (no limit) for empty or 0."""
+    if value is None or str(value).strip() == "":
+        return None
+    m = _SIZE_RE.match(str(value).strip())
+    if not m:
+        raise ValueError(f"invalid size: {value!r}")
+    size = int(float(m.group(1)) * _SIZE_UNITS[m.group(2).lower()])
+    return size or None
+
+
+def parse_duration(value) -> Optional[float]:
+    """Seconds for ``"90"`` / ``"15m"`` / ``"7d"``; None (never) for empty or 0."""
+    if value is None or str(value).strip() == "":
+        return None
+    m = _DURATION_RE.match(str(value).strip())
+    if not m:
+        raise ValueError(f"invalid duration: {value!r}")
+    seconds = float(m.group(1)) * _DURATION_UNITS[m.group(2).lower()]
+    return seconds or None
+
+
+def parse_retention(spec: Optional[str]) -> Dict[str, Optional[float]]:
+    """Per-kind TTLs from ``"transcript=30d,summary=1d"``; ``0`` keeps a kind forever."""
+    tiers: Dict[str, Optional[float]] = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        kind, sep, ttl = item.partition("=")
+        if not sep or not kind.strip():
+            raise ValueError(f"invalid retention entry {item!r} (expected kind=duration)")
+        tiers[kind.strip()] = parse_duration(ttl)
+    return tiers
+
+
+def _logical_name(filename: str) -> str:
+    """Artifact name of a stored file (compressed files drop their ``.zst``)."""
+    return filename[: -len(ZSTD_SUFFIX)] if filename.endswith(ZSTD_SUFFIX) else filename
+
+
+class ArtifactStore:
+    """Sharded artifact directory with quotas, access tracking and expiry."""
+
+    def __init__(
+        self,
+        root,
+        max_bytes: Optional[int] = None,
+        max_files: Optional[int] = None,
+        policy: str = "lru",
+        ttl: Optional[float] = None,
+        retention: Optional[Dict[str, Optional[float]]] = None,
+        shard_chars: int = DEFAULT_SHARD_CHARS,
+        min_age: float = DEFAULT_MIN_AGE,
+        codec=None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown eviction policy {policy!r}; expected one of {list(POLICIES)}")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.policy = policy
+        self.ttl = ttl
+        # longest kind first, so "perplexity_summary" wins over "summary"
+        self.retention = dict(sorted((retention or {}).items(), key=lambda kv: -len(kv[0])))
+        self.shard_chars = shard_chars
+        self.min_age = min_age
+        self.codec = codec
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / INDEX_NAME), timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for stmt in _SCHEMA:
+            self._conn.execute(stmt)
+        self._hits: Dict[str, List[float]] = {}
+        self._bytes, self._files = self._totals()
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+
+    @property
+    def bounded(self) -> bool:
+        """True if any quota or expiry is configured (the compactor has work to do)."""
+        return bool(self.max_bytes or self.max_files or self.ttl or any(self.retention.values()))
+
+    def valid_name(self, name: str) -> bool:
+        return bool(name) and not name.startswith(".") and "/" not in name and "\\" not in name
+
+    def relpath(self, name: str) -> str:
+        """Location of `name` relative to the root (``FO/FOSom6-IWV0_qa.txt``)."""
+        if not self.valid_name(name):
+            raise ValueError(f"invalid artifact name: {name!r}")
+        shard = name[: self.shard_chars] if self.shard_chars else ""
+        return f"{shard}/{name}" if shard else name
+
+    def path(self, name: str) -> Path:
+        return self.root / self.relpath(name)
+
+    def locate(self, name: str) -> Optional[Path]:
+        """Existing file for `name` (plain or ``.zst``): its shard, else the flat pre-sharding location."""
+        if not self.valid_name(name):
+            return None
+        for path in (self.path(name), self.root / name):
+            for candidate in (path, path.with_name(path.name + ZSTD_SUFFIX)):
+                if candidate.is_file():
+                    return candidate
+        return None
+
+    def ttl_for(self, name: str) -> Optional[float]:
+        """Idle time after which `name` expires (its kind's tier, else the default TTL)."""
+        stem = name.rsplit(".", 1)[0]
+        for kind, ttl in self.retention.items():
+            if stem.endswith(f"_{kind}"):
+                return ttl
+        return self.ttl
+
+    def put(self, name: str, data: bytes) -> Path:
+        """Atomically write artifact `name`; evicts older artifacts if a quota is exceeded.
+
+        Returns the path written (``<name>.zst`` when the store compresses).
+        """
+        plain = self.path(name)
+        plain.parent.mkdir(parents=True, exist_ok=True)
+        path = write_stored(plain, data, self.codec)
+        relpath = path.relative_to(self.root).as_posix()
+        size = path.stat().st_size
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM artifacts WHERE name = ?", (name,)).fetchone()
+            self._conn.execute(
+                "INSERT INTO artifacts (name, path, size, created, last_access, hits) VALUES (?, ?, ?, ?, ?, 0) "
+                "ON CONFLICT(name) DO UPDATE SET path = excluded.path, size = excluded.size, "
+                "created = excluded.created, last_access = excluded.last_access",
+                (name, relpath, size, now, now),
+            )
+            self._bytes += size - (row[0] if row else 0)
+            self._files += 0 if row else 1
+            over = self._over_quota()
+        if over:
+            self.evict(keep=(name,))
+        return path
+
+    def record_hit(self, name: str) -> None:
+        """Count an access to `name` (buffered; written to the index in batches)."""
+        now = time.time()
+        with self._lock:
+            entry = self._hits.get(name)
+            if entry is None:
+                self._hits[name] = [now, 1]
+            else:
+                entry[0] = now
+                entry[1] += 1
+            if len(self._hits) >= _HIT_FLUSH:
+                self._flush_hits()
+
+    def flush_hits(self) -> None:
+        with self._lock:
+            self._flush_hits()
+
+    def _flush_hits(self) -> None:
+        if not self._hits:
+            return
+        self._conn.executemany(
+            "UPDATE artifacts SET last_access = MAX(last_access, ?), hits = hits + ? WHERE name = ?",
+            [(last, hits, name) for name, (last, hits) in self._hits.items()],
+        )
+        self._hits = {}
+
+    def _totals(self) -> Tuple[int, int]:
+        size, count = self._conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM artifacts").fetchone()
+        return int(size), int(count)
+
+    def _over_quota(self) -> bool:
+        return bool((self.max_bytes and self._bytes > self.max_bytes) or (self.max_files and self._files > self.max_files))
+
+    def _remove(self, rows: Iterable[Tuple[str, str, int]]) -> int:
+        """Delete the files and index rows of `rows` (name, relpath, size); lock held."""
+        removed = []
+        for name, relpath, size in rows:
+            try:
+                os.unlink(self.root / relpath)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.warning("could not remove artifact %s: %s", relpath, e)
+                continue
+            removed.append((name, size))
+        self._conn.executemany("DELETE FROM artifacts WHERE name = ?", [(name,) for name, _ in removed])
+        for name, size in removed:
+            self._hits.pop(name, None)
+            self._bytes -= size
+            self._files -= 1
+        return len(removed)
+
+    def evict(self, keep: Iterable[str] = ()) -> int:
+        """Evict by the configured policy until within quota, sparing `keep`; returns the number of files removed."""
+        keep = set(keep)
+        evicted = 0
+        with self._lock:
+            # eviction order must see the latest accesses
+            self._flush_hits()
+            while self._over_quota():
+                rows = self._conn.execute(
+                    f"SELECT name, path, size FROM artifacts WHERE created < ? ORDER BY {_EVICTION_ORDER[self.policy]} LIMIT ?",
+                    (time.time() - self.min_age, _BATCH),
+                ).fetchall()
+                if not rows:
+                    break
+                batch = []
+                bytes_left, files_left = self._bytes, self._files
+                for name, relpath, size in rows:
+                    if name in keep:
+                        continue
+                    if not ((self.max_bytes and bytes_left > self.max_bytes) or (self.max_files and files_left > self.max_files)):
+                        break
+                    batch.append((name, relpath, size))
+                    bytes_left -= size
+                    files_left -= 1
+                if not self._remove(batch):
+                    break
+                evicted += len(batch)
+        if evicted:
+            log.info("evicted %d artifacts (%s)", evicted, self.policy)
+        return evicted
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Remove artifacts idle for longer than their retention tier; returns the count."""
+        ttls = [t for t in [self.ttl, *self.retention.values()] if t]
+        if not ttls:
+            return 0
+        now = time.time() if now is None else now
+        expired = 0
+        with self._lock:
+            self._flush_hits()
+            oldest = now - min(ttls)
+            after = ""
+            while True:
+                rows = self._conn.execute(
+                    "SELECT name, path, size, last_access FROM artifacts WHERE last_access < ? AND created < ? AND name > ? ORDER BY name LIMIT ?",
+                    (oldest, now - self.min_age, after, _BATCH),
+                ).fetchall()
+                if not rows:
+                    break
+                after = rows[-1][0]
+                stale = []
+                for name, relpath, size, last_access in rows:
+                    ttl = self.ttl_for(name)
+                    if ttl and last_access < now - ttl:
+                        stale.append((name, relpath, size))
+                expired += self._remove(stale)
+        if expired:
+            log.info("expired %d artifacts", expired)
+        return expired
+
+    def scan(self) -> Dict[str, int]:
+        """Index unknown files under the root and forget indexed files that are gone."""
+        found = {}
+        for entry in os.scandir(self.root):
+            if entry.name.startswith("."):
+                continue
+            if entry.is_file():
+                # a sharded copy shadows a pre-sharding flat file of the same name
+                found.setdefault(_logical_name(entry.name), (entry.name, entry.stat()))
+            elif entry.is_dir():
+                for sub in os.scandir(entry.path):
+                    if sub.is_file() and self.valid_name(sub.name):
+                        found[_logical_name(sub.name)] = (f"{entry.name}/{sub.name}", sub.stat())
+        with self._lock:
+            known = dict(self._conn.execute("SELECT name, path FROM artifacts").fetchall())
+            missing = {name for name, relpath in known.items() if not (self.root / relpath).is_file()}
+            self._conn.executemany("DELETE FROM artifacts WHERE name = ?", [(name,) for name in missing])
+            adopted = [
+                (name, relpath, st.st_size, st.st_mtime, st.st_mtime)
+                for name, (relpath, st) in found.items()
+                if name not in known or name in missing
+            ]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO artifacts (name, path, size, created, last_access, hits) VALUES (?, ?, ?, ?, ?, 0)",
+                adopted,
+            )
+            self._bytes, self._files = self._totals()
+        return {"adopted": len(adopted), "missing": len(missing)}
+
+    def compact(self) -> Dict[str, int]:
+        """One compactor pass: expire, then evict to quota."""
+        with self._lock:
+            self._flush_hits()
+            # other processes (e.g. queue workers) write to the same index
+            self._bytes, self._files = self._totals()
+        return {"expired": self.expire(), "evicted": self.evict()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "files": self._files,
+                "bytes": self._bytes,
+                "max_files": self.max_files,
+                "max_bytes": self.max_bytes,
+                "policy": self.policy,
+                "ttl": self.ttl,
+                "retention": self.retention,
+                "pending_hits": len(self._hits),
+                "compactor": self._compactor is not None,
+            }
+
+    def start_compactor(self, interval: float = DEFAULT_COMPACT_INTERVAL) -> None:
+        """Run `scan` once, then `compact` every `interval` seconds in a daemon thread."""
+        if self._compactor is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            try:
+                self.scan()
+                self.compact()
+            except Exception:
+                log.exception("artifact scan failed")
+            while not self._stop.wait(interval):
+                try:
+                    self.compact()
+                except Exception:
+                    log.exception("artifact compaction failed")
+
+        self._compactor = threading.Thread(target=loop, name="artifact-compactor", daemon=True)
+        self._compactor.start()
+
+    def stop_compactor(self) -> None:
+        if self._compactor is None:
+            return
+        self._stop.set()
+        self._compactor.join()
+        self._compactor = None
+
+    def close(self) -> None:
+        self.stop_compactor()
+        with self._lock:
+            self._flush_hits()
+            self._conn.close()
+
+
+def store_from_env(root, min_age: float = DEFAULT_MIN_AGE) -> ArtifactStore:
+    """`ArtifactStore` for `root` configured from the ``YT_ARTIFACT_*`` variables."""
+    env = os.environ
+    return ArtifactStore(
+        root,
+        max_bytes=parse_size(env.get(ARTIFACT_MAX_BYTES_ENV)),
+        max_files=int(env.get(ARTIFACT_MAX_FILES_ENV) or 0) or None,
+        policy=env.get(ARTIFACT_POLICY_ENV) or "lru",
+        ttl=parse_duration(env.get(ARTIFACT_TTL_ENV)),
+        retention=parse_retention(env.get(ARTIFACT_RETENTION_ENV)),
+        shard_chars=int(env.get(ARTIFACT_SHARD_ENV, DEFAULT_SHARD_CHARS)),
+        min_age=min_age,
+        codec=get_codec(),
+    )
+
+
+def compact_interval() -> float:
+    return parse_duration(os.environ.get(ARTIFACT_COMPACT_ENV)) or DEFAULT_COMPACT_INTERVAL
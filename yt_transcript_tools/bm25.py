@@ -0,0 +1,165 @@
+"""Okapi BM25 ranking of transcript sentences.
+
+A lexical middle tier between the "next N sentences" heuristic and
+embedding similarity (see `advanced_qa`, ``mode="bm25"``): no model, no
+inference, and scoring a question against every sentence of a transcript
+takes microseconds.
+
+`BM25Index` tokenizes the sentences once into a sparse term-by-sentence
+matrix (CSC layout: per term, the sentences containing it and their
+precomputed BM25 weights, sorted by sentence). Scoring a query against the
+whole transcript gathers its terms' postings and sums them per sentence
+with one ``numpy.bincount`` (pure Python without numpy); ranking within a
+window of sentences binary-searches each posting list for the window.
+"""
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import re
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    np = None
+    NUMPY_AVAILABLE = False
+
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can could did do does doing for from had has have how i if in into is it its "
+    "just me my of on or our so than that the their them then there these they this those to too us very was we were "
+    "what when where which who whom whose why will with would you your i'm it's that's there's you're".split()
+)
+
+
+# raw token -> normalized term ("" for stopwords); vocabularies are small
+_TERMS: Dict[str, str] = {}
+_TERMS_MAX = 200_000
+
+
+def _stem(token: str) -> str:
+    # plural folding only: cheap and rarely wrong for matching questions to answers
+    if len(token) <= 3 or not token.endswith("s") or token.endswith(("ss", "us", "is")):
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("sses", "xes")):
+        return token[:-2]
+    return token[:-1]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased content-word tokens of `text` (stopwords removed, plurals folded)."""
+    terms = _TERMS
+    out = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        term = terms.get(tok)
+        if term is None:
+            term = "" if tok in STOPWORDS else _stem(tok)
+            if len(terms) < _TERMS_MAX:
+                terms[tok] = term
+        if term:
+            out.append(term)
+    return out
+
+
+class BM25Index:
+    """BM25 scores of queries against a fixed list of sentences."""
+
+    def __init__(self, sentences: Sequence[str], k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        self.vocab: Dict[str, int] = {}
+        # per term: sentence ids (ascending) and term frequencies
+        post_docs: List[List[int]] = []
+        post_tfs: List[List[int]] = []
+        lengths: List[int] = []
+        vocab = self.vocab
+        for i, sentence in enumerate(sentences):
+            toks = tokenize(sentence)
+            lengths.append(len(toks))
+            counts: Dict[str, int] = {}
+            for t in toks:
+                counts[t] = counts.get(t, 0) + 1
+            for term, tf in counts.items():
+                tid = vocab.get(term)
+                if tid is None:
+                    tid = vocab[term] = len(post_docs)
+                    post_docs.append([])
+                    post_tfs.append([])
+                post_docs[tid].append(i)
+                post_tfs[tid].append(tf)
+        self.size = n = len(lengths)
+        avgdl = (sum(lengths) / n) if n else 0.0
+        # length normalization per sentence: k1 * (1 - b + b * dl / avgdl)
+        norms = [k1 * (1.0 - b + b * dl / avgdl) if avgdl else k1 for dl in lengths]
+        self._post_docs = post_docs
+        self._post_weights: List[List[float]] = []
+        for docs, tfs in zip(post_docs, post_tfs):
+            idf = math.log(1.0 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            self._post_weights.append([idf * tf * (k1 + 1.0) / (tf + norms[d]) for d, tf in zip(docs, tfs)])
+        if NUMPY_AVAILABLE:
+            # CSC matrix for whole-transcript scoring
+            self._indptr = np.zeros(len(post_docs) + 1, dtype=np.int64)
+            np.cumsum([len(d) for d in post_docs], out=self._indptr[1:])
+            self._docs = np.fromiter((d for docs in post_docs for d in docs), dtype=np.int32, count=int(self._indptr[-1]))
+            self._weights = np.fromiter((w for ws in self._post_weights for w in ws), dtype=np.float64, count=int(self._indptr[-1]))
+
+    def _terms(self, query: str) -> List[int]:
+        vocab = self.vocab
+        return [vocab[t] for t in set(tokenize(query)) if t in vocab]
+
+    def scores(self, query: str):
+        """BM25 score of `query` against every sentence (numpy array or list)."""
+        terms = self._terms(query)
+        if NUMPY_AVAILABLE:
+            if not terms:
+                return np.zeros(self.size)
+            indptr = self._indptr
+            sel = np.concatenate([np.arange(indptr[t], indptr[t + 1]) for t in terms])
+            return np.bincount(self._docs[sel], weights=self._weights[sel], minlength=self.size)
+        out = [0.0] * self.size
+        for t in terms:
+            for d, w in zip(self._post_docs[t], self._post_weights[t]):
+                out[d] += w
+        return out
+
+    def range_scores(self, query: str, start: int, stop: int) -> List[float]:
+        """BM25 scores of `query` for sentences ``start..stop-1`` only.
+
+        Posting lists are sorted by sentence, so each query term costs a
+        binary search plus the few postings inside the range; for the small
+        windows answers are ranked in this beats any whole-array operation.
+        """
+        start, stop = max(0, start), min(self.size, stop)
+        out = [0.0] * max(0, stop - start)
+        for t in self._terms(query):
+            docs = self._post_docs[t]
+            a = bisect_left(docs, start)
+            if a == len(docs) or docs[a] >= stop:
+                continue
+            weights = self._post_weights[t]
+            for j in range(a, bisect_left(docs, stop, a)):
+                out[docs[j] - start] += weights[j]
+        return out
+
+    def best(self, query: str, start: int = 0, stop: Optional[int] = None) -> Tuple[Optional[int], float]:
+        """Index and score of the best-matching sentence in ``start..stop-1`` (default: all).
+
+        Returns ``(None, 0.0)`` when no sentence in range shares a term with
+        the query.
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        if NUMPY_AVAILABLE and start == 0 and stop == self.size:
+            scores = self.scores(query)
+            k = int(scores.argmax()) if self.size else 0
+        else:
+            scores = self.range_scores(query, start, stop)
+            k = max(range(len(scores)), key=scores.__getitem__) if scores else 0
+            start = max(0, start)
+        if not len(scores) or scores[k] <= 0:
+            return None, 0.0
+        return start + k, float(scores[k])
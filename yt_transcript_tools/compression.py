@@ -0,0 +1,184 @@
+"""zstd compression of stored transcripts and artifacts, with trained dictionaries.
+
+Transcripts and QA files are small and very similar across videos, so a
+dictionary trained on a sample of them (`train_dictionary`, see
+``scripts/train_zstd_dictionary.py``) compresses each file far better than
+zstd alone. Compressed files carry a ``.zst`` suffix and are read back
+transparently (`storage.open_text`, `storage.read_text`), streamed rather
+than decompressed in memory.
+
+- `YT_STORE_COMPRESSION=zstd` compresses everything the storage layer
+  writes (`fetch_transcript`, the API's artifacts);
+- `YT_ZSTD_DICT` names the dictionary file, or several separated by
+  ``os.pathsep``: the first compresses new files, all of them decompress
+  (keep retired dictionaries listed until their files are gone);
+- `YT_ZSTD_LEVEL` is the compression level (default 3).
+
+Each frame records the id of its dictionary (0 for none), so the right one
+is picked when reading; a file compressed with an unknown dictionary raises
+RuntimeError. Requires the ``zstandard`` package.
+"""
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence
+import hashlib
+import os
+import threading
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except Exception:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+STORE_COMPRESSION_ENV = "YT_STORE_COMPRESSION"
+ZSTD_DICT_ENV = "YT_ZSTD_DICT"
+ZSTD_LEVEL_ENV = "YT_ZSTD_LEVEL"
+ZSTD_SUFFIX = ".zst"
+DEFAULT_LEVEL = 3
+# zstd's own default dictionary size (110 KiB)
+DEFAULT_DICT_SIZE = 112640
+# training samples are cut at line boundaries to about this size
+SAMPLE_BYTES = 4096
+# zstd frame header: 4-byte magic + up to 14 bytes of parameters
+_FRAME_HEADER_MAX = 18
+# header of a dictionary-compressed zstd HTTP body ("dcz", RFC 9842); the
+# SHA-256 of the dictionary and the zstd frame follow
+DCZ_MAGIC = b"\x5e\x2a\x4d\x18\x20\x00\x00\x00"
+
+_CODECS: Dict[tuple, "ZstdCodec"] = {}
+_CODECS_LOCK = threading.Lock()
+
+
+def _require_zstd() -> None:
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("zstandard is required for zstd compression (pip install zstandard)")
+
+
+def is_compressed(path) -> bool:
+    return str(path).endswith(ZSTD_SUFFIX)
+
+
+def iter_samples(texts: Iterable[bytes], sample_bytes: int = SAMPLE_BYTES) -> Iterator[bytes]:
+    """Cut documents into line-aligned chunks of about `sample_bytes` for training."""
+    for data in texts:
+        start = 0
+        while start < len(data):
+            end = data.find(b"\n", start + sample_bytes)
+            end = len(data) if end < 0 else end + 1
+            yield data[start:end]
+            start = end
+
+
+def train_dictionary(samples: Sequence[bytes], dict_size: int = DEFAULT_DICT_SIZE, level: int = DEFAULT_LEVEL) -> bytes:
+    """Train a zstd dictionary on `samples` (e.g. from `iter_samples`); returns its bytes."""
+    _require_zstd()
+    return zstandard.train_dictionary(dict_size, list(samples), level=level).as_bytes()
+
+
+class ZstdCodec:
+    """Compressor/decompressor for one set of dictionaries (the first one compresses)."""
+
+    def __init__(self, dictionaries: Sequence[bytes] = (), level: int = DEFAULT_LEVEL):
+        _require_zstd()
+        self.level = level
+        dicts = [zstandard.ZstdCompressionDict(d) for d in dictionaries]
+        self.dictionary = dicts[0] if dicts else None
+        self._raw = {d.dict_id(): raw for d, raw in zip(dicts, dictionaries)}
+        self._dicts = {d.dict_id(): d for d in dicts}
+        if self.dictionary is not None:
+            self.dictionary.precompute_compress(level=level)
+        self._local = threading.local()
+
+    @property
+    def dictionary_id(self) -> int:
+        return self.dictionary.dict_id() if self.dictionary is not None else 0
+
+    def dictionary_bytes(self, dict_id: Optional[int] = None) -> Optional[bytes]:
+        """Raw bytes of dictionary `dict_id` (default: the compressing one)."""
+        return self._raw.get(self.dictionary_id if dict_id is None else dict_id)
+
+    def dictionary_sha256(self, dict_id: Optional[int] = None) -> Optional[bytes]:
+        raw = self.dictionary_bytes(dict_id)
+        return hashlib.sha256(raw).digest() if raw is not None else None
+
+    def _compressor(self):
+        # compressors are not thread-safe; one per thread reuses the digested dictionary
+        cctx = getattr(self._local, "cctx", None)
+        if cctx is None:
+            cctx = self._local.cctx = zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary, write_content_size=True)
+        return cctx
+
+    def _decompressor(self, dict_id: int):
+        if dict_id == 0:
+            return zstandard.ZstdDecompressor()
+        d = self._dicts.get(dict_id)
+        if d is None:
+            raise RuntimeError(f"data was compressed with zstd dictionary {dict_id}, which is not in {ZSTD_DICT_ENV}")
+        return zstandard.ZstdDecompressor(dict_data=d)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor().compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor(frame_dict_id(data)).decompress(data)
+
+    def open_reader(self, path) -> BinaryIO:
+        """Binary stream of the decompressed contents of `path` (closing it closes the file)."""
+        fh = open(path, "rb")
+        try:
+            dict_id = frame_dict_id(fh.read(_FRAME_HEADER_MAX))
+            fh.seek(0)
+            return self._decompressor(dict_id).stream_reader(fh, read_across_frames=True, closefd=True)
+        except BaseException:
+            fh.close()
+            raise
+
+    def iter_chunks(self, path, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+        with self.open_reader(path) as reader:
+            for chunk in iter(lambda: reader.read(chunk_size), b""):
+                yield chunk
+
+
+def frame_dict_id(head: bytes) -> int:
+    """Dictionary id recorded in the zstd frame starting `head` (0: none)."""
+    _require_zstd()
+    return zstandard.get_frame_parameters(head[:_FRAME_HEADER_MAX]).dict_id
+
+
+def file_dict_id(path) -> int:
+    """Dictionary id of the first frame of the zstd file `path` (0: none)."""
+    with open(path, "rb") as fh:
+        return frame_dict_id(fh.read(_FRAME_HEADER_MAX))
+
+
+def content_size(path) -> Optional[int]:
+    """Decompressed size recorded in the first frame of `path`, if any."""
+    _require_zstd()
+    with open(path, "rb") as fh:
+        size = zstandard.get_frame_parameters(fh.read(_FRAME_HEADER_MAX)).content_size
+    return None if size in (zstandard.CONTENTSIZE_UNKNOWN, zstandard.CONTENTSIZE_ERROR) else size
+
+
+def _dictionary_paths() -> List[str]:
+    return [p for p in (os.environ.get(ZSTD_DICT_ENV) or "").split(os.pathsep) if p]
+
+
+def read_codec() -> ZstdCodec:
+    """Codec for reading ``.zst`` files (and for writing when compression is enabled)."""
+    key = (tuple(_dictionary_paths()), int(os.environ.get(ZSTD_LEVEL_ENV) or DEFAULT_LEVEL))
+    with _CODECS_LOCK:
+        codec = _CODECS.get(key)
+        if codec is None:
+            codec = _CODECS[key] = ZstdCodec([Path(p).read_bytes() for p in key[0]], level=key[1])
+        return codec
+
+
+def get_codec() -> Optional[ZstdCodec]:
+    """The codec new files are compressed with, or None if `YT_STORE_COMPRESSION` is off."""
+    mode = (os.environ.get(STORE_COMPRESSION_ENV) or "none").lower()
+    if mode in ("none", "off", "0", ""):
+        return None
+    if mode != "zstd":
+        raise ValueError(f"unknown {STORE_COMPRESSION_ENV} {mode!r}; expected zstd or none")
+    return read_codec()
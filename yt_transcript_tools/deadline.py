@@ -0,0 +1,157 @@
+"""Latency budgets for extraction requests.
+
+``/extract/?budget_ms=...`` gives an extraction a deadline. Before the
+optional stages run, `plan_extraction` estimates their cost from recent
+timings (`StageTimings`: an exponentially weighted moving average per
+stage, per transcript line for the NLP stages) and degrades them in a fixed
+order until the estimate fits the time left:
+
+1. embedding / BM25 answer ranking -> the sentence-window heuristic;
+2. QA pairs -> skipped (questions are still extracted);
+3. the Perplexity summary -> skipped.
+
+A degraded result is marked ``partial`` and lists what was ``degraded``;
+the complete result can be produced afterwards by an async job (the API's
+``upgrade=true``). Without observations the planner uses conservative
+priors, so the first budgeted request on a cold process already plans.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional
+import threading
+import time
+
+from .advanced_qa import EMBED_AVAILABLE
+
+# seconds per transcript line (analysis) or per call (perplexity), used
+# until a stage has been observed; measured on the outputs/ samples and
+# rounded up (embeddings: CPU sentence-transformers)
+STAGE_PRIORS = {
+    "analysis:none": 1e-5,
+    "analysis:heuristic": 2e-5,
+    "analysis:bm25": 3e-5,
+    "analysis:embedding": 5e-4,
+    "analysis:auto": 5e-4,
+    "perplexity": 5.0,
+}
+DEFAULT_ALPHA = 0.2
+
+_TIMINGS = None
+_TIMINGS_LOCK = threading.Lock()
+
+
+def analysis_stage(qa_mode: Optional[str]) -> str:
+    """Timing key of the question/QA analysis with `qa_mode` (None: questions only)."""
+    return f"analysis:{qa_mode or 'none'}"
+
+
+class Deadline:
+    """A time budget started at construction."""
+
+    def __init__(self, budget: float, clock=time.monotonic):
+        self.budget = budget
+        self._clock = clock
+        self._start = clock()
+
+    def elapsed(self) -> float:
+        return self._clock() - self._start
+
+    def remaining(self) -> float:
+        return self.budget - self.elapsed()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class StageTimings:
+    """EWMA of recent stage costs, per unit of work (lines, calls)."""
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA, priors: Optional[Dict[str, float]] = None):
+        self.alpha = alpha
+        self.priors = dict(STAGE_PRIORS if priors is None else priors)
+        self._lock = threading.Lock()
+        self._costs: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+
+    def observe(self, stage: str, seconds: float, units: int = 1) -> None:
+        cost = seconds / max(1, units)
+        with self._lock:
+            old = self._costs.get(stage)
+            self._costs[stage] = cost if old is None else old + self.alpha * (cost - old)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def estimate(self, stage: str, units: int = 1) -> float:
+        """Expected seconds for `units` of `stage` (0 for unknown stages)."""
+        with self._lock:
+            cost = self._costs.get(stage, self.priors.get(stage, 0.0))
+        return cost * max(1, units)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stages = set(self._costs) | set(self.priors)
+            return {
+                s: {"cost": self._costs.get(s, self.priors.get(s)), "observed": self._counts.get(s, 0)}
+                for s in sorted(stages)
+            }
+
+
+class Plan(NamedTuple):
+    """Stages to run within a budget; see `plan_extraction`."""
+
+    qa_mode: Optional[str]  # None: skip QA pairs
+    use_perplexity: bool
+    degraded: List[Dict[str, Any]]
+    estimate: float  # seconds
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.degraded)
+
+
+def plan_extraction(remaining: float, n_lines: int, qa_mode: str, use_perplexity: bool, timings: "StageTimings") -> Plan:
+    """Cheapest degradation of (`qa_mode`, `use_perplexity`) expected to finish in `remaining` seconds.
+
+    Steps are taken in order, and only when they lower the estimate; if
+    even questions alone do not fit, that is what runs.
+    """
+    def cost(mode, perplexity):
+        return timings.estimate(analysis_stage(mode), n_lines) + (timings.estimate("perplexity") if perplexity else 0.0)
+
+    mode, perplexity = qa_mode, use_perplexity
+    degraded: List[Dict[str, Any]] = []
+    steps = []
+    if mode not in ("heuristic", None):
+        steps.append(("qa", "heuristic", perplexity))
+    steps.append(("qa", None, perplexity))
+    if perplexity:
+        steps.append(("perplexity", None, False))
+    estimate = cost(mode, perplexity)
+    for stage, new_mode, new_perplexity in steps:
+        if estimate <= remaining:
+            break
+        if stage == "perplexity":
+            new_mode = mode
+        new_estimate = cost(new_mode, new_perplexity)
+        if new_estimate >= estimate:
+            continue
+        if stage == "qa":
+            degraded.append({"stage": "qa", "requested": qa_mode, "used": new_mode})
+        else:
+            degraded.append({"stage": "perplexity", "requested": True, "used": False})
+        mode, perplexity, estimate = new_mode, new_perplexity, new_estimate
+    # one entry per stage: the final downgrade of QA replaces the intermediate one
+    merged: Dict[str, Dict[str, Any]] = {}
+    for entry in degraded:
+        merged[entry["stage"]] = entry
+    return Plan(mode, perplexity, list(merged.values()), estimate)
+
+
+def get_stage_timings() -> StageTimings:
+    """Process-wide `StageTimings` fed by the API's extractions."""
+    global _TIMINGS
+    with _TIMINGS_LOCK:
+        if _TIMINGS is None:
+            priors = dict(STAGE_PRIORS)
+            if not EMBED_AVAILABLE:
+                # "auto" falls back to the heuristic
+                priors["analysis:auto"] = priors["analysis:heuristic"]
+            _TIMINGS = StageTimings(priors=priors)
+        return _TIMINGS
@@ -1,21 +1,39 @@
-from typing import List
-from youtube_transcript_api import YouTubeTranscriptApi
+from typing import Any, Dict, List
+
+from .providers import _snippet_dict, get_provider
+from .resilience import guarded_fetch
+
+
+class TranscriptLines(list):
+    """Transcript lines (str) that keep the fetched snippets in `snippets`.
+
+    `snippets` holds one dict per line with text/start/duration, for
+    consumers that want the timings (e.g. the Parquet export).
+    """
+
+    snippets: List[Dict[str, Any]]
 
 
 def get_transcript_from_video_id(video_id: str) -> List[str]:
     """Return transcript lines (text) for a given YouTube `video_id`.
 
-    Uses the installed `youtube_transcript_api` and returns a list of
-    strings (one per transcript snippet). Exceptions from the underlying
-    library are propagated.
+    Fetches through the configured provider (`youtube_transcript_api` by
+    default, or recorded fixtures; see `yt_transcript_tools.providers`) and
+    returns a list of strings (one per transcript snippet), as a
+    `TranscriptLines` carrying the snippet timings. Failures raise
+    `resilience.TranscriptUnavailable` (the library exception is chained);
+    recent failures are answered from the negative cache and an unhealthy
+    upstream trips the circuit breaker (see `yt_transcript_tools.resilience`).
     """
-    # Use instance `fetch` for compatibility with newer library versions
-    transcript = YouTubeTranscriptApi().fetch(video_id)
-    lines = []
+    transcript = guarded_fetch(video_id, get_provider().fetch)
+    lines = TranscriptLines()
+    lines.snippets = []
     for entry in transcript:
         # entry can be an object with .text or a dict
-        if hasattr(entry, "text"):
-            lines.append(entry.text)
+        if hasattr(entry, "text") or isinstance(entry, dict):
+            snippet = _snippet_dict(entry)
         else:
-            lines.append(entry.get("text") if isinstance(entry, dict) else str(entry))
+            snippet = {"text": str(entry)}
+        lines.append(snippet["text"])
+        lines.snippets.append(snippet)
     return lines
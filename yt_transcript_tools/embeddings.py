@@ -0,0 +1,182 @@
+"""Pluggable sentence-embedding backends used by `advanced_qa`.
+
+Every backend embeds text with the same model (all-MiniLM-L6-v2) and exposes
+a SentenceTransformer-style `encode(sentences, batch_size=...)` returning one
+row per sentence, so backends are interchangeable inside `advanced_qa` and
+`EmbeddingBatcher`.
+
+Available backends (select with `YT_EMBED_BACKEND` or `get_embedding_backend(name)`):
+
+- ``sentence-transformers`` (default): PyTorch fp32 via `sentence-transformers`.
+- ``torch-int8``: the same model with its Linear layers dynamically quantized
+  to int8 (`torch.quantization.quantize_dynamic`); CPU only.
+- ``onnx`` / ``onnx-int8``: ONNX Runtime, loading an exported model from
+  `YT_EMBED_ONNX_PATH`. Export it once with::
+
+      optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 \\
+          --task feature-extraction models/minilm-onnx
+
+  The directory must contain `model.onnx` and `tokenizer.json`. ``onnx-int8``
+  uses `model_int8.onnx` from the same directory, creating it with
+  `onnxruntime.quantization.quantize_dynamic` the first time.
+
+All optional dependencies are imported lazily; an unavailable backend raises
+`RuntimeError` when it is requested.
+"""
+from typing import Dict, Optional, Sequence
+import os
+import threading
+
+EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBED_BACKEND_ENV = "YT_EMBED_BACKEND"
+EMBED_ONNX_PATH_ENV = "YT_EMBED_ONNX_PATH"
+EMBED_THREADS_ENV = "YT_EMBED_THREADS"
+
+DEFAULT_BACKEND = "sentence-transformers"
+
+_BACKENDS: Dict[str, "EmbeddingBackend"] = {}
+_FAILED: Dict[str, Exception] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+class EmbeddingBackend:
+    """Interface: turn a list of sentences into embedding rows."""
+
+    name = "base"
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32, **kwargs):
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """PyTorch fp32 model loaded through `sentence-transformers`."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str = EMBED_MODEL_NAME):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except Exception as e:
+            raise RuntimeError(f"sentence-transformers is not installed: {e}")
+        self.model = self._load(SentenceTransformer, model_name)
+
+    def _load(self, cls, model_name: str):
+        return cls(model_name)
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32, **kwargs):
+        kwargs.setdefault("show_progress_bar", False)
+        return self.model.encode(list(sentences), batch_size=batch_size, convert_to_numpy=True, **kwargs)
+
+
+class QuantizedTorchBackend(SentenceTransformerBackend):
+    """Same model with Linear layers dynamically quantized to int8 (CPU)."""
+
+    name = "torch-int8"
+
+    def _load(self, cls, model_name: str):
+        import torch
+
+        model = cls(model_name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """ONNX Runtime inference with mean pooling and L2 normalisation.
+
+    Reproduces the sentence-transformers pipeline of MiniLM (token embeddings
+    -> attention-masked mean -> normalise) so vectors are comparable with the
+    default backend.
+    """
+
+    name = "onnx"
+    model_file = "model.onnx"
+
+    def __init__(self, model_dir: Optional[str] = None, max_length: int = 256):
+        try:
+            import numpy as np
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except Exception as e:
+            raise RuntimeError(f"onnxruntime/tokenizers are not installed: {e}")
+        model_dir = model_dir or os.environ.get(EMBED_ONNX_PATH_ENV)
+        if not model_dir:
+            raise RuntimeError(f"ONNX model directory not configured. Set the {EMBED_ONNX_PATH_ENV} env var.")
+        self._np = np
+        self.model_path = self._model_path(model_dir)
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        opts = ort.SessionOptions()
+        threads = os.environ.get(EMBED_THREADS_ENV)
+        if threads:
+            opts.intra_op_num_threads = int(threads)
+        self.session = ort.InferenceSession(self.model_path, opts, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _model_path(self, model_dir: str) -> str:
+        return os.path.join(model_dir, self.model_file)
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32, **kwargs):
+        np = self._np
+        rows = []
+        sentences = list(sentences)
+        for start in range(0, len(sentences), batch_size):
+            encs = self.tokenizer.encode_batch(sentences[start:start + batch_size])
+            feeds = {
+                "input_ids": np.array([e.ids for e in encs], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encs], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encs], dtype=np.int64),
+            }
+            feeds = {k: v for k, v in feeds.items() if k in self.input_names}
+            tokens = self.session.run(None, feeds)[0]
+            mask = feeds["attention_mask"][..., None].astype(tokens.dtype)
+            pooled = (tokens * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            rows.append(pooled)
+        if not rows:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(rows)
+
+
+class QuantizedOnnxBackend(OnnxBackend):
+    """ONNX Runtime with a dynamically int8-quantized copy of the model."""
+
+    name = "onnx-int8"
+    model_file = "model_int8.onnx"
+
+    def _model_path(self, model_dir: str) -> str:
+        path = os.path.join(model_dir, self.model_file)
+        if not os.path.exists(path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(os.path.join(model_dir, OnnxBackend.model_file), path, weight_type=QuantType.QInt8)
+        return path
+
+
+EMBEDDING_BACKENDS = {
+    cls.name: cls
+    for cls in (SentenceTransformerBackend, QuantizedTorchBackend, OnnxBackend, QuantizedOnnxBackend)
+}
+
+
+def get_embedding_backend(name: Optional[str] = None) -> EmbeddingBackend:
+    """Return the (cached) backend called `name`, or the configured default.
+
+    Raises `ValueError` for unknown names and `RuntimeError` when the
+    backend's dependencies or model files are missing.
+    """
+    name = name or os.environ.get(EMBED_BACKEND_ENV) or DEFAULT_BACKEND
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend {name!r}; choose from {sorted(EMBEDDING_BACKENDS)}")
+    with _BACKENDS_LOCK:
+        if name in _FAILED:
+            raise _FAILED[name]
+        if name not in _BACKENDS:
+            try:
+                _BACKENDS[name] = EMBEDDING_BACKENDS[name]()
+            except Exception as e:
+                # remember the failure so callers that fall back to heuristics
+                # don't pay for a failing import/load on every call
+                _FAILED[name] = e
+                raise
+        return _BACKENDS[name]
@@ -0,0 +1,299 @@
+"""Columnar export of the processed corpus to Parquet datasets.
+
+`ParquetExporter` appends videos to three datasets under one root
+(`YT_PARQUET_DIR`, default ``parquet``):
+
+- ``transcripts``: video_id, line, text, start, duration (seconds; null
+  when the timing is not known);
+- ``questions``: video_id, idx, question;
+- ``qa_pairs``: video_id, idx, question, answer, score (null for pairs
+  recovered from ``*_qa.txt`` files, which do not store scores).
+
+Each dataset is hive-partitioned by export day
+(``transcripts/ingest_date=2024-05-01/part-....parquet``). Videos are
+buffered and written as one file per dataset per `flush`, so appends never
+rewrite existing files; ``_manifest.json`` records exported video ids so
+re-running an export only adds new videos. Several processes (API
+workers, queue workers) may share one root: the manifest is re-read and
+merged under a file lock (``.manifest.lock``, POSIX) on every flush, and
+videos another process exported meanwhile are dropped from the batch.
+Query the result directly, e.g.::
+
+    duckdb -c "SELECT video_id, count(*) FROM read_parquet('parquet/qa_pairs/*/*.parquet', hive_partitioning=1) GROUP BY 1"
+    polars.scan_parquet("parquet/transcripts/**/*.parquet")
+
+Requires pyarrow (``pip install pyarrow``).
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import uuid4
+import json
+import os
+import re
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process manifest lock
+    fcntl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except Exception:
+    pa = pq = None
+    PYARROW_AVAILABLE = False
+
+from .compression import ZSTD_SUFFIX, is_compressed
+from .providers import FixtureStore, _snippet_dict
+from .storage import atomic_write_text, find_stored, read_text
+
+PARQUET_DIR_ENV = "YT_PARQUET_DIR"
+PARQUET_BATCH_ENV = "YT_PARQUET_BATCH"
+DEFAULT_PARQUET_DIR = "parquet"
+DATASETS = ("transcripts", "questions", "qa_pairs")
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_LOCK_NAME = ".manifest.lock"
+
+_QA_LINE_RE = re.compile(r"^([QA])(\d+): ?(.*)$")
+
+_EXPORTER = None
+_EXPORTER_LOCK = threading.Lock()
+
+
+def _schemas() -> Dict[str, Any]:
+    return {
+        "transcripts": pa.schema([
+            ("video_id", pa.string()), ("line", pa.int32()), ("text", pa.string()),
+            ("start", pa.float64()), ("duration", pa.float64()),
+        ]),
+        "questions": pa.schema([("video_id", pa.string()), ("idx", pa.int32()), ("question", pa.string())]),
+        "qa_pairs": pa.schema([
+            ("video_id", pa.string()), ("idx", pa.int32()), ("question", pa.string()),
+            ("answer", pa.string()), ("score", pa.float64()),
+        ]),
+    }
+
+
+def parse_qa_text(text: str) -> List[Dict[str, Any]]:
+    """Parse the ``Q1: ...`` / ``A1: ...`` layout of ``*_qa.txt`` files into pairs."""
+    pairs: Dict[int, Dict[str, Any]] = {}
+    current = None
+    for line in text.splitlines():
+        m = _QA_LINE_RE.match(line)
+        if m:
+            kind, num, body = m.group(1), int(m.group(2)), m.group(3)
+            pair = pairs.setdefault(num, {"q": "", "a": "", "score": None})
+            current = (pair, "q" if kind == "Q" else "a")
+            pair[current[1]] = body
+        elif line and current is not None:
+            # wrapped continuation of the previous question/answer
+            pair, key = current
+            pair[key] = f"{pair[key]}\n{line}"
+        else:
+            current = None
+    return [pairs[n] for n in sorted(pairs)]
+
+
+class ParquetExporter:
+    """Incremental writer of the transcripts/questions/qa_pairs datasets."""
+
+    def __init__(self, root=None, compression: str = "zstd", batch_videos: int = 100):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for Parquet export (pip install pyarrow)")
+        self.root = Path(root or os.environ.get(PARQUET_DIR_ENV) or DEFAULT_PARQUET_DIR)
+        self.compression = compression
+        self.batch_videos = batch_videos
+        self._schemas = _schemas()
+        self._rows: Dict[str, Dict[str, list]] = {name: {f: [] for f in self._schemas[name].names} for name in DATASETS}
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._manifest_path = self.root / MANIFEST_NAME
+        self._manifest = {"videos": {}}
+        self._manifest_stamp = None
+        self._refresh_manifest()
+
+    def __enter__(self) -> "ParquetExporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+    def _refresh_manifest(self) -> None:
+        """Merge in entries other processes added to the manifest since it was last read."""
+        try:
+            st = self._manifest_path.stat()
+        except FileNotFoundError:
+            return
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if stamp == self._manifest_stamp:
+            return
+        try:
+            videos = json.loads(self._manifest_path.read_text(encoding="utf-8")).get("videos", {})
+        except (FileNotFoundError, ValueError):
+            return
+        for vid, entry in videos.items():
+            self._manifest["videos"].setdefault(vid, entry)
+        self._manifest_stamp = stamp
+
+    @contextmanager
+    def _manifest_lock(self):
+        """Exclusive lock on the manifest across processes sharing the root."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self.root / MANIFEST_LOCK_NAME, "a") as fh:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def exported(self, video_id: str) -> bool:
+        """True if `video_id` is already in the datasets or waiting to be flushed."""
+        if video_id in self._pending:
+            return True
+        self._refresh_manifest()
+        return video_id in self._manifest["videos"]
+
+    def add(self, video_id: str, transcript: Iterable[Any], questions: Optional[Iterable[str]] = None, qa_pairs: Optional[Iterable[Dict[str, Any]]] = None) -> bool:
+        """Buffer one video; returns False if it was exported before.
+
+        `transcript` holds lines (str) or snippets with text/start/duration
+        (dicts or objects). Flushes automatically every `batch_videos` videos.
+        """
+        with self._lock:
+            if self.exported(video_id):
+                return False
+            rows = self._rows
+            t = rows["transcripts"]
+            for i, entry in enumerate(transcript):
+                snippet = {"text": entry} if isinstance(entry, str) else _snippet_dict(entry)
+                t["video_id"].append(video_id)
+                t["line"].append(i)
+                t["text"].append(snippet["text"])
+                t["start"].append(snippet.get("start"))
+                t["duration"].append(snippet.get("duration"))
+            q = rows["questions"]
+            for i, question in enumerate(questions or [], 1):
+                q["video_id"].append(video_id)
+                q["idx"].append(i)
+                q["question"].append(question)
+            qa = rows["qa_pairs"]
+            for i, pair in enumerate(qa_pairs or [], 1):
+                qa["video_id"].append(video_id)
+                qa["idx"].append(i)
+                qa["question"].append(pair.get("q", ""))
+                qa["answer"].append(pair.get("a", ""))
+                qa["score"].append(pair.get("score"))
+            self._pending.append(video_id)
+            full = len(self._pending) >= self.batch_videos
+        if full:
+            self.flush()
+        return True
+
+    def _drop_rows(self, video_ids) -> None:
+        """Remove buffered rows of `video_ids`; lock held."""
+        self._pending = [vid for vid in self._pending if vid not in video_ids]
+        for dataset in DATASETS:
+            columns = self._rows[dataset]
+            keep = [i for i, vid in enumerate(columns["video_id"]) if vid not in video_ids]
+            for field in columns:
+                columns[field] = [columns[field][i] for i in keep]
+
+    def flush(self) -> int:
+        """Write buffered videos as one new file per dataset; returns the number of videos."""
+        with self._lock, self._manifest_lock():
+            if not self._pending:
+                return 0
+            self._refresh_manifest()
+            # another process may have exported some of these meanwhile
+            done = set(self._pending) & set(self._manifest["videos"])
+            if done:
+                self._drop_rows(done)
+            if not self._pending:
+                return 0
+            day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            name = f"part-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{uuid4().hex[:8]}.parquet"
+            files = {}
+            for dataset in DATASETS:
+                columns = self._rows[dataset]
+                if not columns["video_id"]:
+                    continue
+                table = pa.Table.from_pydict(columns, schema=self._schemas[dataset])
+                part_dir = self.root / dataset / f"ingest_date={day}"
+                part_dir.mkdir(parents=True, exist_ok=True)
+                # hidden temporary name: dataset readers skip dot-files
+                tmp = part_dir / f".{name}.tmp"
+                pq.write_table(table, tmp, compression=self.compression)
+                os.replace(tmp, part_dir / name)
+                files[dataset] = str((part_dir / name).relative_to(self.root))
+            # the manifest is updated last: videos count as exported only once
+            # their rows are in place
+            exported_at = datetime.now(timezone.utc).isoformat()
+            for vid in self._pending:
+                self._manifest["videos"][vid] = {"exported_at": exported_at, "files": files}
+            atomic_write_text(self._manifest_path, json.dumps(self._manifest, ensure_ascii=False))
+            self._manifest_stamp = None
+            count = len(self._pending)
+            self._pending = []
+            self._rows = {d: {f: [] for f in self._schemas[d].names} for d in DATASETS}
+            return count
+
+
+def _fixture_snippets(store: Optional[FixtureStore], video_id: str, lines: List[str]) -> List[Any]:
+    """Recorded snippets (with timings) for `video_id` if they match its stored lines."""
+    if store is None:
+        return lines
+    record = store.load(video_id)
+    snippets = (record or {}).get("snippets") or []
+    if len(snippets) == len(lines):
+        return snippets
+    return lines
+
+
+def export_outputs(out_dir, exporter: ParquetExporter, fixture_dir=None) -> Dict[str, int]:
+    """Export every ``<id>_transcript.txt`` in `out_dir` (or its shards) not exported yet.
+
+    Questions and QA pairs come from the matching ``_questions.txt`` /
+    ``_qa.txt`` files; start/duration from recorded fixtures in
+    `fixture_dir` (see `providers.FixtureStore`) when available.
+    """
+    out_dir = Path(out_dir)
+    store = FixtureStore(fixture_dir) if fixture_dir else None
+    added = skipped = 0
+    # flat layout and the API's shard directories (see `artifacts.ArtifactStore`),
+    # plain or zstd-compressed
+    paths = []
+    for pattern in ("*_transcript.txt", "*/*_transcript.txt", "*_transcript.txt.zst", "*/*_transcript.txt.zst"):
+        paths.extend(out_dir.glob(pattern))
+    for path in sorted(paths, key=lambda p: p.name):
+        name = path.name[: -len(ZSTD_SUFFIX)] if is_compressed(path) else path.name
+        vid = name[: -len("_transcript.txt")]
+        if exporter.exported(vid):
+            skipped += 1
+            continue
+        lines = read_text(path).splitlines()
+        qpath, qapath = find_stored(path.parent / f"{vid}_questions.txt"), find_stored(path.parent / f"{vid}_qa.txt")
+        questions = [q for q in read_text(qpath).splitlines() if q.strip()] if qpath else None
+        qa_pairs = parse_qa_text(read_text(qapath)) if qapath else None
+        exporter.add(vid, _fixture_snippets(store, vid, lines), questions, qa_pairs)
+        added += 1
+    exporter.flush()
+    return {"added": added, "skipped": skipped}
+
+
+def get_exporter() -> Optional[ParquetExporter]:
+    """Return the exporter for `YT_PARQUET_DIR` (created once), or None if unset."""
+    global _EXPORTER
+    root = os.environ.get(PARQUET_DIR_ENV)
+    if not root:
+        return None
+    with _EXPORTER_LOCK:
+        if _EXPORTER is None:
+            _EXPORTER = ParquetExporter(root, batch_videos=int(os.environ.get(PARQUET_BATCH_ENV, "50")))
+        return _EXPORTER
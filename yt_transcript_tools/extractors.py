@@ -1,6 +1,11 @@
+from collections import deque
 from pathlib import Path
 import re
-from typing import List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .compression import is_compressed
+from .mmap_reader import MappedTranscript
+from .storage import iter_lines
 
 QUESTION_STARTS = [
     "who",
@@ -31,6 +36,10 @@ QUESTION_STARTS = [
 ]
 
 
+_QUESTION_START_RE = re.compile("(?:" + "|".join(QUESTION_STARTS) + ")[ ']")
+_WH_WORDS = frozenset(("who", "what", "when", "where", "why", "how", "which"))
+
+
 def looks_like_question(text: str) -> bool:
     if not text:
         return False
@@ -38,151 +47,223 @@ def looks_like_question(text: str) -> bool:
     if "?" in s:
         return True
     s_low = s.lower()
-    for q in QUESTION_STARTS:
-        if s_low.startswith(q + " ") or s_low.startswith(q + "'"):
-            return True
-    first_words = s_low.split()[:6]
-    for w in first_words:
-        if w in ("who", "what", "when", "where", "why", "how", "which"):
+    if _QUESTION_START_RE.match(s_low):
+        return True
+    for w in s_low.split(None, 6)[:6]:
+        if w in _WH_WORDS:
             return True
     return False
 
 
-def extract_questions_from_lines(lines: List[str]) -> List[str]:
-    """Return a list of detected question strings from `lines` (no file I/O)."""
-    n = len(lines)
+def iter_questions(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the distinct questions detected in `lines`, consuming them lazily."""
+    w = _LookaheadLines(lines, strip=False)
+    seen = set()
+
+    def unique(candidate: str):
+        q_norm = re.sub(r"\s+", " ", candidate.strip().lower())
+        if q_norm in seen:
+            return None
+        seen.add(q_norm)
+        return candidate.strip()
+
     i = 0
-    questions: List[str] = []
-    while i < n:
-        if not lines[i]:
+    while w.has(i):
+        w.release(i)
+        if not w[i]:
             i += 1
             continue
 
-        if looks_like_question(lines[i]):
-            combined = lines[i]
+        if looks_like_question(w[i]):
+            combined = w[i]
             j = i + 1
-            while j < n and j < i + 3 and len(combined) < 120 and not looks_like_question(lines[j]):
-                if lines[j]:
-                    combined = combined + " " + lines[j]
+            while w.has(j) and j < i + 3 and len(combined) < 120 and not looks_like_question(w[j]):
+                if w[j]:
+                    combined = combined + " " + w[j]
                 j += 1
             candidate = combined.strip()
             if not candidate.endswith("?"):
                 candidate = candidate + "?"
-            questions.append(candidate)
+            q = unique(candidate)
+            if q is not None:
+                yield q
             i = j
             continue
 
-        combined2 = (lines[i] + " " + lines[i + 1]).strip() if i + 1 < n else ""
-        combined3 = (combined2 + " " + lines[i + 2]).strip() if i + 2 < n else ""
-        if looks_like_question(combined2):
-            candidate = combined2
-            if not candidate.endswith("?"):
-                candidate = candidate + "?"
-            questions.append(candidate)
-            i += 2
-            continue
-        if looks_like_question(combined3):
-            candidate = combined3
-            if not candidate.endswith("?"):
-                candidate = candidate + "?"
-            questions.append(candidate)
-            i += 3
-            continue
+        combined2 = (w[i] + " " + w[i + 1]).strip() if w.has(i + 1) else ""
+        combined3 = (combined2 + " " + w[i + 2]).strip() if w.has(i + 2) else ""
+        for candidate, width in ((combined2, 2), (combined3, 3)):
+            if looks_like_question(candidate):
+                if not candidate.endswith("?"):
+                    candidate = candidate + "?"
+                q = unique(candidate)
+                if q is not None:
+                    yield q
+                i += width
+                break
+        else:
+            i += 1
+
+
+def extract_questions_from_lines(lines: Iterable[str]) -> List[str]:
+    """Return a list of detected question strings from `lines` (no file I/O)."""
+    return list(iter_questions(lines))
+
+
+def _read_lines(input_path: Path, use_mmap: bool) -> Iterable[str]:
+    if is_compressed(input_path):
+        # compressed transcripts cannot be mapped; they are decompressed as a stream
+        return iter_lines(input_path)
+    if use_mmap:
+        return MappedTranscript(input_path)
+    return [ln.strip() for ln in input_path.read_text(encoding="utf-8").splitlines()]
+
+
+def extract_questions(input_path: Path, output_path: Path, use_mmap: bool = False) -> int:
+    """Write the questions in `input_path` to `output_path`, one per line.
 
-        i += 1
+    With `use_mmap` the transcript is streamed from a memory map
+    (`MappedTranscript`) instead of being read into memory.
+    """
+    lines = _read_lines(input_path, use_mmap)
+    count = 0
+    try:
+        with open(output_path, "w", encoding="utf-8") as out:
+            for q in iter_questions(lines):
+                out.write(q + "\n")
+                count += 1
+    finally:
+        close = getattr(lines, "close", None)
+        if close is not None:
+            close()
+    return count
 
-    # dedupe while preserving order
+
+class _LookaheadLines:
+    """Index-addressable view over a line iterator that is pulled lazily.
+
+    Only lines from the last `release`d index onwards are kept, so memory is
+    bounded by the span the extractor is currently looking at rather than
+    by the transcript length.
+    """
+
+    def __init__(self, lines: Iterable[str], strip: bool = True):
+        self._it = iter(lines)
+        self._strip = strip
+        self._buf: deque = deque()
+        self._base = 0
+
+    def has(self, idx: int) -> bool:
+        while idx >= self._base + len(self._buf):
+            try:
+                line = next(self._it)
+                self._buf.append(line.strip() if self._strip else line)
+            except StopIteration:
+                return False
+        return True
+
+    def __getitem__(self, idx: int) -> str:
+        return self._buf[idx - self._base]
+
+    def release(self, idx: int) -> None:
+        while self._base < idx and self._buf:
+            self._buf.popleft()
+            self._base += 1
+
+
+def iter_extraction_events(lines: Iterable[str]) -> Iterator[Dict[str, object]]:
+    """Incrementally detect questions and Q/A pairs in a stream of lines.
+
+    Consumes `lines` lazily (any iterable, e.g. `fetcher.fetch_transcript_lines`)
+    and yields events as soon as they are decided:
+
+    - ``{"type": "question", "line": i, "text": q}`` once a question's text is
+      complete (at most 3 lines of lookahead); repeated questions are reported
+      once,
+    - ``{"type": "qa", "line": i, "q": q, "a": a}`` once its answer (up to 6
+      non-empty lines, stopping at the next question) has been read.
+
+    Detection follows the same rules as `extract_qa`, which is built on it.
+    """
+    w = _LookaheadLines(lines)
     seen = set()
-    deduped = []
-    for q in questions:
-        q_norm = re.sub(r"\s+", " ", q.strip().lower())
-        if q_norm not in seen:
-            seen.add(q_norm)
-            deduped.append(q.strip())
-    return deduped
-
-
-def extract_questions(input_path: Path, output_path: Path) -> int:
-    lines = [ln.strip() for ln in input_path.read_text(encoding="utf-8").splitlines()]
-    questions = extract_questions_from_lines(lines)
-    output_path.write_text("\n".join(questions) + ("\n" if questions else ""), encoding="utf-8")
-    return len(questions)
-
-
-def extract_qa(input_path: Path, output_path: Path) -> int:
-    text = input_path.read_text(encoding="utf-8")
-    lines = [ln.strip() for ln in text.splitlines()]
-    qa_pairs: List[Tuple[str, str]] = []
     i = 0
-    n = len(lines)
-    while i < n:
-        if not lines[i]:
+
+    def question_event(line_no: int, q: str):
+        q_norm = re.sub(r"\s+", " ", q.strip().lower().rstrip("?"))
+        if q_norm in seen:
+            return None
+        seen.add(q_norm)
+        return {"type": "question", "line": line_no, "text": re.sub(r"\s+", " ", q.rstrip("?") + "?")}
+
+    def read_answer(j: int) -> Tuple[str, int]:
+        ans_parts = []
+        k = j
+        while w.has(k) and len(ans_parts) < 6 and not looks_like_question(w[k]):
+            if w[k]:
+                ans_parts.append(w[k])
+            k += 1
+        return " ".join(ans_parts).strip(), k
+
+    while w.has(i):
+        w.release(i)
+        if not w[i]:
             i += 1
             continue
 
-        if looks_like_question(lines[i]):
-            q = lines[i]
+        if looks_like_question(w[i]):
+            q = w[i]
             j = i + 1
-            while j < n and j < i + 3 and not looks_like_question(lines[j]) and len(q) < 120:
-                if lines[j]:
-                    q = q + " " + lines[j]
+            while w.has(j) and j < i + 3 and not looks_like_question(w[j]) and len(q) < 120:
+                if w[j]:
+                    q = q + " " + w[j]
                 j += 1
+            ev = question_event(i, q)
+            if ev:
+                yield ev
 
-            ans_parts = []
-            k = j
-            while k < n and len(ans_parts) < 6 and not looks_like_question(lines[k]):
-                if lines[k]:
-                    ans_parts.append(lines[k])
-                k += 1
-
-            answer = " ".join(ans_parts).strip()
+            answer, k = read_answer(j)
             if not answer:
                 m = j
-                while m < n and not lines[m]:
+                while w.has(m) and not w[m]:
                     m += 1
-                if m < n:
-                    answer = lines[m]
+                if w.has(m):
+                    answer = w[m]
 
-            qa_pairs.append((re.sub(r"\s+", " ", q.rstrip("?") + "?"), re.sub(r"\s+", " ", answer)))
+            yield {"type": "qa", "line": i, "q": re.sub(r"\s+", " ", q.rstrip("?") + "?"), "a": re.sub(r"\s+", " ", answer)}
             i = k
             continue
 
-        combined2 = (lines[i] + " " + lines[i + 1]).strip() if i + 1 < n else ""
-        combined3 = (combined2 + " " + lines[i + 2]).strip() if i + 2 < n else ""
-        if looks_like_question(combined2):
-            q = combined2
-            j = i + 2
-            ans_parts = []
-            k = j
-            while k < n and len(ans_parts) < 6 and not looks_like_question(lines[k]):
-                if lines[k]:
-                    ans_parts.append(lines[k])
-                k += 1
-            answer = " ".join(ans_parts).strip()
-            qa_pairs.append((re.sub(r"\s+", " ", q.rstrip("?") + "?"), re.sub(r"\s+", " ", answer)))
-            i = k
-            continue
-        if looks_like_question(combined3):
-            q = combined3
-            j = i + 3
-            ans_parts = []
-            k = j
-            while k < n and len(ans_parts) < 6 and not looks_like_question(lines[k]):
-                if lines[k]:
-                    ans_parts.append(lines[k])
-                k += 1
-            answer = " ".join(ans_parts).strip()
-            qa_pairs.append((re.sub(r"\s+", " ", q.rstrip("?") + "?"), re.sub(r"\s+", " ", answer)))
-            i = k
-            continue
-
-        i += 1
+        combined2 = (w[i] + " " + w[i + 1]).strip() if w.has(i + 1) else ""
+        combined3 = (combined2 + " " + w[i + 2]).strip() if w.has(i + 2) else ""
+        for q, width in ((combined2, 2), (combined3, 3)):
+            if looks_like_question(q):
+                ev = question_event(i, q)
+                if ev:
+                    yield ev
+                answer, k = read_answer(i + width)
+                yield {"type": "qa", "line": i, "q": re.sub(r"\s+", " ", q.rstrip("?") + "?"), "a": re.sub(r"\s+", " ", answer)}
+                i = k
+                break
+        else:
+            i += 1
 
-    out_lines: List[str] = []
-    for idx, (q, a) in enumerate(qa_pairs, start=1):
-        out_lines.append(f"Q{idx}: {q}")
-        out_lines.append(f"A{idx}: {a if a else '[No answer found]'}")
-        out_lines.append("")
 
-    output_path.write_text("\n".join(out_lines), encoding="utf-8")
-    return len(qa_pairs)
+def extract_qa(input_path: Path, output_path: Path, use_mmap: bool = False) -> int:
+    """Write the Q/A pairs in `input_path` to `output_path`; see `extract_questions` for `use_mmap`."""
+    lines = _read_lines(input_path, use_mmap)
+    count = 0
+    try:
+        with open(output_path, "w", encoding="utf-8") as out:
+            for ev in iter_extraction_events(lines):
+                if ev["type"] != "qa":
+                    continue
+                count += 1
+                if count > 1:
+                    out.write("\n")
+                out.write(f"Q{count}: {ev['q']}\nA{count}: {ev['a'] if ev['a'] else '[No answer found]'}\n")
+    finally:
+        close = getattr(lines, "close", None)
+        if close is not None:
+            close()
+    return count
@@ -1,7 +1,17 @@
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, List, NamedTuple, Optional
+import json
+import os
 
-from youtube_transcript_api import YouTubeTranscriptApi
+from .compression import get_codec
+from .extractors import iter_extraction_events
+from .providers import get_provider
+from .resilience import guarded_fetch
+from .storage import write_stored
+
+# lines of already-stored transcript re-scanned with each tail update so that
+# questions straddling the previous end are still detected
+TAIL_OVERLAP_LINES = 8
 
 
 def _entry_text(entry) -> str:
@@ -18,22 +28,167 @@ def _entry_text(entry) -> str:
     return text
 
 
+def _entry_start(entry) -> Optional[float]:
+    """Return the start time (seconds) of a transcript entry, if it has one."""
+    start = getattr(entry, "start", None)
+    if start is None and isinstance(entry, dict):
+        start = entry.get("start")
+    return float(start) if start is not None else None
+
+
 def fetch_transcript(video_id: str, out_path: str | Path = "transcript.txt") -> Path:
     """Fetch transcript for `video_id` and write to `out_path` (UTF-8).
 
-    Returns the path to the written file. Raises exceptions from the
-    underlying `youtube_transcript_api` if retrieval fails.
+    With `YT_STORE_COMPRESSION=zstd` (or an `out_path` ending in ``.zst``)
+    the file is zstd-compressed to ``<out_path>.zst``. Returns the path to
+    the written file. Raises `resilience.TranscriptUnavailable` if
+    retrieval fails.
     """
-    transcript = YouTubeTranscriptApi().fetch(video_id)
-    out_path = Path(out_path)
-    with out_path.open("w", encoding="utf-8") as fh:
-        for entry in transcript:
-            fh.write(_entry_text(entry) + "\n")
-    return out_path
+    transcript = guarded_fetch(video_id, get_provider().fetch)
+    text = "".join(_entry_text(entry) + "\n" for entry in transcript)
+    return write_stored(out_path, text.encode("utf-8"), get_codec())
 
 
 def fetch_transcript_lines(video_id: str) -> Iterable[str]:
     """Yield transcript text lines (strings) for the video ID without writing a file."""
-    transcript = YouTubeTranscriptApi().fetch(video_id)
+    transcript = guarded_fetch(video_id, get_provider().fetch)
     for entry in transcript:
         yield _entry_text(entry)
+
+
+class TailUpdate(NamedTuple):
+    """Result of one `fetch_transcript_tail` poll."""
+
+    path: Path
+    first_line: int  # line number (0-based) of new_lines[0] in the stored transcript
+    new_lines: List[str]
+    context_lines: List[str]  # up to TAIL_OVERLAP_LINES lines preceding new_lines
+    state: dict
+
+
+def tail_state_path(out_path: str | Path) -> Path:
+    out_path = Path(out_path)
+    return out_path.with_name(out_path.name + ".tail.json")
+
+
+def _write_state(path: Path, state: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def fetch_transcript_tail(video_id: str, out_path: str | Path = "transcript.txt", overlap: int = TAIL_OVERLAP_LINES) -> TailUpdate:
+    """Append only snippets that are new since the last poll to `out_path`.
+
+    Progress (start time of the last stored snippet, number of snippets and
+    lines stored and the last `overlap` lines) is kept in a sidecar
+    `<out_path>.tail.json`. If the sidecar is missing or belongs to another
+    video, the transcript is written from scratch.
+    """
+    out_path = Path(out_path)
+    state_path = tail_state_path(out_path)
+    state = None
+    if state_path.exists() and out_path.exists():
+        try:
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+        except ValueError:
+            state = None
+    if not state or state.get("video_id") != video_id:
+        state = {"video_id": video_id, "count": 0, "lines": 0, "last_start": None, "tail": []}
+        out_path.write_text("", encoding="utf-8")
+
+    transcript = list(guarded_fetch(video_id, get_provider().fetch))
+    count = state["count"]
+    last_start = state["last_start"]
+    if count <= len(transcript) and (count == 0 or _entry_start(transcript[count - 1]) == last_start):
+        new_entries = transcript[count:]
+    else:
+        # upstream re-segmented the transcript; fall back to the timestamp
+        new_entries = [e for e in transcript if last_start is None or (_entry_start(e) or 0.0) > last_start]
+
+    first_line = state.get("lines", 0)
+    new_lines = [_entry_text(e) for e in new_entries]
+    context = list(state["tail"])
+    if new_lines:
+        with out_path.open("a", encoding="utf-8") as fh:
+            for line in new_lines:
+                fh.write(line + "\n")
+        state["last_start"] = _entry_start(new_entries[-1])
+        state["count"] = len(transcript)
+        state["lines"] = first_line + len(new_lines)
+        state["tail"] = (context + new_lines)[-overlap:] if overlap > 0 else []
+        _write_state(state_path, state)
+    elif not state_path.exists():
+        _write_state(state_path, state)
+    return TailUpdate(out_path, first_line, new_lines, context, state)
+
+
+def _append_entries(path: str | Path, entries: List[str], replace_from: Optional[int] = None) -> Optional[int]:
+    """Append `entries` to `path`, first cutting it at byte `replace_from`.
+
+    Returns the offset at which the last entry starts (None if no entries).
+    """
+    with Path(path).open("a+b") as fh:
+        if replace_from is not None:
+            fh.truncate(replace_from)
+        fh.seek(0, os.SEEK_END)
+        last = None
+        for entry in entries:
+            last = fh.tell()
+            fh.write(entry.encode("utf-8"))
+    return last
+
+
+def extract_tail(update: TailUpdate, questions_path: str | Path, qa_path: str | Path) -> int:
+    """Run question/QA extraction on the new region of a tail update.
+
+    Only the new lines plus the overlap context are scanned. Events that
+    start inside the context were reported by an earlier poll and are
+    skipped, except for the last question and Q/A pair reported: their
+    text may run into the new lines (e.g. a question answered only after
+    the previous end), so when the rescan changes them they are rewritten
+    in place. Questions and Q/A pairs are appended to the given files, with
+    Q/A numbering continued from the tail state. Returns the number of new
+    Q/A pairs.
+    """
+    if not update.new_lines:
+        return 0
+    state = update.state
+    base = update.first_line - len(update.context_lines)
+    # without a record of the last events, everything before the new lines
+    # was reported except what the rescan changes, which is appended as new
+    last_q = state.get("last_question") or {"line": update.first_line - 1, "text": None, "offset": None}
+    last_qa = state.get("last_qa") or {"line": update.first_line - 1, "q": None, "a": None, "no": None, "offset": None}
+    qa_no = state.get("qa_count", 0)
+    questions: List[dict] = []
+    pairs: List[dict] = []
+    redo_q = redo_qa = False
+    for ev in iter_extraction_events(update.context_lines + update.new_lines):
+        line = base + ev["line"]
+        if ev["type"] == "question":
+            if line > last_q["line"]:
+                questions.append({"line": line, "text": ev["text"]})
+            elif line == last_q["line"] and ev["text"] != last_q["text"] and not questions:
+                questions.append({"line": line, "text": ev["text"]})
+                redo_q = last_q["offset"] is not None
+        else:
+            answer = ev["a"] if ev["a"] else "[No answer found]"
+            if line > last_qa["line"]:
+                qa_no += 1
+                pairs.append({"line": line, "no": qa_no, "q": ev["q"], "a": answer})
+            elif line == last_qa["line"] and (ev["q"], answer) != (last_qa["q"], last_qa["a"]) and not pairs:
+                redo_qa = last_qa["offset"] is not None
+                if not redo_qa:
+                    qa_no += 1
+                pairs.append({"line": line, "no": last_qa["no"] if redo_qa else qa_no, "q": ev["q"], "a": answer})
+    if questions:
+        offset = _append_entries(questions_path, [q["text"] + "\n" for q in questions], last_q["offset"] if redo_q else None)
+        state["last_question"] = {**questions[-1], "offset": offset}
+    if pairs:
+        entries = [f"Q{p['no']}: {p['q']}\nA{p['no']}: {p['a']}\n\n" for p in pairs]
+        offset = _append_entries(qa_path, entries, last_qa["offset"] if redo_qa else None)
+        state["last_qa"] = {**pairs[-1], "offset": offset}
+    added = qa_no - state.get("qa_count", 0)
+    state["qa_count"] = qa_no
+    _write_state(tail_state_path(update.path), state)
+    return added
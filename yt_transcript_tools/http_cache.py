@@ -0,0 +1,134 @@
+"""HTTP caching and compression helpers for the API.
+
+- `content_etag` derives a strong ETag from the response bytes, so identical
+  content always revalidates (``If-None-Match`` -> 304) regardless of when
+  or where it was produced.
+- Compressed representations get the encoding appended to the ETag
+  (``"abc-gzip"``) as required for strong validators; `etag_matches`
+  accepts any representation of the same content.
+- Artifact URLs carry ``?v=<version>`` (see `artifact_version`); such URLs
+  never change content and are served with `IMMUTABLE_CACHE_CONTROL`.
+
+Brotli and zstd are used when the optional `brotli` / `zstandard` packages
+are installed; gzip is always available.
+"""
+from typing import Iterable, Optional, Set
+import gzip
+import hashlib
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+from .compression import ZSTD_AVAILABLE, zstandard
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+# "dcz": dictionary-compressed zstd (RFC 9842), see the API's /outputs
+_ENCODING_SUFFIXES = ("-br", "-gzip", "-zstd", "-dcz")
+ZSTD_RESPONSE_LEVEL = 3
+
+
+def content_etag(data: bytes) -> str:
+    """Return a strong, quoted ETag for `data`."""
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def stream_etag(chunks: Iterable[bytes]) -> str:
+    """Return the `content_etag` of the concatenation of `chunks`."""
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(chunk)
+    return '"' + h.hexdigest()[:32] + '"'
+
+
+def file_etag(path, chunk_size: int = 1 << 20) -> str:
+    """Return the `content_etag` of a file's bytes, hashing it in chunks."""
+    with open(path, "rb") as fh:
+        return stream_etag(iter(lambda: fh.read(chunk_size), b""))
+
+
+def artifact_version(etag: str) -> str:
+    """Short version token for `?v=` URLs derived from an ETag."""
+    return etag.strip('"')[:16]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an ``If-None-Match`` header value matches `etag`.
+
+    Weak comparison is used (RFC 9110 requires it for If-None-Match) and
+    encoding suffixes are ignored on both sides.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _base_tag(etag)
+    return any(_base_tag(tag) == target for tag in if_none_match.split(","))
+
+
+def _base_tag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Set[str]:
+    """Lower-cased codings of an ``Accept-Encoding`` header, without those at q=0."""
+    accepted: Set[str] = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    accepted.discard("")
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick ``zstd``, ``br`` or ``gzip`` from an ``Accept-Encoding`` header, or None.
+
+    zstd is only chosen when listed explicitly, not for ``*``.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    if ZSTD_AVAILABLE and "zstd" in accepted:
+        return "zstd"
+    if BROTLI_AVAILABLE and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_RESPONSE_LEVEL).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    raise ValueError(f"unsupported encoding {encoding!r}")
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag of the `encoding` representation of content tagged `etag`."""
+    if not encoding:
+        return etag
+    return etag[:-1] + f"-{encoding}" + '"'
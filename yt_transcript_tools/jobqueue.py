@@ -0,0 +1,287 @@
+"""Shared job queue for running extractions on separate worker nodes.
+
+With `YT_JOB_QUEUE` set, the API's ``/extract_async`` enqueues jobs here
+and ``/status/{job_id}`` reads them back, while any number of
+``yt-transcript-worker`` processes (see `queue_worker`) claim and run them.
+
+`YT_JOB_QUEUE` is either a SQLite database path (``jobs.db`` or
+``sqlite:///path/jobs.db``; workers on one host or a shared local disk) or
+a PostgreSQL URL (``postgresql://...``, requires psycopg; workers on any
+number of hosts). Jobs are claimed atomically: SQLite takes the write lock
+for the claim (``BEGIN IMMEDIATE``), PostgreSQL uses
+``FOR UPDATE SKIP LOCKED`` so concurrent workers never wait on each other.
+
+Running jobs carry a heartbeat refreshed by their worker; jobs whose
+heartbeat is older than the stale timeout (the worker died) are put back
+in the queue, or failed once they have used up their attempts.
+"""
+from typing import Any, Dict, Optional
+from uuid import uuid4
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import psycopg
+    PSYCOPG_AVAILABLE = True
+except Exception:
+    psycopg = None
+    PSYCOPG_AVAILABLE = False
+
+JOB_QUEUE_ENV = "YT_JOB_QUEUE"
+DEFAULT_MAX_ATTEMPTS = 3
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        result TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        created DOUBLE PRECISION NOT NULL,
+        updated DOUBLE PRECISION NOT NULL,
+        heartbeat DOUBLE PRECISION
+    )""",
+    "CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created)",
+    """CREATE TABLE IF NOT EXISTS workers (
+        id TEXT PRIMARY KEY,
+        host TEXT,
+        pid INTEGER,
+        started DOUBLE PRECISION NOT NULL,
+        heartbeat DOUBLE PRECISION NOT NULL,
+        jobs_done INTEGER NOT NULL DEFAULT 0
+    )""",
+)
+
+_QUEUE = None
+_QUEUE_KEY = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def _job_row(row) -> Dict[str, Any]:
+    job_id, kind, payload, status, result, attempts, worker, created, updated = row
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "payload": json.loads(payload),
+        "status": status,
+        "result": json.loads(result) if result is not None else None,
+        "attempts": attempts,
+        "worker": worker,
+        "created": created,
+        "updated": updated,
+    }
+
+
+class JobQueue:
+    """Jobs table shared by the API (producer) and the workers (consumers).
+
+    Statuses: ``queued`` -> ``running`` -> ``done`` | ``error``. Subclasses
+    provide the connection and the atomic `claim`.
+    """
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def _conn(self):
+        # one connection per thread; sqlite3 and psycopg connections are not
+        # meant to be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _execute(self, sql: str, params=(), fetch: Optional[str] = None):
+        """Run one statement in its own transaction; `fetch` is "one", "all" or None (row count)."""
+        raise NotImplementedError
+
+    def _init_schema(self) -> None:
+        for stmt in _SCHEMA:
+            self._execute(stmt)
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], job_id: Optional[str] = None) -> str:
+        job_id = job_id or str(uuid4())
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, kind, payload, status, attempts, created, updated) VALUES (?, ?, ?, 'queued', 0, ?, ?)",
+            (job_id, kind, json.dumps(payload), now, now),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._execute(
+            "SELECT id, kind, payload, status, result, attempts, worker, created, updated FROM jobs WHERE id = ?",
+            (job_id,),
+            fetch="one",
+        )
+        return _job_row(row) if row else None
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest queued job to ``running`` for `worker_id`."""
+        raise NotImplementedError
+
+    def complete(self, job_id: str, worker_id: str, status: str, result: Any) -> bool:
+        """Record the outcome; False if the job was requeued away from `worker_id` meanwhile."""
+        now = time.time()
+        done = self._execute(
+            "UPDATE jobs SET status = ?, result = ?, updated = ?, heartbeat = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+            (status, json.dumps(result), now, job_id, worker_id),
+        )
+        if done:
+            self._execute("UPDATE workers SET jobs_done = jobs_done + 1 WHERE id = ?", (worker_id,))
+        return bool(done)
+
+    def register_worker(self, worker_id: str, host: str, pid: int) -> None:
+        now = time.time()
+        self._execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+        self._execute(
+            "INSERT INTO workers (id, host, pid, started, heartbeat, jobs_done) VALUES (?, ?, ?, ?, ?, 0)",
+            (worker_id, host, pid, now, now),
+        )
+
+    def unregister_worker(self, worker_id: str) -> None:
+        self._execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+    def heartbeat(self, worker_id: str) -> None:
+        """Refresh the liveness of `worker_id` and of the jobs it is running."""
+        now = time.time()
+        self._execute("UPDATE workers SET heartbeat = ? WHERE id = ?", (now, worker_id))
+        self._execute("UPDATE jobs SET heartbeat = ? WHERE worker = ? AND status = 'running'", (now, worker_id))
+
+    def requeue_stale(self, stale_after: float, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """Requeue running jobs without a heartbeat for `stale_after` seconds.
+
+        Jobs that already used `max_attempts` attempts fail instead, so a job
+        that kills its worker cannot take down the whole fleet. Returns the
+        number of jobs touched.
+        """
+        now = time.time()
+        lost = json.dumps({"error": f"worker lost (no heartbeat for {stale_after:g}s) after {max_attempts} attempts"})
+        n = self._execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'error' ELSE 'queued' END, "
+            "result = CASE WHEN attempts >= ? THEN ? ELSE result END, worker = NULL, heartbeat = NULL, updated = ? "
+            "WHERE status = 'running' AND heartbeat < ?",
+            (max_attempts, max_attempts, lost, now, now - stale_after),
+        )
+        self._execute("DELETE FROM workers WHERE heartbeat < ?", (now - stale_after,))
+        return n
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {status: n for status, n in self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status", fetch="all")}
+        workers = [
+            {"id": w, "host": h, "pid": p, "heartbeat": hb, "jobs_done": d}
+            for w, h, p, hb, d in self._execute("SELECT id, host, pid, heartbeat, jobs_done FROM workers ORDER BY started", fetch="all")
+        ]
+        return {"jobs": counts, "workers": workers}
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class SQLiteJobQueue(JobQueue):
+    """Queue in a SQLite database (WAL mode), shared by processes on one host."""
+
+    def __init__(self, path, busy_timeout: float = 30.0):
+        self.path = str(path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _execute(self, sql: str, params=(), fetch: Optional[str] = None):
+        # autocommit connection: every statement is its own transaction
+        cur = self._conn().execute(sql, params)
+        if fetch == "one":
+            return cur.fetchone()
+        if fetch == "all":
+            return cur.fetchall()
+        return cur.rowcount
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._conn()
+        now = time.time()
+        # the write lock is taken up front, so two workers cannot select the same job
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1").fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, updated = ?, heartbeat = ? WHERE id = ?",
+                (worker_id, now, now, row[0]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row[0])
+
+
+class PostgresJobQueue(JobQueue):
+    """Queue in a PostgreSQL table; workers may run on any host."""
+
+    def __init__(self, url: str):
+        if not PSYCOPG_AVAILABLE:
+            raise RuntimeError("psycopg is required for a PostgreSQL job queue (pip install 'psycopg[binary]')")
+        self.url = url
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connect(self):
+        return psycopg.connect(self.url, autocommit=True)
+
+    def _execute(self, sql: str, params=(), fetch: Optional[str] = None):
+        conn = self._conn()
+        with conn.transaction():
+            cur = conn.execute(sql.replace("?", "%s"), params)
+            if fetch == "one":
+                return cur.fetchone()
+            if fetch == "all":
+                return cur.fetchall()
+            return cur.rowcount
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        row = self._execute(
+            "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, updated = ?, heartbeat = ? "
+            "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created FOR UPDATE SKIP LOCKED LIMIT 1) "
+            "RETURNING id, kind, payload, status, result, attempts, worker, created, updated",
+            (worker_id, now, now),
+            fetch="one",
+        )
+        return _job_row(row) if row else None
+
+
+def open_queue(url: str) -> JobQueue:
+    """Open the queue named by `url` (SQLite path / ``sqlite:///`` URL or ``postgresql://`` URL)."""
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresJobQueue(url)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SQLiteJobQueue(url)
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    """Return the queue named by `YT_JOB_QUEUE` (reopened when it changes), or None if unset."""
+    global _QUEUE, _QUEUE_KEY
+    url = os.environ.get(JOB_QUEUE_ENV)
+    if not url:
+        return None
+    with _QUEUE_LOCK:
+        if _QUEUE is None or url != _QUEUE_KEY:
+            _QUEUE = open_queue(url)
+            _QUEUE_KEY = url
+        return _QUEUE
@@ -0,0 +1,113 @@
+"""Memory-mapped reading of stored transcript files.
+
+`MappedTranscript` maps a transcript read-only and yields its lines one at
+a time, decoding the buffer in small blocks only as far as the consumer
+has read.
+Compared with ``read_text().splitlines()`` plus a per-line ``strip()`` no
+copy of the whole file (bytes, str, list of lines) is ever built, so the
+extractors can stream archives far larger than RAM.
+
+Pages that have been consumed are handed back to the kernel
+(``MADV_DONTNEED``) every `RELEASE_BYTES`, which keeps the resident set
+bounded during a sequential scan; they are re-read from the page cache if
+touched again.
+
+Lines are split on ``\\n`` only (a trailing ``\\r`` is removed);
+unlike `str.splitlines` other Unicode line separators are kept inside lines.
+"""
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Tuple
+import mmap
+import os
+
+# consumed bytes kept mapped before they are released
+RELEASE_BYTES = 16 << 20
+# bytes decoded at a time while iterating lines
+DECODE_BYTES = 256 << 10
+
+
+class MappedTranscript:
+    """Read-only, lazily decoded view of a transcript file's lines."""
+
+    def __init__(self, path, encoding: str = "utf-8", strip: bool = True):
+        self.path = Path(path)
+        self.encoding = encoding
+        self.strip = strip
+        self._fh = open(self.path, "rb")
+        self._mm = None
+        if os.fstat(self._fh.fileno()).st_size:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self._mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                self._mm.madvise(mmap.MADV_SEQUENTIAL)
+
+    def __enter__(self) -> "MappedTranscript":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._fh.close()
+
+    def __len__(self) -> int:
+        """Number of lines (scans the file without decoding it)."""
+        return sum(1 for _ in self.spans())
+
+    def _release(self, start: int, end: int) -> int:
+        """Drop mapped pages in [start, end); returns the new release mark."""
+        start -= start % mmap.PAGESIZE
+        end -= end % mmap.PAGESIZE
+        if end > start and hasattr(mmap, "MADV_DONTNEED"):
+            self._mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+            return end
+        return start
+
+    def spans(self) -> Iterator[Tuple[int, int]]:
+        """Yield ``(start, end)`` byte offsets of each line, without the newline."""
+        mm = self._mm
+        if mm is None:
+            return
+        find = mm.find
+        size = len(mm)
+        pos = released = 0
+        while pos < size:
+            end = find(b"\n", pos)
+            if end < 0:
+                end = size
+            yield pos, end
+            pos = end + 1
+            if pos - released >= 2 * RELEASE_BYTES:
+                released = self._release(released, pos - RELEASE_BYTES)
+
+    def __iter__(self) -> Iterator[str]:
+        mm = self._mm
+        if mm is None:
+            return
+        encoding, strip = self.encoding, self.strip
+        size = len(mm)
+        pos = released = 0
+        while pos < size:
+            # decode a block of whole lines at a time: one C-level decode and
+            # split instead of a slice + decode per line
+            end = min(pos + DECODE_BYTES, size)
+            if end < size:
+                nl = mm.rfind(b"\n", pos, end)
+                if nl < 0:
+                    nl = mm.find(b"\n", end)
+                end = size if nl < 0 else nl + 1
+            lines = mm[pos:end].decode(encoding).split("\n")
+            if lines[-1] == "":
+                lines.pop()
+            for line in lines:
+                yield line.strip() if strip else line.rstrip("\r")
+            pos = end
+            if pos - released >= 2 * RELEASE_BYTES:
+                released = self._release(released, pos - RELEASE_BYTES)
+
+    def head(self, n: int) -> List[str]:
+        """The first `n` lines (e.g. for previews), touching only their pages."""
+        return list(islice(self, n))
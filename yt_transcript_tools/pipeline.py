@@ -0,0 +1,233 @@
+"""The extraction pipeline behind ``/extract/`` and queued jobs.
+
+`run_job` handles one ``/extract_async`` payload; the API runs it on its
+scheduler and ``yt-transcript-worker`` processes run it for jobs of the
+shared queue, so both produce the same results and artifacts without the
+worker importing the web app.
+
+State shared by the callers in one process:
+
+- `ARTIFACTS`: the artifact store under `OUT_DIR` (``outputs``; quotas and
+  retention from ``YT_ARTIFACT_*``, see `artifacts.store_from_env`);
+- `RESULTS`: recent results, kept ``YT_RESULT_CACHE_TTL`` seconds
+  (default 600) so paginated follow-ups skip re-extraction;
+- the NLP worker pool (``YT_NLP_WORKERS``), started by `start_nlp_pool`.
+"""
+from pathlib import Path
+from typing import Any, Dict, Optional
+import json
+import os
+import time
+
+from .advanced_qa import get_batcher, resolve_qa_mode
+from .artifacts import DEFAULT_MIN_AGE, store_from_env
+from .deadline import Deadline, analysis_stage, get_stage_timings, plan_extraction
+from .downloader import get_transcript_from_video_id
+from .export import get_exporter
+from .http_cache import artifact_version, content_etag
+from .perplexity import summarize_text as perplexity_summarize
+from .resilience import TranscriptUnavailable
+from .results import ResultCache
+from .singleflight import SingleFlight
+from .tagging import get_default_tagger
+from .workers import analyze_transcript, pool_from_env
+
+OUT_DIR = Path("outputs")
+OUT_DIR.mkdir(exist_ok=True)
+# how long `cached_extraction` serves a result (and its *_url links) from RESULTS
+RESULT_CACHE_TTL = float(os.environ.get("YT_RESULT_CACHE_TTL", "600"))
+# sharded, size-bounded artifact store (YT_ARTIFACT_* quotas and retention);
+# artifacts outlive the cached results that link to them
+ARTIFACTS = store_from_env(OUT_DIR, min_age=max(DEFAULT_MIN_AGE, RESULT_CACHE_TTL))
+
+# recent results, so paginated follow-ups and repeat viewers skip re-extraction
+RESULTS = ResultCache(
+    max_entries=int(os.environ.get("YT_RESULT_CACHE_SIZE", "128")),
+    ttl=RESULT_CACHE_TTL,
+)
+
+# advanced QA runs in a sliding window of this many lines to bound memory
+QA_CHUNK_LINES = 2000
+
+# concurrent extractions of the same (video_id, write_files, use_perplexity) share one run
+_EXTRACTIONS = SingleFlight()
+
+# warm NLP worker processes (YT_NLP_WORKERS > 0); None runs NLP in-process
+_NLP_POOL = None
+
+
+def start_nlp_pool() -> None:
+    """Start the NLP worker pool configured by ``YT_NLP_WORKERS`` (before spawning threads)."""
+    global _NLP_POOL
+    if _NLP_POOL is None:
+        _NLP_POOL = pool_from_env()
+
+
+def stop_nlp_pool() -> None:
+    global _NLP_POOL
+    if _NLP_POOL is not None:
+        _NLP_POOL.shutdown(wait=False)
+        _NLP_POOL = None
+
+
+def do_extraction(video_id: str, write_files: bool = True, use_perplexity: bool = False, qa_mode: Optional[str] = None, budget_ms: Optional[int] = None):
+    qa_mode = resolve_qa_mode(qa_mode)
+    # the budget counts from the request, including a wait for a shared run
+    deadline = Deadline(budget_ms / 1000.0) if budget_ms is not None else None
+    return _EXTRACTIONS.do(
+        (video_id, write_files, use_perplexity, qa_mode, budget_ms),
+        lambda: run_extraction(video_id, write_files=write_files, use_perplexity=use_perplexity, qa_mode=qa_mode, deadline=deadline),
+    )
+
+
+def cached_extraction(video_id: str, write_files: bool = True, use_perplexity: bool = False, qa_mode: Optional[str] = None, budget_ms: Optional[int] = None):
+    qa_mode = resolve_qa_mode(qa_mode)
+    key = (video_id, write_files, use_perplexity, qa_mode)
+    result = RESULTS.get(key)
+    if result is None:
+        result = do_extraction(video_id, write_files=write_files, use_perplexity=use_perplexity, qa_mode=qa_mode, budget_ms=budget_ms)
+        # a partial result must not stand in for the complete one
+        if not result.get("partial"):
+            RESULTS.put(key, result)
+    return result
+
+
+def run_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one ``/extract_async`` job; returns ``{"status": "done"|"error", "result": ...}``.
+
+    Also the handler of queued jobs in ``yt-transcript-worker``.
+    """
+    try:
+        key = (payload["video_id"], payload.get("write_files", True), payload.get("use_perplexity", False), resolve_qa_mode(payload.get("qa_mode")))
+        res = do_extraction(*key)
+        # later /extract/ calls (e.g. after a partial budgeted one) get the full result
+        RESULTS.put(key, res)
+        return {"status": "done", "result": res}
+    except TranscriptUnavailable as e:
+        return {"status": "error", "result": {'error': str(e), 'kind': e.kind, 'retry_after': e.retry_after}}
+    except Exception as e:
+        return {"status": "error", "result": {'error': str(e)}}
+
+
+def _write_artifact(path: Path, text: str) -> str:
+    """Atomically write an output file into the artifact store; returns its versioned `/outputs` URL."""
+    data = text.encode("utf-8")
+    ARTIFACTS.put(path.name, data)
+    return f"/outputs/{path.name}?v={artifact_version(content_etag(data))}"
+
+
+def _analyze(lines, qa_uses_questions: bool = True, qa_mode: Optional[str] = None, with_qa: bool = True):
+    """Questions and QA pairs for `lines`, in the NLP worker pool when configured."""
+    start = time.perf_counter()
+    if _NLP_POOL is not None:
+        analysis = _NLP_POOL.analyze(lines, qa_uses_questions, QA_CHUNK_LINES, qa_mode=qa_mode, with_qa=with_qa)
+    else:
+        analysis = analyze_transcript(lines, qa_uses_questions, QA_CHUNK_LINES, batcher=get_batcher(), qa_mode=qa_mode, with_qa=with_qa)
+    get_stage_timings().observe(analysis_stage(qa_mode if with_qa else None), time.perf_counter() - start, len(lines))
+    return analysis
+
+
+def _perplexity_fits(deadline: Optional[Deadline], degraded: list) -> bool:
+    """False (and recorded in `degraded`) if the deadline leaves too little time for Perplexity."""
+    if deadline is None or deadline.remaining() >= get_stage_timings().estimate("perplexity"):
+        return True
+    degraded.append({"stage": "perplexity", "requested": True, "used": False})
+    return False
+
+
+def _summarize(text: str):
+    start = time.perf_counter()
+    summary = perplexity_summarize(text)
+    get_stage_timings().observe("perplexity", time.perf_counter() - start)
+    return summary
+
+
+def run_extraction(video_id: str, write_files: bool = True, use_perplexity: bool = False, qa_mode: Optional[str] = None, deadline: Optional[Deadline] = None):
+    lines = get_transcript_from_video_id(video_id)
+    degraded = []
+    with_qa = True
+    if deadline is not None:
+        plan = plan_extraction(deadline.remaining(), len(lines), qa_mode, use_perplexity, get_stage_timings())
+        degraded = list(plan.degraded)
+        with_qa = plan.qa_mode is not None
+        qa_mode = plan.qa_mode or qa_mode
+        use_perplexity = plan.use_perplexity
+    result = _extraction_result(video_id, lines, write_files, use_perplexity, qa_mode, with_qa, deadline, degraded)
+    if deadline is not None:
+        result["partial"] = bool(degraded)
+        result["degraded"] = degraded
+    return result
+
+
+def _export_transcript(lines):
+    """The fetched snippets (with start/duration) behind `lines`, or the lines themselves."""
+    snippets = getattr(lines, "snippets", None)
+    return snippets if snippets is not None and len(snippets) == len(lines) else lines
+
+
+def _extraction_result(video_id, lines, write_files, use_perplexity, qa_mode, with_qa, deadline, degraded):
+    """The stages of `run_extraction` after planning; skipped stages are appended to `degraded`."""
+    if not write_files:
+        joined = "\n".join(lines)
+        analysis = _analyze(lines, qa_mode=qa_mode, with_qa=with_qa)
+        questions = analysis["questions"] or []
+        qa_pairs = analysis["qa_pairs"] or []
+        p = None
+        if use_perplexity and _perplexity_fits(deadline, degraded):
+            try:
+                p = _summarize(joined)
+            except Exception:
+                p = None
+        result = {"status":"ok","video_id":video_id,"transcript":lines,"questions":questions,"qa_pairs":qa_pairs,"perplexity_summary":p}
+        tagger = get_default_tagger()
+        if tagger is not None:
+            result["tags"] = tagger.tag_lines(lines)
+        exporter = get_exporter()
+        if exporter is not None and not degraded:
+            exporter.add(video_id, _export_transcript(lines), questions, qa_pairs)
+        return result
+
+    transcript_path = ARTIFACTS.path(f"{video_id}_transcript.txt")
+    urls = {"transcript_url": _write_artifact(transcript_path, "\n".join(lines))}
+
+    analysis = _analyze(lines, qa_uses_questions=False, qa_mode=qa_mode, with_qa=with_qa)
+    # degraded QA must not replace the full-quality QA and summary files of an earlier run
+    qa_degraded = any(d["stage"] == "qa" for d in degraded)
+
+    qa_path = ARTIFACTS.path(f"{video_id}_qa.txt")
+    qa_pairs = analysis["qa_pairs"]
+    qa_count = 0
+    if qa_pairs is not None and not qa_degraded:
+        urls["qa_url"] = _write_artifact(qa_path, "".join(f"Q{i}: {p.get('q','')}\nA{i}: {p.get('a','')}\n\n" for i, p in enumerate(qa_pairs, 1)))
+        qa_count = len(qa_pairs)
+
+    questions_path = ARTIFACTS.path(f"{video_id}_questions.txt")
+    qlist = analysis["questions"]
+    questions_count = 0
+    if qlist is not None:
+        urls["questions_url"] = _write_artifact(questions_path, "\n".join(qlist))
+        questions_count = len(qlist)
+
+    summary_path = ARTIFACTS.path(f"{video_id}_summary.txt")
+    if not qa_degraded:
+        urls["summary_url"] = _write_artifact(summary_path, f"Video: {video_id}\nLines: {len(lines)}\nQA: {qa_count}\nQuestions: {questions_count}\n")
+
+    tagger = get_default_tagger()
+    if tagger is not None:
+        tags_path = ARTIFACTS.path(f"{video_id}_tags.json")
+        urls["tags_url"] = _write_artifact(tags_path, json.dumps(tagger.tag_lines(lines), ensure_ascii=False, indent=2))
+
+    exporter = get_exporter()
+    if exporter is not None and not degraded:
+        exporter.add(video_id, _export_transcript(lines), qlist, qa_pairs)
+
+    per_path = None
+    if use_perplexity and _perplexity_fits(deadline, degraded):
+        try:
+            per = _summarize("\n".join(lines))
+            per_path = ARTIFACTS.path(f"{video_id}_perplexity_summary.txt")
+            urls["perplexity_url"] = _write_artifact(per_path, per or "")
+        except Exception:
+            per_path = None
+
+    return {"status":"ok","video_id":video_id,"transcript_path":str(transcript_path),"qa_path":None if qa_degraded else str(qa_path),"questions_path":str(questions_path),"summary_path":None if qa_degraded else str(summary_path),"perplexity_path":str(per_path) if per_path else None, **urls}
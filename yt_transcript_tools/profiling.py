@@ -0,0 +1,245 @@
+"""Profiling hooks for the CLIs and the API.
+
+CLIs: `add_profile_arguments` adds ``--profile PATH`` and ``--profiler``;
+wrap the work in ``with profiled(args.profile, args.profiler):``.
+
+- ``cprofile`` (default) writes a `cProfile` stats file (``pstats``,
+  snakeviz, ``flameprof``) and prints the top functions to stderr;
+- ``sampling`` uses the built-in `StackSampler` and writes collapsed
+  stacks (``frame;frame;frame count`` lines), the input format of
+  ``flamegraph.pl`` and speedscope.
+
+API: a request sent with ``X-Profile: sampling`` (or ``cprofile``) runs
+under a `RequestProfile` held in a context variable; code wrapped in
+`profile_scope()` (the extraction endpoints) records into it from whatever
+worker thread it runs on, and the profile is saved in `YT_PROFILE_DIR`.
+Work done in NLP worker processes (`YT_NLP_WORKERS`) is not included.
+
+`tracemalloc_report` lists the top allocation sites of the process (the
+API's ``/admin/tracemalloc``).
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+
+PROFILE_DIR_ENV = "YT_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiles"
+PROFILERS = ("cprofile", "sampling")
+SAMPLE_INTERVAL = 0.001
+
+_REQUEST_PROFILE: ContextVar[Optional["RequestProfile"]] = ContextVar("yt_request_profile", default=None)
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Periodically samples the stacks of registered threads.
+
+    Pure Python (``sys._current_frames``), so it works without extra
+    dependencies and on threads it does not control; the result is a count
+    per distinct stack in collapsed flamegraph format.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_thread(self, ident: Optional[int] = None) -> None:
+        with self._lock:
+            self._threads.add(ident or threading.get_ident())
+
+    def remove_thread(self, ident: Optional[int] = None) -> None:
+        with self._lock:
+            self._threads.discard(ident or threading.get_ident())
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="yt-stack-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = list(self._threads)
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.counts[_collapse(frame)] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.counts.most_common())
+
+    def write(self, path) -> Path:
+        path = Path(path)
+        path.write_text(self.collapsed(), encoding="utf-8")
+        return path
+
+
+def add_profile_arguments(parser) -> None:
+    parser.add_argument("--profile", metavar="PATH", help="Profile the run and write the result to PATH")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile", help="cprofile: pstats file; sampling: collapsed stacks for flamegraphs")
+
+
+def _print_top(prof: cProfile.Profile, limit: int = 15) -> None:
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(limit)
+    print(buf.getvalue(), file=sys.stderr)
+
+
+@contextmanager
+def profiled(path: Optional[str], profiler: str = "cprofile") -> Iterator[None]:
+    """Profile the enclosed block in the current thread if `path` is set."""
+    if not path:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler!r}; choose from {PROFILERS}")
+    if profiler == "cprofile":
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(path)
+            _print_top(prof)
+            print(f"Profile written to {path}", file=sys.stderr)
+        return
+    sampler = StackSampler()
+    sampler.add_thread()
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        sampler.write(path)
+        print(f"Collapsed stacks written to {path}", file=sys.stderr)
+
+
+class RequestProfile:
+    """Profile of one API request, recorded by `profile_scope` blocks."""
+
+    def __init__(self, kind: str = "sampling"):
+        if kind not in PROFILERS:
+            raise ValueError(f"Unknown profiler {kind!r}; choose from {PROFILERS}")
+        self.kind = kind
+        self._sampler = StackSampler() if kind == "sampling" else None
+        self._cprofile = cProfile.Profile() if kind == "cprofile" else None
+
+    @contextmanager
+    def scope(self) -> Iterator[None]:
+        if self._sampler is not None:
+            self._sampler.add_thread()
+            self._sampler.start()
+            try:
+                yield
+            finally:
+                self._sampler.remove_thread()
+            return
+        self._cprofile.enable()
+        try:
+            yield
+        finally:
+            self._cprofile.disable()
+
+    def close(self) -> None:
+        if self._sampler is not None:
+            self._sampler.stop()
+
+    def save(self, directory, name: str) -> Path:
+        """Write the profile as ``<name>.collapsed`` or ``<name>.prof`` in `directory`."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        if self._sampler is not None:
+            return self._sampler.write(directory / f"{name}.collapsed")
+        path = directory / f"{name}.prof"
+        self._cprofile.dump_stats(str(path))
+        return path
+
+
+def start_request_profile(kind: str) -> tuple:
+    """Activate a `RequestProfile` for the current context; returns ``(profile, token)``."""
+    prof = RequestProfile(kind)
+    return prof, _REQUEST_PROFILE.set(prof)
+
+
+def end_request_profile(token) -> None:
+    _REQUEST_PROFILE.reset(token)
+
+
+@contextmanager
+def profile_scope() -> Iterator[None]:
+    """Record the enclosed block into the active request profile, if any."""
+    prof = _REQUEST_PROFILE.get()
+    if prof is None:
+        yield
+        return
+    with prof.scope():
+        yield
+
+
+def profile_dir() -> Path:
+    return Path(os.environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR)
+
+
+def tracemalloc_report(limit: int = 20, group_by: str = "lineno", frames: int = 1) -> Dict[str, Any]:
+    """Top allocation sites of the running process.
+
+    Starts `tracemalloc` (keeping `frames` frames per allocation) if it is
+    not tracing yet; only memory allocated after that point is attributed.
+    """
+    started = False
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        started = True
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    stats = snapshot.statistics(group_by)
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "started": started,
+        "traced_kb": current / 1024,
+        "peak_kb": peak / 1024,
+        "total_sites": len(stats),
+        "top": [
+            {"site": [f"{fr.filename}:{fr.lineno}" for fr in stat.traceback], "size_kb": stat.size / 1024, "count": stat.count}
+            for stat in stats[:limit]
+        ],
+    }
+
+
+def stop_tracemalloc() -> bool:
+    """Stop tracing; returns whether it was running."""
+    if not tracemalloc.is_tracing():
+        return False
+    tracemalloc.stop()
+    return True
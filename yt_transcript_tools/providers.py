@@ -0,0 +1,227 @@
+"""Transcript providers: live YouTube, recording, and offline replay.
+
+Everything that fetches transcripts (`downloader`, `fetcher`, hence the
+API and the CLIs) goes through `get_provider()`, configured by environment:
+
+- ``YT_TRANSCRIPT_PROVIDER``: ``live`` (default), ``record`` or ``replay``;
+- ``YT_FIXTURE_DIR``: fixture store for record/replay
+  (default ``fixtures/transcripts``), one ``<video_id>.json`` per video
+  holding the raw snippets (text/start/duration), the upstream fetch time
+  and, for failed fetches, the error kind;
+- replay only: ``YT_REPLAY_LATENCY_MS`` (``"50"`` or a uniform range
+  ``"20-80"``; ``"recorded"`` replays the recorded fetch times),
+  ``YT_REPLAY_ERROR_RATE`` (0..1, injected failures),
+  ``YT_REPLAY_ERROR_KIND`` (kind of injected failures, default
+  ``rate_limited``) and ``YT_REPLAY_SEED`` for reproducible runs.
+
+Replayed failures raise `ReplayError`, whose ``kind`` is understood by
+`resilience.classify_error`, so negative caching and the circuit breaker
+behave as they would against YouTube.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import random
+import threading
+import time
+
+from .resilience import classify_error
+from .storage import atomic_write_text
+
+PROVIDER_ENV = "YT_TRANSCRIPT_PROVIDER"
+FIXTURE_DIR_ENV = "YT_FIXTURE_DIR"
+REPLAY_LATENCY_ENV = "YT_REPLAY_LATENCY_MS"
+REPLAY_ERROR_RATE_ENV = "YT_REPLAY_ERROR_RATE"
+REPLAY_ERROR_KIND_ENV = "YT_REPLAY_ERROR_KIND"
+REPLAY_SEED_ENV = "YT_REPLAY_SEED"
+DEFAULT_FIXTURE_DIR = "fixtures/transcripts"
+
+_PROVIDER = None
+_PROVIDER_KEY = None
+_PROVIDER_LOCK = threading.Lock()
+
+
+class ReplayError(RuntimeError):
+    """A replayed (recorded or injected) fetch failure of a given `kind`."""
+
+    def __init__(self, message: str, kind: str = "error"):
+        super().__init__(message)
+        self.kind = kind
+
+
+def _snippet_dict(entry) -> Dict[str, Any]:
+    if isinstance(entry, dict):
+        get = entry.get
+    else:
+        def get(key, default=None):
+            return getattr(entry, key, default)
+    return {"text": get("text", ""), "start": get("start"), "duration": get("duration")}
+
+
+class TranscriptProvider:
+    """Returns the raw snippets of a video's transcript."""
+
+    name = "base"
+
+    def fetch(self, video_id: str) -> List[Any]:
+        raise NotImplementedError
+
+
+class LiveProvider(TranscriptProvider):
+    """Fetches from YouTube with `youtube_transcript_api`."""
+
+    name = "live"
+
+    def fetch(self, video_id: str) -> List[Any]:
+        try:
+            from youtube_transcript_api import YouTubeTranscriptApi
+        except Exception as e:
+            raise RuntimeError(f"youtube_transcript_api is required for live fetches: {e}")
+        # Use instance `fetch` for compatibility with newer library versions
+        return YouTubeTranscriptApi().fetch(video_id)
+
+
+class FixtureStore:
+    """Directory of recorded fetches, one JSON file per video id."""
+
+    def __init__(self, root=DEFAULT_FIXTURE_DIR):
+        self.root = Path(root)
+
+    def path(self, video_id: str) -> Path:
+        return self.root / f"{video_id}.json"
+
+    def save(self, video_id: str, snippets: Optional[List[Dict[str, Any]]], elapsed: float, error: Optional[BaseException] = None) -> Path:
+        record = {
+            "video_id": video_id,
+            "recorded_at": time.time(),
+            "elapsed": elapsed,
+            "snippets": snippets,
+            "error": None if error is None else {"type": type(error).__name__, "kind": classify_error(error), "message": str(error)},
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(video_id)
+        atomic_write_text(path, json.dumps(record, ensure_ascii=False))
+        return path
+
+    def load(self, video_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self.path(video_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+
+class RecordingProvider(TranscriptProvider):
+    """Fetches through `inner` and records every result (or failure) in `store`."""
+
+    name = "record"
+
+    def __init__(self, inner: Optional[TranscriptProvider] = None, store: Optional[FixtureStore] = None):
+        self.inner = inner or LiveProvider()
+        self.store = store or FixtureStore()
+
+    def fetch(self, video_id: str) -> List[Any]:
+        start = time.perf_counter()
+        try:
+            transcript = list(self.inner.fetch(video_id))
+        except Exception as e:
+            self.store.save(video_id, None, time.perf_counter() - start, error=e)
+            raise
+        self.store.save(video_id, [_snippet_dict(s) for s in transcript], time.perf_counter() - start)
+        return transcript
+
+
+def parse_latency(value: Optional[str]) -> Tuple[Optional[float], Optional[float], bool]:
+    """Parse ``"50"``, ``"20-80"`` or ``"recorded"`` (milliseconds) into seconds."""
+    if not value:
+        return None, None, False
+    if value.strip() == "recorded":
+        return None, None, True
+    lo, _, hi = value.partition("-")
+    lo_s = float(lo) / 1000.0
+    return lo_s, float(hi) / 1000.0 if hi else lo_s, False
+
+
+class ReplayProvider(TranscriptProvider):
+    """Serves recorded fetches with synthetic latency and injected errors."""
+
+    name = "replay"
+
+    def __init__(
+        self,
+        store: Optional[FixtureStore] = None,
+        latency: Optional[Tuple[float, float]] = None,
+        use_recorded_latency: bool = False,
+        error_rate: float = 0.0,
+        error_kind: str = "rate_limited",
+        seed: Optional[int] = None,
+        sleep=time.sleep,
+    ):
+        self.store = store or FixtureStore()
+        self.latency = latency
+        self.use_recorded_latency = use_recorded_latency
+        self.error_rate = error_rate
+        self.error_kind = error_kind
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._sleep = sleep
+
+    def fetch(self, video_id: str) -> List[Dict[str, Any]]:
+        record = self.store.load(video_id)
+        with self._rng_lock:
+            delay = self._rng.uniform(*self.latency) if self.latency else 0.0
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if self.use_recorded_latency and record:
+            delay = float(record.get("elapsed") or 0.0)
+        if delay > 0:
+            self._sleep(delay)
+        if fail:
+            raise ReplayError(f"injected {self.error_kind} failure for {video_id}", kind=self.error_kind)
+        if record is None:
+            raise ReplayError(f"no recorded transcript for {video_id} in {self.store.root}", kind="not_found")
+        if record.get("error"):
+            err = record["error"]
+            raise ReplayError(err.get("message") or err.get("type", "error"), kind=err.get("kind", "error"))
+        return list(record.get("snippets") or [])
+
+
+PROVIDERS = {
+    LiveProvider.name: LiveProvider,
+    RecordingProvider.name: RecordingProvider,
+    ReplayProvider.name: ReplayProvider,
+}
+
+
+def provider_from_env() -> TranscriptProvider:
+    """Build a provider from the environment (see module docstring)."""
+    name = os.environ.get(PROVIDER_ENV) or LiveProvider.name
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown transcript provider {name!r}; choose from {sorted(PROVIDERS)}")
+    store = FixtureStore(os.environ.get(FIXTURE_DIR_ENV) or DEFAULT_FIXTURE_DIR)
+    if name == RecordingProvider.name:
+        return RecordingProvider(store=store)
+    if name == ReplayProvider.name:
+        lo, hi, recorded = parse_latency(os.environ.get(REPLAY_LATENCY_ENV))
+        seed = os.environ.get(REPLAY_SEED_ENV)
+        return ReplayProvider(
+            store=store,
+            latency=(lo, hi) if lo is not None else None,
+            use_recorded_latency=recorded,
+            error_rate=float(os.environ.get(REPLAY_ERROR_RATE_ENV, "0") or 0),
+            error_kind=os.environ.get(REPLAY_ERROR_KIND_ENV) or "rate_limited",
+            seed=int(seed) if seed else None,
+        )
+    return LiveProvider()
+
+
+def get_provider() -> TranscriptProvider:
+    """Return the configured provider, rebuilt when the configuration changes."""
+    global _PROVIDER, _PROVIDER_KEY
+    key = tuple(os.environ.get(k) for k in (
+        PROVIDER_ENV, FIXTURE_DIR_ENV, REPLAY_LATENCY_ENV, REPLAY_ERROR_RATE_ENV, REPLAY_ERROR_KIND_ENV, REPLAY_SEED_ENV,
+    ))
+    with _PROVIDER_LOCK:
+        if _PROVIDER is None or key != _PROVIDER_KEY:
+            _PROVIDER = provider_from_env()
+            _PROVIDER_KEY = key
+        return _PROVIDER
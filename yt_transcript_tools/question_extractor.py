@@ -1,59 +1,45 @@
-from typing import List
-import re
+from typing import Iterable, List
 
+from .segmenter import segment_many, segment_sentences
 
-def _load_spacy():
-    try:
-        import spacy
+_INTERROGATIVES = {"what", "why", "how", "when", "where", "who", "which", "whom", "whose"}
+_AUXILIARIES = {"is", "are", "do", "does", "did", "can", "could", "would", "should", "will", "have", "has", "had"}
 
-        # try to load the small English model
-        try:
-            nlp = spacy.load("en_core_web_sm")
-        except Exception:
-            # fallback: try spacy.blank
-            nlp = spacy.blank("en")
-        return nlp
-    except Exception:
-        return None
 
-
-_NLP = _load_spacy()
+def _looks_like_question_sentence(s: str) -> bool:
+    s = s.strip()
+    if not s:
+        return False
+    if "?" in s:
+        return True
+    first = s.split()[0].lower() if s.split() else ""
+    if first in _INTERROGATIVES:
+        return True
+    # auxiliaries
+    if first in _AUXILIARIES:
+        return True
+    return False
 
 
 def extract_questions(text: str) -> List[str]:
     """Extract question-like sentences from `text`.
 
-    If spaCy with sentence segmentation is available it will be used, otherwise
-    a simple regex-based sentence splitter and heuristics are used.
+    Sentences come from the shared segmenter (`YT_SEGMENTER`; the fast
+    caption-tuned rules by default, spaCy if selected).
     """
     if not text:
         return []
+    sentences = segment_sentences(text)
+    questions = [s for s in sentences if _looks_like_question_sentence(s)]
+    return questions
 
-    interrogatives = {"what", "why", "how", "when", "where", "who", "which", "whom", "whose"}
-
-    def looks_like_question_sentence(s: str) -> bool:
-        s = s.strip()
-        if not s:
-            return False
-        if "?" in s:
-            return True
-        first = s.split()[0].lower() if s.split() else ""
-        if first in interrogatives:
-            return True
-        # auxiliaries
-        if first in {"is", "are", "do", "does", "did", "can", "could", "would", "should", "will", "have", "has", "had"}:
-            return True
-        return False
 
-    sentences = []
-    if _NLP is not None:
-        doc = _NLP(text)
-        for sent in doc.sents:
-            sentences.append(sent.text.strip())
-    else:
-        # naive sentence split on punctuation followed by whitespace/newline
-        parts = re.split(r"(?<=[\.\!\?])\s+", text)
-        sentences = [p.strip() for p in parts if p.strip()]
-
-    questions = [s for s in sentences if looks_like_question_sentence(s)]
-    return questions
+def extract_questions_many(texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[List[str]]:
+    """`extract_questions` for a corpus; one question list per text.
+
+    With the spaCy segmenter all texts go through one ``nlp.pipe`` stream
+    (`batch_size` docs per batch, `n_process` worker processes), which is
+    much faster than calling `extract_questions` per transcript.
+    """
+    docs = segment_many(texts, batch_size=batch_size, n_process=n_process)
+    return [[s for s in sentences if _looks_like_question_sentence(s)] for sentences in docs]
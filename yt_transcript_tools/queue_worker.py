@@ -0,0 +1,178 @@
+"""Worker process for the shared job queue (`yt-transcript-worker`).
+
+Claims jobs from `YT_JOB_QUEUE` (see `jobqueue`) and runs them through a
+handler (`YT_WORKER_APP`, default ``yt_transcript_tools.pipeline:run_job``,
+the handler the API itself uses), so queued jobs produce exactly what the
+in-process ``/extract_async`` would. Start as many workers, on as many
+hosts, as needed::
+
+    YT_JOB_QUEUE=postgresql://db/yt yt-transcript-worker --concurrency 4
+
+A background thread heartbeats the worker and its running jobs every
+``--heartbeat`` seconds; every worker also requeues jobs whose heartbeat
+is older than ``--stale-after`` (their worker died), so losing a node only
+delays its jobs. Written artifacts land in the worker's ``outputs/``
+directory, which must be shared storage if the API serves them.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import argparse
+import importlib
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from .jobqueue import DEFAULT_MAX_ATTEMPTS, JOB_QUEUE_ENV, JobQueue, open_queue
+
+WORKER_APP_ENV = "YT_WORKER_APP"
+DEFAULT_WORKER_APP = "yt_transcript_tools.pipeline:run_job"
+
+log = logging.getLogger(__name__)
+
+
+def load_handler(spec: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Import ``module:function``; the function maps a job payload to ``{"status", "result"}``."""
+    module_name, _, attr = spec.partition(":")
+    if os.getcwd() not in sys.path:
+        # console scripts do not put the working directory on sys.path
+        sys.path.insert(0, os.getcwd())
+    return getattr(importlib.import_module(module_name), attr or "run_job")
+
+
+class QueueWorker:
+    """Claims and runs jobs until stopped."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: Callable[[Dict[str, Any]], Dict[str, Any]],
+        worker_id: Optional[str] = None,
+        concurrency: int = 1,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = 5.0,
+        stale_after: float = 30.0,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.jobs_run = 0
+        self._stop = threading.Event()
+        self._count_lock = threading.Lock()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_job(self, job: Dict[str, Any]) -> None:
+        try:
+            outcome = self.handler(job["payload"])
+            status, result = outcome["status"], outcome["result"]
+        except Exception as e:
+            log.exception("job %s failed", job["job_id"])
+            status, result = "error", {"error": str(e)}
+        try:
+            if not self.queue.complete(job["job_id"], self.worker_id, status, result):
+                log.warning("job %s was requeued while running; result dropped", job["job_id"])
+        except Exception as e:
+            # e.g. an unserialisable result or a lost database connection:
+            # record the failure if possible, else leave the job to the stale requeue
+            log.exception("could not record the result of job %s", job["job_id"])
+            try:
+                self.queue.complete(job["job_id"], self.worker_id, "error", {"error": f"could not store result: {e}"})
+            except Exception:
+                log.exception("could not record the failure of job %s", job["job_id"])
+        with self._count_lock:
+            self.jobs_run += 1
+
+    def run_one(self) -> bool:
+        """Claim and run one job; False if the queue was empty."""
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+        self.run_job(job)
+        return True
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                self.queue.heartbeat(self.worker_id)
+                requeued = self.queue.requeue_stale(self.stale_after, self.max_attempts)
+                if requeued:
+                    log.info("requeued %d stale jobs", requeued)
+            except Exception:
+                log.exception("heartbeat failed")
+
+    def _slot_loop(self, max_jobs: Optional[int], drain: bool) -> None:
+        while not self._stop.is_set():
+            if max_jobs is not None and self.jobs_run >= max_jobs:
+                return
+            if not self.run_one():
+                if drain:
+                    return
+                self._stop.wait(self.poll_interval)
+
+    def run(self, max_jobs: Optional[int] = None, drain: bool = False) -> int:
+        """Run jobs with `concurrency` slots; returns the number of jobs run.
+
+        Stops on `stop()`, after `max_jobs` jobs, or (with `drain`) once the
+        queue is empty.
+        """
+        self.queue.register_worker(self.worker_id, socket.gethostname(), os.getpid())
+        self.queue.requeue_stale(self.stale_after, self.max_attempts)
+        beat = threading.Thread(target=self._heartbeat_loop, name="yt-worker-heartbeat", daemon=True)
+        beat.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="yt-worker") as pool:
+                for f in [pool.submit(self._slot_loop, max_jobs, drain) for _ in range(self.concurrency)]:
+                    f.result()
+        finally:
+            self._stop.set()
+            beat.join()
+            self.queue.unregister_worker(self.worker_id)
+        return self.jobs_run
+
+
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(description="Run queued extraction jobs from a shared job queue")
+    p.add_argument("--queue", default=os.environ.get(JOB_QUEUE_ENV), help=f"SQLite path or postgresql:// URL (default ${JOB_QUEUE_ENV})")
+    p.add_argument("--app", default=os.environ.get(WORKER_APP_ENV) or DEFAULT_WORKER_APP, help="module:function handling a job payload")
+    p.add_argument("--concurrency", type=int, default=1, help="Jobs run at once by this worker")
+    p.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls of an empty queue")
+    p.add_argument("--heartbeat", type=float, default=5.0, help="Seconds between heartbeats")
+    p.add_argument("--stale-after", type=float, default=30.0, help="Requeue running jobs without a heartbeat for this long")
+    p.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="Fail jobs that lost their worker this many times")
+    p.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs")
+    p.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    args = p.parse_args(argv)
+    if not args.queue:
+        p.error(f"--queue or ${JOB_QUEUE_ENV} is required")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    worker = QueueWorker(
+        open_queue(args.queue),
+        load_handler(args.app),
+        concurrency=args.concurrency,
+        poll_interval=args.poll_interval,
+        heartbeat_interval=args.heartbeat,
+        stale_after=args.stale_after,
+        max_attempts=args.max_attempts,
+    )
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # finish running jobs, then exit
+        signal.signal(sig, lambda *_: worker.stop())
+    log.info("worker %s polling %s", worker.worker_id, args.queue)
+    n = worker.run(max_jobs=args.max_jobs, drain=args.drain)
+    log.info("worker %s exiting after %d jobs", worker.worker_id, n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Negative-result cache and circuit breaker around upstream transcript fetches.
+
+Failures are classified into a few kinds, each cached for its own TTL so a
+video with transcripts disabled is not re-fetched on every request, while a
+transient error is retried soon:
+
+- ``disabled``: the uploader turned transcripts off,
+- ``not_found``: video or transcript does not exist / is unavailable,
+- ``rate_limited``: upstream throttling or IP blocking,
+- ``error``: anything else.
+
+Upstream-health failures (``rate_limited`` and ``error``) also feed a
+`CircuitBreaker`; once it opens, fetches fail fast with `CircuitOpenError`
+until the reset timeout lets a single probe through.
+
+`guarded_fetch(video_id, fetch)` combines both using the module-level
+`NEGATIVE_CACHE` and `BREAKER`.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+import threading
+import time
+
+T = TypeVar("T")
+
+# seconds a failure of each kind is remembered
+NEGATIVE_TTLS: Dict[str, float] = {
+    "disabled": 3600.0,
+    "not_found": 600.0,
+    "rate_limited": 60.0,
+    "error": 10.0,
+}
+
+# upstream exception class names (youtube_transcript_api, requests) by kind
+_KIND_BY_NAME = {
+    "TranscriptsDisabled": "disabled",
+    "NoTranscriptFound": "not_found",
+    "NoTranscriptAvailable": "not_found",
+    "VideoUnavailable": "not_found",
+    "VideoUnplayable": "not_found",
+    "InvalidVideoId": "not_found",
+    "AgeRestricted": "not_found",
+    "TooManyRequests": "rate_limited",
+    "RequestBlocked": "rate_limited",
+    "IpBlocked": "rate_limited",
+}
+
+# kinds that say something about upstream health (and trip the breaker)
+BREAKER_KINDS = frozenset({"rate_limited", "error"})
+
+
+class TranscriptUnavailable(RuntimeError):
+    """A transcript could not be fetched; `kind` classifies why.
+
+    `retry_after` is the number of seconds after which retrying makes sense.
+    """
+
+    def __init__(self, message: str, kind: str = "error", retry_after: float = 0.0):
+        super().__init__(message)
+        self.kind = kind
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(TranscriptUnavailable):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Transcript upstream is unhealthy; failing fast", kind="circuit_open", retry_after=retry_after)
+
+
+def classify_error(exc: BaseException) -> str:
+    """Return the failure kind for an upstream exception."""
+    kind = getattr(exc, "kind", None)
+    if kind in NEGATIVE_TTLS:
+        return kind
+    for cls in type(exc).__mro__:
+        if cls.__name__ in _KIND_BY_NAME:
+            return _KIND_BY_NAME[cls.__name__]
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 429:
+        return "rate_limited"
+    return "error"
+
+
+class NegativeCache:
+    """Remember failed lookups for a per-kind TTL (bounded, thread-safe)."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.ttls = dict(NEGATIVE_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[TranscriptUnavailable]:
+        """Return the cached failure for `key` as an exception, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, kind, message = entry
+            remaining = expires - self._clock()
+            if remaining <= 0:
+                del self._entries[key]
+                return None
+        return TranscriptUnavailable(message, kind=kind, retry_after=remaining)
+
+    def put(self, key: str, exc: BaseException) -> TranscriptUnavailable:
+        """Cache `exc` for `key`; returns the equivalent `TranscriptUnavailable`."""
+        kind = classify_error(exc)
+        ttl = self.ttls.get(kind, 0.0)
+        err = TranscriptUnavailable(str(exc) or type(exc).__name__, kind=kind, retry_after=ttl)
+        if ttl <= 0:
+            return err
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, kind, str(err))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return err
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CircuitBreaker:
+    """Classic closed / open / half-open breaker.
+
+    Opens after `failure_threshold` consecutive failures; while open every
+    call fails fast. After `reset_timeout` seconds one probe call is let
+    through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise `CircuitOpenError` if the call must not go upstream."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            retry = self.reset_timeout - (self._clock() - self._opened_at) if state == "open" else 1.0
+        raise CircuitOpenError(retry_after=max(retry, 0.0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+NEGATIVE_CACHE = NegativeCache()
+BREAKER = CircuitBreaker()
+
+
+def guarded_fetch(video_id: str, fetch: Callable[[str], T], cache: Optional[NegativeCache] = None, breaker: Optional[CircuitBreaker] = None) -> T:
+    """Call `fetch(video_id)` behind the negative cache and circuit breaker.
+
+    Raises `TranscriptUnavailable` (or `CircuitOpenError`) instead of the
+    upstream exception; the original is chained as `__cause__`.
+    """
+    cache = NEGATIVE_CACHE if cache is None else cache
+    breaker = BREAKER if breaker is None else breaker
+    cached = cache.get(video_id)
+    if cached is not None:
+        raise cached
+    breaker.before_call()
+    try:
+        result = fetch(video_id)
+    except Exception as e:
+        err = cache.put(video_id, e)
+        if err.kind in BREAKER_KINDS:
+            breaker.record_failure()
+        else:
+            # the upstream answered properly; the video just has no transcript
+            breaker.record_success()
+        raise err from e
+    breaker.record_success()
+    return result
@@ -0,0 +1,144 @@
+"""Caching, field projection and cursor pagination of extraction results.
+
+`ResultCache` keeps recent `_do_extraction` results in memory so paginated
+follow-up requests are served without re-running the extraction.
+`shape_result` then applies a ``fields=`` projection and pages through the
+large list fields (transcript lines and QA pairs) with an opaque cursor.
+
+`dumps` serializes responses with orjson when it is installed (several
+times faster than the stdlib for large transcript payloads) and falls back
+to `json`.
+
+A cursor encodes the next offset of every paginated field plus a short
+fingerprint of the result it was issued for; if the cached result changed
+in between, the cursor is rejected instead of returning a mixed page.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+import base64
+import hashlib
+import json
+import threading
+import time
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+PAGINATED_FIELDS = ("transcript", "qa_pairs")
+# fields that are always returned (when present), whatever `fields=` says
+ALWAYS_FIELDS = ("status", "video_id", "partial", "degraded")
+_CURSOR_KEYS = {"transcript": "t", "qa_pairs": "q"}
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a TTL."""
+
+    def __init__(self, max_entries: int = 128, ttl: float = 600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize `payload` to compact UTF-8 JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[set]:
+    """Parse a ``fields=a,b`` query value; None means all fields."""
+    if not fields:
+        return None
+    return {f.strip() for f in fields.split(",") if f.strip()}
+
+
+def result_fingerprint(result: Dict[str, Any]) -> str:
+    sizes = [result.get("video_id")] + [len(result.get(f) or ()) for f in PAGINATED_FIELDS]
+    first = [(result.get(f) or [None])[0] for f in PAGINATED_FIELDS]
+    raw = json.dumps([sizes, first], sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+def encode_cursor(offsets: Dict[str, int], fingerprint: str) -> str:
+    payload = {_CURSOR_KEYS[f]: o for f, o in offsets.items()}
+    payload["k"] = fingerprint
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> Dict[str, int]:
+    """Return field offsets from `cursor`; `ValueError` if invalid or stale."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        offsets = {f: int(payload.get(k, 0)) for f, k in _CURSOR_KEYS.items()}
+    except Exception:
+        raise ValueError("invalid cursor")
+    if payload.get("k") != fingerprint:
+        raise ValueError("cursor does not match the current result; restart without a cursor")
+    if any(o < 0 for o in offsets.values()):
+        raise ValueError("invalid cursor")
+    return offsets
+
+
+def shape_result(result: Dict[str, Any], fields: Optional[Iterable[str]] = None, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Project `result` to `fields` and page its list fields.
+
+    Without `limit` and `cursor` only the projection is applied. Otherwise
+    each selected paginated field returns at most `limit` items starting at
+    the cursor's offset; the response gains ``page`` (offset/total per
+    field) and ``next_cursor`` (None when every field is exhausted).
+    """
+    wanted = set(fields) if fields is not None else None
+    out = {k: v for k, v in result.items() if wanted is None or k in wanted or k in ALWAYS_FIELDS}
+    if limit is None and cursor is None:
+        return out
+
+    fingerprint = result_fingerprint(result)
+    offsets = decode_cursor(cursor, fingerprint) if cursor else {f: 0 for f in PAGINATED_FIELDS}
+    page: Dict[str, Dict[str, int]] = {}
+    next_offsets: Dict[str, int] = {}
+    more = False
+    for f in PAGINATED_FIELDS:
+        items = result.get(f)
+        if f not in out or not isinstance(items, list):
+            continue
+        start = min(offsets.get(f, 0), len(items))
+        end = len(items) if limit is None else min(len(items), start + limit)
+        out[f] = items[start:end]
+        page[f] = {"offset": start, "count": end - start, "total": len(items)}
+        next_offsets[f] = end
+        more = more or end < len(items)
+    out["page"] = page
+    out["next_cursor"] = encode_cursor(next_offsets, fingerprint) if more else None
+    return out
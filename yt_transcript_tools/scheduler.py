@@ -0,0 +1,319 @@
+"""Per-client fair scheduling of the API's async extraction jobs.
+
+Clients are identified by their ``X-API-Key`` header (requests without one,
+e.g. from ``/ui``, share the ``anonymous`` client). Each client gets:
+
+- a token-bucket quota (`rate` jobs/second, bursts of up to `burst`);
+  submissions beyond it, or beyond `max_queued` waiting jobs, raise
+  `QuotaExceeded` (HTTP 429 with ``Retry-After``);
+- its own FIFO queue, served by weighted fair queuing: every job is tagged
+  with a virtual finish time ``max(V, client's last finish) + 1/weight``
+  and workers always start the job with the smallest tag, so a client
+  with 10,000 queued jobs and one with a single job alternate instead of
+  the latter waiting behind the whole backlog;
+- a cap on how many of its jobs run at once (`max_concurrency`, by default
+  one less than the number of workers, so a bulk ingest never occupies
+  every worker).
+
+Clients are configured with a JSON file named by `YT_SCHEDULER_CLIENTS`::
+
+    {
+      "clients": {"<api key>": {"name": "bulk-ingest", "weight": 1, "rate": 2, "burst": 20, "max_concurrency": 2}},
+      "anonymous": {"weight": 4},
+      "default": {"rate": 1, "burst": 10}
+    }
+
+``default`` applies to API keys not listed (each key still gets its own
+bucket and queue); stats report clients by name, never by key.
+"""
+from collections import deque
+from typing import Any, Callable, Deque, Dict, NamedTuple, Optional
+import hashlib
+import json
+import os
+import threading
+import time
+
+SCHEDULER_CLIENTS_ENV = "YT_SCHEDULER_CLIENTS"
+SCHEDULER_WORKERS_ENV = "YT_SCHEDULER_WORKERS"
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUED = 10000
+ANONYMOUS = "anonymous"
+# latency samples kept per client for the percentiles in `stats`
+_SAMPLES = 512
+# idle clients of unlisted keys are forgotten beyond this many clients
+_MAX_CLIENTS = 1024
+
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+class QuotaExceeded(RuntimeError):
+    """The client is over its quota; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ClientPolicy(NamedTuple):
+    """Scheduling parameters of one client; None means unlimited."""
+
+    name: str
+    weight: float = 1.0
+    rate: Optional[float] = None  # jobs per second
+    burst: Optional[float] = None  # bucket size (default: max(1, rate))
+    max_concurrency: Optional[int] = None
+    max_queued: Optional[int] = DEFAULT_MAX_QUEUED
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` per second up to `burst` tokens."""
+
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate or 0.0)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def take(self, n: float = 1.0) -> float:
+        """Take `n` tokens; returns 0 on success, else the seconds until they are available."""
+        if not self.rate:
+            return 0.0
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= n:
+            self._tokens -= n
+            return 0.0
+        return (n - self._tokens) / self.rate
+
+
+def _percentile(samples, q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Job(NamedTuple):
+    tag: float
+    start_tag: float
+    enqueued: float
+    fn: Callable
+    args: tuple
+    kwargs: dict
+
+
+class _Client:
+    def __init__(self, policy: ClientPolicy, listed: bool, clock):
+        self.policy = policy
+        self.listed = listed
+        self.bucket = TokenBucket(policy.rate, policy.burst, clock)
+        self.queue: Deque[_Job] = deque()
+        self.running = 0
+        self.last_finish = 0.0
+        self.submitted = self.completed = self.failed = self.rejected = 0
+        self.wait_ms: Deque[float] = deque(maxlen=_SAMPLES)
+        self.run_ms: Deque[float] = deque(maxlen=_SAMPLES)
+
+
+class FairScheduler:
+    """Worker threads serving per-client queues by weighted fair queuing."""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        clients: Optional[Dict[str, ClientPolicy]] = None,
+        default: Optional[ClientPolicy] = None,
+        anonymous: Optional[ClientPolicy] = None,
+        clock=time.monotonic,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        self._policies = dict(clients or {})
+        self._default = default or ClientPolicy("default")
+        self._anonymous = anonymous or ClientPolicy(ANONYMOUS)
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._clients: Dict[str, _Client] = {}
+        self._vtime = 0.0
+        self._closed = False
+        self._threads = [threading.Thread(target=self._work, name=f"scheduler-{i}", daemon=True) for i in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    def _client(self, api_key: Optional[str]) -> _Client:
+        """Client state for `api_key`, created on first use; lock held."""
+        if not api_key:
+            name, policy, listed = ANONYMOUS, self._anonymous._replace(name=ANONYMOUS), True
+        elif api_key in self._policies:
+            policy = self._policies[api_key]
+            name, listed = policy.name, True
+        else:
+            # unlisted keys are named by a hash so stats never expose them
+            name = f"key-{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:10]}"
+            policy, listed = self._default._replace(name=name), False
+        client = self._clients.get(name)
+        if client is None:
+            if len(self._clients) >= _MAX_CLIENTS:
+                for idle in [n for n, c in self._clients.items() if not c.listed and not c.queue and not c.running]:
+                    del self._clients[idle]
+            if policy.max_concurrency is None:
+                policy = policy._replace(max_concurrency=max(1, self.workers - 1))
+            client = self._clients[name] = _Client(policy, listed, self._clock)
+        return client
+
+    def admit(self, api_key: Optional[str]) -> str:
+        """Charge one job to `api_key`'s token bucket (no queuing); returns the client name.
+
+        Used when jobs go to the shared job queue instead of this scheduler.
+        """
+        with self._cond:
+            client = self._client(api_key)
+            wait = client.bucket.take()
+            if wait:
+                client.rejected += 1
+                raise QuotaExceeded(f"rate limit exceeded for client {client.policy.name!r}", retry_after=wait)
+            client.submitted += 1
+            return client.policy.name
+
+    def submit(self, api_key: Optional[str], fn: Callable, *args, **kwargs) -> str:
+        """Queue `fn(*args, **kwargs)` for `api_key`'s client; returns the client name.
+
+        Raises `QuotaExceeded` when the client's bucket is empty or its
+        queue is full.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is shut down")
+            client = self._client(api_key)
+            policy = client.policy
+            if policy.max_queued is not None and len(client.queue) >= policy.max_queued:
+                client.rejected += 1
+                raise QuotaExceeded(f"too many queued jobs for client {policy.name!r}", retry_after=1.0)
+            wait = client.bucket.take()
+            if wait:
+                client.rejected += 1
+                raise QuotaExceeded(f"rate limit exceeded for client {policy.name!r}", retry_after=wait)
+            start = max(self._vtime, client.last_finish)
+            client.last_finish = start + 1.0 / policy.weight
+            client.queue.append(_Job(client.last_finish, start, self._clock(), fn, args, kwargs))
+            client.submitted += 1
+            self._cond.notify()
+            return policy.name
+
+    def _next(self):
+        """Wait for the eligible job with the smallest finish tag; lock held."""
+        while True:
+            if self._closed:
+                return None, None
+            best = None
+            for client in self._clients.values():
+                if client.queue and client.running < client.policy.max_concurrency:
+                    if best is None or client.queue[0].tag < best.queue[0].tag:
+                        best = client
+            if best is not None:
+                job = best.queue.popleft()
+                best.running += 1
+                # virtual time follows the start tag of the job in service
+                self._vtime = max(self._vtime, job.start_tag)
+                return best, job
+            self._cond.wait()
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                client, job = self._next()
+                if job is None:
+                    return
+            started = self._clock()
+            ok = True
+            try:
+                job.fn(*job.args, **job.kwargs)
+            except Exception:
+                ok = False
+            finished = self._clock()
+            with self._cond:
+                client.running -= 1
+                client.completed += ok
+                client.failed += not ok
+                client.wait_ms.append((started - job.enqueued) * 1000.0)
+                client.run_ms.append((finished - started) * 1000.0)
+                # a slot of this client's concurrency cap is free again
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            clients = {}
+            for name, c in self._clients.items():
+                p = c.policy
+                clients[name] = {
+                    "weight": p.weight, "rate": p.rate, "burst": c.bucket.burst if p.rate else None,
+                    "max_concurrency": p.max_concurrency, "max_queued": p.max_queued,
+                    "queued": len(c.queue), "running": c.running,
+                    "submitted": c.submitted, "completed": c.completed, "failed": c.failed, "rejected": c.rejected,
+                    "wait_ms": {"p50": _percentile(c.wait_ms, 0.5), "p95": _percentile(c.wait_ms, 0.95)},
+                    "run_ms": {"p50": _percentile(c.run_ms, 0.5), "p95": _percentile(c.run_ms, 0.95)},
+                }
+            return {"workers": self.workers, "clients": clients}
+
+    def shutdown(self, wait: bool = True) -> int:
+        """Stop the workers after their current jobs; returns the number of queued jobs dropped."""
+        with self._cond:
+            self._closed = True
+            dropped = sum(len(c.queue) for c in self._clients.values())
+            for c in self._clients.values():
+                c.queue.clear()
+            self._cond.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
+        return dropped
+
+
+def _policy(name: str, spec: Dict[str, Any]) -> ClientPolicy:
+    unknown = set(spec) - set(ClientPolicy._fields)
+    if unknown:
+        raise ValueError(f"unknown client settings {sorted(unknown)} for {name!r}")
+    spec = {"name": name, **spec}
+    if float(spec.get("weight", 1.0)) <= 0:
+        raise ValueError(f"weight of client {spec['name']!r} must be > 0")
+    return ClientPolicy(**spec)
+
+
+def load_client_config(path) -> Dict[str, Any]:
+    """Parse a `YT_SCHEDULER_CLIENTS` file into `FairScheduler` keyword arguments."""
+    with open(path, encoding="utf-8") as fh:
+        config = json.load(fh)
+    clients = {}
+    for i, (key, spec) in enumerate((config.get("clients") or {}).items()):
+        spec = dict(spec)
+        clients[key] = _policy(spec.pop("name", None) or f"client-{i + 1}", spec)
+    return {
+        "clients": clients,
+        "default": _policy("default", config.get("default") or {}),
+        "anonymous": _policy(ANONYMOUS, config.get("anonymous") or {}),
+    }
+
+
+def get_scheduler() -> FairScheduler:
+    """Process-wide scheduler configured from `YT_SCHEDULER_WORKERS` / `YT_SCHEDULER_CLIENTS`."""
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            path = os.environ.get(SCHEDULER_CLIENTS_ENV)
+            config = load_client_config(path) if path else {}
+            workers = int(os.environ.get(SCHEDULER_WORKERS_ENV) or DEFAULT_WORKERS)
+            _SCHEDULER = FairScheduler(workers, **config)
+        return _SCHEDULER
+
+
+def shutdown_scheduler(wait: bool = False) -> None:
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is not None:
+            _SCHEDULER.shutdown(wait=wait)
+            _SCHEDULER = None
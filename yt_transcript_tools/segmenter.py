@@ -0,0 +1,267 @@
+"""Pluggable sentence segmentation shared by the extractors.
+
+- ``rules`` (default): `RuleSegmenter`, precompiled regexes tuned for
+  YouTube captions. Caption lines are joined before splitting (cues break
+  sentences mid-phrase), sound cues like ``[Music]`` are dropped, ``>>``
+  speaker changes end a sentence, and unpunctuated auto-caption runs are
+  cut at common sentence openers ("so", "okay", "what", ...) or after
+  `max_words` words.
+- ``spacy``: `SpacySegmenter`, opt-in; ``en_core_web_sm`` if installed,
+  otherwise a blank English pipeline with the rule-based sentencizer.
+- ``regex``: `RegexSegmenter`, the plain split on ``. ! ?`` followed by
+  whitespace.
+
+Select one with `YT_SEGMENTER`; `segment_sentences` uses the selected
+segmenter and falls back to ``rules`` if it cannot be loaded.
+`segment_many` segments a whole corpus at once; for spaCy it streams the
+texts through ``nlp.pipe`` (optionally with several processes).
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import os
+import re
+import threading
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except Exception:
+    spacy = None
+    SPACY_AVAILABLE = False
+
+SEGMENTER_ENV = "YT_SEGMENTER"
+DEFAULT_SEGMENTER = "rules"
+
+# [Music], [Applause], (laughter) ...
+_CUE_RE = re.compile(r"\[[^\]\n]{0,40}\]|\((?:music|applause|laughter|inaudible|silence)[^)\n]{0,20}\)", re.IGNORECASE)
+_SPEAKER_RE = re.compile(r"\s*>>+\s*")
+# terminal punctuation, optional closing quotes/brackets, then whitespace
+_END_RE = re.compile(r"([.!?]+[\"'”’)\]]*)\s+")
+_REGEX_SPLIT_RE = re.compile(r"(?<=[\.\!\?])\s+")
+
+_ABBREVIATIONS = frozenset({
+    "mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "vs.", "etc.",
+    "e.g.", "i.e.", "approx.", "no.", "fig.", "inc.", "ltd.", "co.",
+})
+
+# words that usually open a new sentence in unpunctuated speech
+_OPENERS = ("so", "okay", "ok", "now", "alright", "what", "why", "how", "where", "who", "which")
+# explicit case classes and a first-letter guard are much faster than IGNORECASE
+_OPENER_RE = re.compile(
+    r" (?=[" + "".join(sorted({w[0] + w[0].upper() for w in _OPENERS})) + r"])"
+    r"(?=(?:" + "|".join(f"[{w[0].upper()}{w[0]}]{w[1:]}" for w in _OPENERS) + r")\b)"
+)
+
+
+class Segmenter:
+    """Splits text into sentences."""
+
+    name = "base"
+
+    def segment(self, text: str) -> List[str]:
+        raise NotImplementedError
+
+    def segment_many(self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[List[str]]:
+        """Segment each text; returns one sentence list per input text."""
+        return [self.segment(t) for t in texts]
+
+
+class RegexSegmenter(Segmenter):
+    name = "regex"
+
+    def segment(self, text: str) -> List[str]:
+        return [p.strip() for p in _REGEX_SPLIT_RE.split(text) if p.strip()]
+
+
+class RuleSegmenter(Segmenter):
+    """Fast rule-based segmenter for captions (see module docstring).
+
+    Runs longer than `soft_words` words without terminal punctuation are
+    treated as unpunctuated speech: they are cut before an opener word once
+    the current sentence has `min_words` words, and always after `max_words`.
+    """
+
+    name = "rules"
+
+    def __init__(self, min_words: int = 5, soft_words: int = 25, max_words: int = 40):
+        self.min_words = min_words
+        self.soft_words = soft_words
+        self.max_words = max_words
+
+    def segment(self, text: str) -> List[str]:
+        if "[" in text or "(" in text:
+            text = _CUE_RE.sub(" ", text)
+        turns = _SPEAKER_RE.split(text) if ">>" in text else (text,)
+        out: List[str] = []
+        for turn in turns:
+            turn = " ".join(turn.split())
+            if turn:
+                self._split_turn(turn + " ", out)
+        return out
+
+    def _split_turn(self, text: str, out: List[str]) -> None:
+        start = 0
+        for m in _END_RE.finditer(text):
+            end = m.end(1)
+            punct = m.group(1)
+            if punct == ".":
+                last = text[text.rfind(" ", start, end) + 1:end].lower()
+                # abbreviation, or a lowercase continuation ("approx. ten")
+                if last in _ABBREVIATIONS or text[m.end():m.end() + 1].islower():
+                    continue
+            self._emit(text[start:end], out)
+            start = m.end()
+        self._emit(text[start:], out)
+
+    def _emit(self, piece: str, out: List[str]) -> None:
+        piece = piece.strip()
+        if not piece:
+            return
+        if piece.count(" ") < self.soft_words:
+            out.append(piece)
+            return
+        cur, n = [], 0
+        for part in _OPENER_RE.split(piece):
+            k = part.count(" ") + 1
+            if cur and n >= self.min_words:
+                self._emit_capped(" ".join(cur), out)
+                cur, n = [], 0
+            cur.append(part)
+            n += k
+        if cur:
+            self._emit_capped(" ".join(cur), out)
+
+    def _emit_capped(self, sent: str, out: List[str]) -> None:
+        if sent.count(" ") < self.max_words:
+            out.append(sent)
+            return
+        words = sent.split(" ")
+        for i in range(0, len(words), self.max_words):
+            out.append(" ".join(words[i:i + self.max_words]))
+
+
+# components that never influence sentence boundaries
+_SPACY_EXCLUDE = ["tagger", "morphologizer", "attribute_ruler", "lemmatizer", "ner", "entity_ruler", "textcat", "textcat_multilabel", "entity_linker"]
+
+
+def _chunk_text(text: str, max_length: int) -> List[str]:
+    """Split `text` into pieces shorter than `max_length`, preferably at line breaks."""
+    chunks = []
+    while len(text) >= max_length:
+        cut = text.rfind("\n", 0, max_length)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, max_length)
+        if cut <= 0:
+            cut = max_length - 1
+        chunks.append(text[:cut])
+        text = text[cut:]
+    chunks.append(text)
+    return chunks
+
+
+class SpacySegmenter(Segmenter):
+    """spaCy sentence segmentation (opt-in; much slower than `RuleSegmenter`).
+
+    Only the components that decide sentence boundaries run: the statistical
+    ``senter`` when the model ships one (else the parser), or the rule-based
+    sentencizer for a blank pipeline. Texts longer than ``nlp.max_length``
+    are processed in chunks.
+    """
+
+    name = "spacy"
+
+    def __init__(self, model: str = "en_core_web_sm"):
+        if not SPACY_AVAILABLE:
+            raise RuntimeError("spaCy is not installed; install it or use the 'rules' segmenter")
+        try:
+            nlp = spacy.load(model, exclude=_SPACY_EXCLUDE)
+        except Exception:
+            nlp = spacy.blank("en")
+        names = nlp.component_names
+        if "senter" in names:
+            keep = {"senter"}
+        elif "parser" in names:
+            keep = {"parser"}
+        else:
+            if "sentencizer" not in names:
+                nlp.add_pipe("sentencizer")
+            keep = {"sentencizer"}
+        if "tok2vec" in names:
+            listeners = getattr(nlp.get_pipe("tok2vec"), "listening_components", [])
+            if keep & set(listeners):
+                keep.add("tok2vec")
+        for name in names:
+            if name in keep:
+                if name in nlp.disabled:
+                    nlp.enable_pipe(name)
+            elif name not in nlp.disabled:
+                nlp.disable_pipe(name)
+        self.nlp = nlp
+
+    def segment(self, text: str) -> List[str]:
+        return self.segment_many([text])[0]
+
+    def _chunks(self, texts: Iterable[str]) -> Iterator[Tuple[str, int]]:
+        for i, text in enumerate(texts):
+            for chunk in _chunk_text(text, self.nlp.max_length):
+                yield chunk, i
+
+    def segment_many(self, texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[List[str]]:
+        out: List[List[str]] = []
+        docs = self.nlp.pipe(self._chunks(texts), as_tuples=True, batch_size=batch_size, n_process=n_process)
+        for doc, i in docs:
+            while len(out) <= i:
+                out.append([])
+            out[i].extend(s.text.strip() for s in doc.sents if s.text.strip())
+        return out
+
+
+SEGMENTERS = {
+    RuleSegmenter.name: RuleSegmenter,
+    SpacySegmenter.name: SpacySegmenter,
+    RegexSegmenter.name: RegexSegmenter,
+}
+
+_SEGMENTERS: Dict[str, Segmenter] = {}
+_FAILED: Dict[str, Exception] = {}
+_SEGMENTERS_LOCK = threading.Lock()
+
+
+def get_segmenter(name: Optional[str] = None) -> Segmenter:
+    """Return the (cached) segmenter called `name`, or the configured default.
+
+    Raises `ValueError` for unknown names and `RuntimeError` when the
+    segmenter's dependencies are missing.
+    """
+    name = name or os.environ.get(SEGMENTER_ENV) or DEFAULT_SEGMENTER
+    if name not in SEGMENTERS:
+        raise ValueError(f"Unknown segmenter {name!r}; choose from {sorted(SEGMENTERS)}")
+    with _SEGMENTERS_LOCK:
+        if name in _FAILED:
+            raise _FAILED[name]
+        if name not in _SEGMENTERS:
+            try:
+                _SEGMENTERS[name] = SEGMENTERS[name]()
+            except Exception as e:
+                _FAILED[name] = e
+                raise
+        return _SEGMENTERS[name]
+
+
+def segment_sentences(text: str, segmenter: Optional[Segmenter] = None) -> List[str]:
+    """Split `text` with `segmenter` or the selected one (``rules`` if it fails to load)."""
+    if segmenter is None:
+        try:
+            segmenter = get_segmenter()
+        except RuntimeError:
+            segmenter = get_segmenter(DEFAULT_SEGMENTER)
+    return segmenter.segment(text)
+
+
+def segment_many(texts: Iterable[str], segmenter: Optional[Segmenter] = None, batch_size: int = 64, n_process: int = 1) -> List[List[str]]:
+    """Batch form of `segment_sentences`: one sentence list per text."""
+    if segmenter is None:
+        try:
+            segmenter = get_segmenter()
+        except RuntimeError:
+            segmenter = get_segmenter(DEFAULT_SEGMENTER)
+    return segmenter.segment_many(texts, batch_size=batch_size, n_process=n_process)
@@ -0,0 +1,60 @@
+"""Single-flight call coalescing.
+
+`SingleFlight.do(key, fn)` runs `fn` once for concurrent callers with the
+same key: the first caller computes, the others block until it finishes and
+receive the same result (or the same exception). Nothing is cached after
+the call completes; later callers start a new computation.
+"""
+from typing import Any, Callable, Dict, Hashable, Tuple
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        result, _shared = self.do_shared(key, fn)
+        return result
+
+    def do_shared(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Like `do`, also returning whether the result came from another caller."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
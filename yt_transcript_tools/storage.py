@@ -0,0 +1,109 @@
+"""Helpers for writing output artifacts safely.
+
+Files are written to a temporary sibling and moved into place with
+`os.replace`, which is atomic on POSIX and Windows: readers (e.g. the
+`/outputs` static mount) see either the old file or the complete new one,
+never a partially written file.
+
+`write_stored` optionally zstd-compresses what it writes (to ``<name>.zst``,
+see `compression`); `open_text` / `read_text` / `iter_lines` read plain and
+compressed files alike, decompressing as a stream.
+"""
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+import io
+import os
+import tempfile
+
+from .compression import ZSTD_SUFFIX, is_compressed, read_codec
+
+# read once at import: os.umask can only be queried by setting it, which
+# is not safe once other threads create files
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path: Path) -> int:
+    """Mode for a new version of `path`: the current file's, else what `open` would create."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write_bytes(path, data: bytes) -> Path:
+    """Atomically replace `path` with `data`; returns the path."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        # mkstemp creates the file 0600; give it the mode a plain write would
+        os.chmod(tmp, _file_mode(path))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def atomic_write_text(path, text: str, encoding: str = "utf-8") -> Path:
+    """Atomically replace `path` with `text`; returns the path."""
+    return atomic_write_bytes(path, text.encode(encoding))
+
+
+def write_stored(path, data: bytes, codec=None) -> Path:
+    """Atomically write `data` to `path`, or compressed by `codec` to ``<path>.zst``.
+
+    A `path` already ending in ``.zst`` is always compressed. The other
+    variant of the file (plain or ``.zst``) is removed, so a stale copy
+    never shadows the new one. Returns the path written.
+    """
+    plain = Path(path)
+    if is_compressed(plain):
+        plain = plain.with_name(plain.name[: -len(ZSTD_SUFFIX)])
+        codec = codec or read_codec()
+    compressed = plain.with_name(plain.name + ZSTD_SUFFIX)
+    if codec is not None:
+        path, other = atomic_write_bytes(compressed, codec.compress(data)), plain
+    else:
+        path, other = atomic_write_bytes(plain, data), compressed
+    try:
+        os.unlink(other)
+    except FileNotFoundError:
+        pass
+    return path
+
+
+def find_stored(path) -> Optional[Path]:
+    """`path` if it exists, else its compressed ``.zst`` sibling, else None."""
+    path = Path(path)
+    for candidate in (path, path.with_name(path.name + ZSTD_SUFFIX)):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def open_text(path, encoding: str = "utf-8", codec=None) -> TextIO:
+    """Open a plain or ``.zst`` file for reading text (decompressed as a stream).
+
+    ``.zst`` files are read with `codec` (default: `compression.read_codec`).
+    """
+    if is_compressed(path):
+        return io.TextIOWrapper((codec or read_codec()).open_reader(path), encoding=encoding)
+    return open(path, encoding=encoding)
+
+
+def read_text(path, encoding: str = "utf-8", codec=None) -> str:
+    with open_text(path, encoding, codec) as fh:
+        return fh.read()
+
+
+def iter_lines(path, strip: bool = True, codec=None) -> Iterator[str]:
+    """Yield the lines of a plain or ``.zst`` file without reading it whole."""
+    with open_text(path, codec=codec) as fh:
+        for line in fh:
+            yield line.strip() if strip else line.rstrip("\n")
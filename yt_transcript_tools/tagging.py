@@ -0,0 +1,178 @@
+"""Keyword/topic tagging of transcripts with an Aho-Corasick automaton.
+
+Build a `KeywordTagger` once from a keyword list (or a file with one keyword
+per line, ``#`` for comments) and reuse it for every transcript. Each
+transcript is scanned in a single pass regardless of how many keywords
+there are; lines are joined with spaces so multi-word keywords that a
+caption splits across two lines are still found. Matching is
+case-insensitive and respects word boundaries ("java" does not match
+inside "javascript").
+
+The C implementation from `pyahocorasick` is used when installed; the pure
+Python automaton gives identical results.
+
+Set `YT_KEYWORDS_FILE` to enable tagging in the API (`get_default_tagger`).
+"""
+from bisect import bisect_right
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import os
+import threading
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except Exception:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+from .storage import open_text
+
+KEYWORDS_FILE_ENV = "YT_KEYWORDS_FILE"
+
+_DEFAULT_TAGGER = None
+_DEFAULT_TAGGER_LOCK = threading.Lock()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class _PyAutomaton:
+    """Minimal Aho-Corasick automaton (goto/fail/output) over characters."""
+
+    def __init__(self, words: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[str, ...]] = [()]
+        for w in words:
+            node = 0
+            for ch in w:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                node = nxt
+            self.out[node] = self.out[node] + (w,)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                if node:
+                    f = self.fail[node]
+                    while f and ch not in self.goto[f]:
+                        f = self.fail[f]
+                    self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, str]]:
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for w in out[node]:
+                yield i, w
+
+
+class KeywordTagger:
+    """Find which keywords a transcript mentions, how often and on which lines."""
+
+    def __init__(self, keywords: Iterable[str]):
+        # normalized form -> keyword as given (first spelling wins)
+        self.keywords: Dict[str, str] = {}
+        for kw in keywords:
+            norm = _normalize(kw)
+            if norm and norm not in self.keywords:
+                self.keywords[norm] = kw.strip()
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for norm in self.keywords:
+                self._automaton.add_word(norm, norm)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            self._automaton = _PyAutomaton(self.keywords)
+
+    @classmethod
+    def from_file(cls, path) -> "KeywordTagger":
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        return cls(ln for ln in lines if ln.strip() and not ln.lstrip().startswith("#"))
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def scan(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield ``(start, end, keyword)`` for whole-word matches in `text`.
+
+        Offsets refer to `text`; whitespace must already be single spaces
+        for multi-word keywords to match (see `tag_lines`).
+        """
+        if not self.keywords:
+            return
+        low = text.lower()
+        n = len(low)
+        for end_idx, norm in self._automaton.iter(low):
+            end = end_idx + 1
+            start = end - len(norm)
+            if start > 0 and _is_word_char(low[start - 1]) and _is_word_char(norm[0]):
+                continue
+            if end < n and _is_word_char(low[end]) and _is_word_char(norm[-1]):
+                continue
+            yield start, end, self.keywords[norm]
+
+    def tag_lines(self, lines: Iterable[str]) -> Dict[str, Dict[str, object]]:
+        """Return ``{keyword: {"count": n, "lines": [line numbers]}}`` for `lines`.
+
+        Line numbers are 0-based; a match spanning a line break is reported
+        on the line where it starts.
+        """
+        starts: List[int] = []
+        parts: List[str] = []
+        pos = 0
+        for ln in lines:
+            ln = " ".join(ln.split())
+            starts.append(pos)
+            parts.append(ln)
+            pos += len(ln) + 1
+        text = " ".join(parts)
+        tags: Dict[str, Dict[str, object]] = {}
+        for start, _end, kw in self.scan(text):
+            line = bisect_right(starts, start) - 1
+            entry = tags.setdefault(kw, {"count": 0, "lines": []})
+            entry["count"] += 1
+            if not entry["lines"] or entry["lines"][-1] != line:
+                entry["lines"].append(line)
+        return tags
+
+
+def tag_file(tagger: KeywordTagger, input_path: Path, output_path: Path) -> int:
+    """Tag a transcript file (plain or ``.zst``) and write the tags as JSON; returns the number of keywords found."""
+    with open_text(input_path) as fh:
+        tags = tagger.tag_lines(fh)
+    with open(output_path, "w", encoding="utf-8") as out:
+        json.dump(tags, out, ensure_ascii=False, indent=2)
+    return len(tags)
+
+
+def get_default_tagger() -> Optional[KeywordTagger]:
+    """Return the tagger for `YT_KEYWORDS_FILE` (built once), or None if unset."""
+    global _DEFAULT_TAGGER
+    path = os.environ.get(KEYWORDS_FILE_ENV)
+    if not path:
+        return None
+    with _DEFAULT_TAGGER_LOCK:
+        if _DEFAULT_TAGGER is None:
+            _DEFAULT_TAGGER = KeywordTagger.from_file(path)
+        return _DEFAULT_TAGGER
@@ -0,0 +1,132 @@
+"""Parse YouTube video and playlist ids from URLs or raw ids.
+
+All patterns are compiled once at import time. `parse_many` is meant for
+bulk input (files with one URL or id per line, possibly millions of lines):
+it binds the compiled matchers locally and does no per-line setup.
+
+Recognised forms::
+
+    dQw4w9WgXcQ                                   raw 11-character id
+    https://www.youtube.com/watch?v=ID&t=1s       watch (www., m., music.)
+    https://youtu.be/ID?si=...                    short links
+    https://www.youtube.com/embed/ID              embed (also youtube-nocookie.com)
+    https://www.youtube.com/shorts/ID             shorts
+    https://www.youtube.com/live/ID               live
+    https://www.youtube.com/v/ID                  legacy player
+    https://www.youtube.com/playlist?list=PL...   playlist (see `parse_playlist_id`)
+"""
+from typing import Callable, Iterable, Iterator, List, Optional
+import re
+
+_ID_CHARS = r"[0-9A-Za-z_-]"
+_VIDEO_ID_RE = re.compile(_ID_CHARS + r"{11}")
+_VIDEO_URL_RE = re.compile(
+    r"(?:[?&#]v=|youtu\.be/|/(?:embed|shorts|live|v|e)/)(" + _ID_CHARS + r"{11})(?!" + _ID_CHARS + r")"
+)
+_PLAYLIST_RE = re.compile(r"[?&]list=(" + _ID_CHARS + r"+)")
+_PLAYLIST_ID_RE = re.compile(r"(?:PL|UU|LL|FL|RD|OL)" + _ID_CHARS + r"{10,}")
+
+
+def parse_video_id(url_or_id: str) -> str:
+    """Return the 11-character video id in `url_or_id`.
+
+    Raises `ValueError` if the input is empty or contains no video id.
+    """
+    if not url_or_id:
+        raise ValueError("youtube_url is empty")
+    s = url_or_id.strip()
+    if _VIDEO_ID_RE.fullmatch(s):
+        return s
+    m = _VIDEO_URL_RE.search(s)
+    if m:
+        return m.group(1)
+    raise ValueError("Invalid YouTube URL or video id")
+
+
+def parse_playlist_id(url_or_id: str) -> Optional[str]:
+    """Return the playlist id in a URL (``list=``) or a raw playlist id, else None."""
+    s = (url_or_id or "").strip()
+    m = _PLAYLIST_RE.search(s)
+    if m:
+        return m.group(1)
+    if _PLAYLIST_ID_RE.fullmatch(s):
+        return s
+    return None
+
+
+def expand_playlist(url_or_id: str) -> List[str]:
+    """Return the video ids of a playlist, in playlist order.
+
+    Uses `yt-dlp` (flat extraction, no media download). Raises `ValueError`
+    if no playlist id is present and `RuntimeError` if yt-dlp is missing or
+    the playlist cannot be read.
+    """
+    playlist_id = parse_playlist_id(url_or_id)
+    if not playlist_id:
+        raise ValueError("No playlist id in input")
+    try:
+        import yt_dlp
+    except Exception as e:
+        raise RuntimeError(f"yt-dlp is required to expand playlists: {e}")
+    opts = {"extract_flat": True, "quiet": True, "skip_download": True}
+    try:
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(f"https://www.youtube.com/playlist?list={playlist_id}", download=False)
+    except Exception as e:
+        raise RuntimeError(f"Could not read playlist {playlist_id}: {e}")
+    ids = []
+    for entry in (info or {}).get("entries") or []:
+        vid = entry.get("id") if isinstance(entry, dict) else None
+        if vid and _VIDEO_ID_RE.fullmatch(vid):
+            ids.append(vid)
+    return ids
+
+
+def parse_many(
+    items: Iterable[str],
+    unique: bool = False,
+    strict: bool = False,
+    expand_playlists: bool = False,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+) -> Iterator[str]:
+    """Yield video ids for each URL/id in `items` (e.g. an open file).
+
+    Blank lines and lines starting with ``#`` are ignored. Unparseable
+    entries are skipped unless `strict` is set, in which case `ValueError`
+    is raised. With `expand_playlists`, entries that only name a playlist
+    are expanded via `expand_playlist`; if expansion fails and `on_error`
+    is given, it is called with the entry and the error and the entry is
+    skipped (otherwise the error propagates). With `unique`, each id is
+    yielded once (first occurrence wins).
+    """
+    fullmatch = _VIDEO_ID_RE.fullmatch
+    search = _VIDEO_URL_RE.search
+    seen = set() if unique else None
+    for raw in items:
+        s = raw.strip()
+        if not s or s[0] == "#":
+            continue
+        if fullmatch(s):
+            ids = (s,)
+        else:
+            m = search(s)
+            if m:
+                ids = (m.group(1),)
+            elif expand_playlists and parse_playlist_id(s):
+                try:
+                    ids = expand_playlist(s)
+                except RuntimeError as e:
+                    if on_error is None:
+                        raise
+                    on_error(s, e)
+                    continue
+            elif strict:
+                raise ValueError(f"Invalid YouTube URL or video id: {s!r}")
+            else:
+                continue
+        for vid in ids:
+            if seen is not None:
+                if vid in seen:
+                    continue
+                seen.add(vid)
+            yield vid
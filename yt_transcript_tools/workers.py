@@ -0,0 +1,151 @@
+"""Pool of pre-warmed worker processes for CPU-bound NLP.
+
+Segmentation and embedding are CPU-heavy and hold the GIL, so running them
+in a web worker stalls every other request it serves. `NLPWorkerPool`
+moves them into separate processes:
+
+- the segmenter and embedding model are loaded once per worker (in the
+  initializer), not per task;
+- with the ``fork`` start method (default on Linux) they are loaded in the
+  parent first, so workers share the read-only weights copy-on-write
+  instead of each holding a private copy. Create the pool before starting
+  other threads (e.g. at application startup);
+- at most `max_pending` tasks are queued or running; `submit` blocks for
+  up to `timeout` seconds for a free slot and then raises `PoolBusy`, so
+  overload turns into fast 503s instead of an unbounded backlog.
+
+The API uses a pool when `YT_NLP_WORKERS` is set to a positive number
+(see `pool_from_env`).
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import multiprocessing
+import os
+import threading
+import time
+
+NLP_WORKERS_ENV = "YT_NLP_WORKERS"
+NLP_MAX_PENDING_ENV = "YT_NLP_MAX_PENDING"
+
+# torch intra-op threads per worker; the pool itself provides the parallelism
+WORKER_TORCH_THREADS = 1
+
+
+class PoolBusy(RuntimeError):
+    """All worker slots are taken; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: float = 1.0):
+        super().__init__("NLP workers are busy; retry later")
+        self.retry_after = retry_after
+
+
+def warm_models() -> None:
+    """Load the shared segmenter and embedding backend (no-op if loaded)."""
+    from .advanced_qa import _get_backend
+    from .segmenter import segment_sentences
+
+    segment_sentences("warm up.")
+    _get_backend(None)
+
+
+def _init_worker(torch_threads: int) -> None:
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except Exception:
+        pass
+    warm_models()
+
+
+def _ping(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+def analyze_transcript(lines: List[str], qa_uses_questions: bool = True, chunk_lines: Optional[int] = None, batcher=None, qa_mode: Optional[str] = None, with_qa: bool = True) -> Dict[str, Any]:
+    """Extract questions and QA pairs from transcript `lines`.
+
+    Returns ``{"questions": [...], "qa_pairs": [...]}``; a part that fails
+    is None. With `qa_uses_questions` the extracted questions are answered,
+    otherwise `extract_qa_advanced` detects its own. `qa_mode` selects its
+    answer ranking; without `with_qa` QA pairs are skipped (None).
+    """
+    from .advanced_qa import extract_qa_advanced
+    from .question_extractor import extract_questions
+
+    try:
+        questions = extract_questions("\n".join(lines))
+    except Exception:
+        questions = None
+    if not with_qa:
+        return {"questions": questions, "qa_pairs": None}
+    try:
+        qa_pairs = extract_qa_advanced(
+            lines,
+            questions=(questions or []) if qa_uses_questions else None,
+            batcher=batcher,
+            chunk_lines=chunk_lines,
+            mode=qa_mode,
+        )
+    except Exception:
+        qa_pairs = None
+    return {"questions": questions, "qa_pairs": qa_pairs}
+
+
+class NLPWorkerPool:
+    """Process pool with warm NLP models and a bounded task queue."""
+
+    def __init__(self, workers: int, max_pending: Optional[int] = None, start_method: Optional[str] = None, preload: bool = True):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if start_method is None:
+            start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        if preload and start_method == "fork":
+            warm_models()
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker if preload else None,
+            initargs=(WORKER_TORCH_THREADS,) if preload else (),
+        )
+
+    def warm(self) -> List[int]:
+        """Start every worker process now; returns their pids."""
+        futures = [self._executor.submit(_ping, 0.05) for _ in range(self.workers)]
+        return sorted({f.result() for f in futures})
+
+    def submit(self, fn: Callable, *args, timeout: Optional[float] = 30.0, **kwargs) -> Future:
+        """Queue `fn(*args, **kwargs)`; raises `PoolBusy` if no slot frees up in time."""
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolBusy()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _f: self._slots.release())
+        return future
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = 30.0, **kwargs) -> Any:
+        return self.submit(fn, *args, timeout=timeout, **kwargs).result()
+
+    def analyze(self, lines: List[str], qa_uses_questions: bool = True, chunk_lines: Optional[int] = None, qa_mode: Optional[str] = None, with_qa: bool = True) -> Dict[str, Any]:
+        """`analyze_transcript` in a worker process."""
+        return self.run(analyze_transcript, list(lines), qa_uses_questions, chunk_lines, qa_mode=qa_mode, with_qa=with_qa)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+def pool_from_env() -> Optional[NLPWorkerPool]:
+    """Return a warmed pool sized by `YT_NLP_WORKERS`, or None if unset / 0."""
+    workers = int(os.environ.get(NLP_WORKERS_ENV, "0") or 0)
+    if workers <= 0:
+        return None
+    max_pending = int(os.environ.get(NLP_MAX_PENDING_ENV, "0") or 0) or None
+    pool = NLPWorkerPool(workers, max_pending=max_pending)
+    pool.warm()
+    return pool